@@ -10,45 +10,47 @@
 import logging
 from datetime import datetime, timedelta
 
-logging.basicConfig(level=logging.INFO)
+logging.basicConfig(level=logging.INFO, format="%(message)s")
 logger = logging.getLogger(__name__)
 
 
+def _section(title: str) -> None:
+    """输出分节标题."""
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("\n".join(["", "=" * 60, title, "=" * 60]))
+
+
 def test_module_imports():
     """测试1: 模块导入."""
-    print("\n" + "=" * 60)
-    print("📦 测试1: 模块导入")
-    print("=" * 60)
+    _section("📦 测试1: 模块导入")
 
     try:
         from src.database.postgres_client import PostgreSQLClient
-        print("✅ PostgreSQL客户端")
+        logger.debug("✅ PostgreSQL客户端")
 
         from src.mql.sql_generator import SQLGenerator
-        print("✅ SQL生成器")
+        logger.debug("✅ SQL生成器")
 
         from src.mql.intelligent_interpreter import IntelligentInterpreter
-        print("✅ 智能解读器")
+        logger.debug("✅ 智能解读器")
 
         from src.mql.models import InterpretationResult
-        print("✅ MQL数据模型")
+        logger.debug("✅ MQL数据模型")
 
         from src.api.v2_query_api import create_app
-        print("✅ API服务")
+        logger.debug("✅ API服务")
 
-        print("\n✅ 所有核心模块导入成功")
+        logger.info("✅ 所有核心模块导入成功")
         return True
 
     except Exception as e:
-        print(f"\n❌ 模块导入失败: {e}")
+        logger.error(f"❌ 模块导入失败: {e}")
         return False
 
 
 def test_sql_generator():
     """测试2: SQL生成器."""
-    print("\n" + "=" * 60)
-    print("🔧 测试2: SQL生成器")
-    print("=" * 60)
+    _section("🔧 测试2: SQL生成器")
 
     try:
         from src.mql.sql_generator import SQLGenerator
@@ -69,31 +71,25 @@ def test_sql_generator():
 
         sql, params = generator.generate(mql_query)
 
-        print(f"\n生成的SQL:")
-        print(f"  {sql[:100]}...")
-        print(f"\n参数:")
-        print(f"  {params}")
+        logger.debug(f"生成的SQL: {sql[:100]}...")
+        logger.debug(f"参数: {params}")
 
         # 验证SQL包含关键元素
         assert "SUM" in sql, "SQL应包含SUM聚合"
         assert "fact_orders" in sql, "SQL应引用订单事实表"
         assert "BETWEEN" in sql, "SQL应包含时间范围过滤"
 
-        print("\n✅ SQL生成器测试通过")
+        logger.info("✅ SQL生成器测试通过")
         return True
 
     except Exception as e:
-        print(f"\n❌ SQL生成器测试失败: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception(f"❌ SQL生成器测试失败: {e}")
         return False
 
 
 def test_intelligent_interpreter():
     """测试3: 智能解读器."""
-    print("\n" + "=" * 60)
-    print("🤖 测试3: 智能解读器")
-    print("=" * 60)
+    _section("🤖 测试3: 智能解读器")
 
     try:
         from src.mql.intelligent_interpreter import IntelligentInterpreter
@@ -128,19 +124,20 @@ def test_intelligent_interpreter():
             metric_def=metric_def
         )
 
-        print(f"\n解读结果:")
-        print(f"  总结: {interpretation.summary}")
-        print(f"  趋势: {interpretation.trend}")
-        print(f"  置信度: {interpretation.confidence:.2f}")
-        print(f"\n  关键发现:")
-        for finding in interpretation.key_findings[:2]:
-            print(f"    - {finding}")
-        print(f"\n  深入洞察:")
-        for insight in interpretation.insights[:2]:
-            print(f"    - {insight}")
-        print(f"\n  行动建议:")
-        for suggestion in interpretation.suggestions[:2]:
-            print(f"    - {suggestion}")
+        if logger.isEnabledFor(logging.DEBUG):
+            lines = [
+                "解读结果:",
+                f"  总结: {interpretation.summary}",
+                f"  趋势: {interpretation.trend}",
+                f"  置信度: {interpretation.confidence:.2f}",
+                "  关键发现:",
+                *(f"    - {finding}" for finding in interpretation.key_findings[:2]),
+                "  深入洞察:",
+                *(f"    - {insight}" for insight in interpretation.insights[:2]),
+                "  行动建议:",
+                *(f"    - {suggestion}" for suggestion in interpretation.suggestions[:2]),
+            ]
+            logger.debug("\n".join(lines))
 
         # 验证解读结果
         assert interpretation.trend == "upward", "应识别为上升趋势"
@@ -150,21 +147,17 @@ def test_intelligent_interpreter():
         assert len(interpretation.suggestions) > 0, "应有行动建议"
         assert 0 <= interpretation.confidence <= 1, "置信度应在0-1之间"
 
-        print("\n✅ 智能解读器测试通过")
+        logger.info("✅ 智能解读器测试通过")
         return True
 
     except Exception as e:
-        print(f"\n❌ 智能解读器测试失败: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception(f"❌ 智能解读器测试失败: {e}")
         return False
 
 
 def test_fallback_mechanism():
     """测试4: 降级机制."""
-    print("\n" + "=" * 60)
-    print("🛡️ 测试4: 降级机制")
-    print("=" * 60)
+    _section("🛡️ 测试4: 降级机制")
 
     try:
         from src.mql.intelligent_interpreter import IntelligentInterpreter
@@ -200,11 +193,14 @@ def test_fallback_mechanism():
             mql_result=mql_result
         )
 
-        print(f"\n模板解读结果:")
-        print(f"  总结: {interpretation.summary}")
-        print(f"  关键发现数量: {len(interpretation.key_findings)}")
-        print(f"  深入洞察数量: {len(interpretation.insights)}")
-        print(f"  行动建议数量: {len(interpretation.suggestions)}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("\n".join([
+                "模板解读结果:",
+                f"  总结: {interpretation.summary}",
+                f"  关键发现数量: {len(interpretation.key_findings)}",
+                f"  深入洞察数量: {len(interpretation.insights)}",
+                f"  行动建议数量: {len(interpretation.suggestions)}",
+            ]))
 
         # 验证模板解读
         assert interpretation.summary is not None, "总结不应为空"
@@ -212,21 +208,17 @@ def test_fallback_mechanism():
         assert len(interpretation.insights) > 0, "应有深入洞察"
         assert len(interpretation.suggestions) > 0, "应有行动建议"
 
-        print("\n✅ 降级机制测试通过")
+        logger.info("✅ 降级机制测试通过")
         return True
 
     except Exception as e:
-        print(f"\n❌ 降级机制测试失败: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception(f"❌ 降级机制测试失败: {e}")
         return False
 
 
 def test_data_analysis():
     """测试5: 数据分析."""
-    print("\n" + "=" * 60)
-    print("📊 测试5: 数据分析")
-    print("=" * 60)
+    _section("📊 测试5: 数据分析")
 
     try:
         from src.mql.intelligent_interpreter import IntelligentInterpreter
@@ -237,10 +229,10 @@ def test_data_analysis():
         upward_data = [{"value": 100 + i * 10} for i in range(10)]
         analysis = interpreter._analyze_data(upward_data)
 
-        print(f"\n上升趋势分析:")
-        print(f"  趋势: {analysis['trend']}")
-        print(f"  变化率: {analysis['change_rate']:.2f}%")
-        print(f"  波动性: {analysis['volatility']:.2f}%")
+        logger.debug(
+            "上升趋势分析: 趋势=%s 变化率=%.2f%% 波动性=%.2f%%",
+            analysis["trend"], analysis["change_rate"], analysis["volatility"],
+        )
 
         assert analysis["trend"] == "upward", "应识别为上升趋势"
         assert analysis["change_rate"] > 0, "变化率应大于0"
@@ -249,9 +241,9 @@ def test_data_analysis():
         downward_data = [{"value": 200 - i * 10} for i in range(10)]
         analysis = interpreter._analyze_data(downward_data)
 
-        print(f"\n下降趋势分析:")
-        print(f"  趋势: {analysis['trend']}")
-        print(f"  变化率: {analysis['change_rate']:.2f}%")
+        logger.debug(
+            "下降趋势分析: 趋势=%s 变化率=%.2f%%", analysis["trend"], analysis["change_rate"]
+        )
 
         assert analysis["trend"] == "downward", "应识别为下降趋势"
 
@@ -259,28 +251,24 @@ def test_data_analysis():
         stable_data = [{"value": 100 + (i % 2) * 2} for i in range(10)]
         analysis = interpreter._analyze_data(stable_data)
 
-        print(f"\n稳定数据分析:")
-        print(f"  趋势: {analysis['trend']}")
-        print(f"  变化率: {analysis['change_rate']:.2f}%")
+        logger.debug(
+            "稳定数据分析: 趋势=%s 变化率=%.2f%%", analysis["trend"], analysis["change_rate"]
+        )
 
         assert analysis["trend"] == "stable", "应识别为稳定趋势"
 
-        print("\n✅ 数据分析测试通过")
+        logger.info("✅ 数据分析测试通过")
         return True
 
     except Exception as e:
-        print(f"\n❌ 数据分析测试失败: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception(f"❌ 数据分析测试失败: {e}")
         return False
 
 
 def main():
     """主测试函数."""
-    print("\n🚀 项目验收测试")
-    print("=" * 60)
-    print("注意：此测试不需要PostgreSQL运行")
-    print("=" * 60)
+    _section("🚀 项目验收测试")
+    logger.info("注意：此测试不需要PostgreSQL运行")
 
     tests = [
         ("模块导入", test_module_imports),
@@ -300,26 +288,27 @@ def main():
             else:
                 failed += 1
         except Exception as e:
-            print(f"\n❌ {name}测试异常: {e}")
+            logger.exception(f"❌ {name}测试异常: {e}")
             failed += 1
 
-    print("\n" + "=" * 60)
-    print(f"测试结果: {passed}通过, {failed}失败")
-    print("=" * 60)
+    _section(f"测试结果: {passed}通过, {failed}失败")
 
     if failed == 0:
-        print("\n🎉 所有验收测试通过！")
-        print("\n下一步:")
-        print("  1. 安装Docker Desktop (如未安装)")
-        print("  2. 启动服务: docker compose up -d")
-        print("  3. 初始化数据: python scripts/init_test_data.py")
-        print("  4. 运行集成测试: python scripts/test_postgres_integration.py")
-        print("  5. 启动API: python -m src.api.v2_query_api")
-        print("\n详细文档: docs/POSTGRESQL_INTEGRATION.md")
-        print("=" * 60 + "\n")
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("\n".join([
+                "🎉 所有验收测试通过！",
+                "",
+                "下一步:",
+                "  1. 安装Docker Desktop (如未安装)",
+                "  2. 启动服务: docker compose up -d",
+                "  3. 初始化数据: python scripts/init_test_data.py",
+                "  4. 运行集成测试: python scripts/test_postgres_integration.py",
+                "  5. 启动API: python -m src.api.v2_query_api",
+                "",
+                "详细文档: docs/POSTGRESQL_INTEGRATION.md",
+            ]))
     else:
-        print("\n❌ 部分测试失败，请检查错误信息")
-        print("=" * 60 + "\n")
+        logger.error("❌ 部分测试失败，请检查错误信息")
 
     return failed == 0
 
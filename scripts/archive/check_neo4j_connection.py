@@ -20,11 +20,14 @@ def check_neo4j():
         driver = client.connect()
         print("✅ Connection successful!")
         
-        # Run a simple query
+        # One round trip both proves the session works and reports graph size
         with driver.session() as session:
-            result = session.run("RETURN 1 AS num")
-            record = result.single()
-            print(f"   Query result: {record['num']}")
+            record = session.run(
+                "CALL { MATCH (n) RETURN count(n) AS nodes } "
+                "CALL { MATCH ()-[r]->() RETURN count(r) AS rels } "
+                "RETURN nodes, rels"
+            ).single()
+            print(f"   Query result: {record['nodes']} nodes, {record['rels']} relationships")
             
         client.close()
         return True
@@ -1,52 +1,52 @@
-import urllib.request
-import urllib.parse
 import json
 import time
 
+import httpx
+
 BASE_URL = "http://localhost:8000"
 
+# Reuse one keep-alive connection for the whole batch so the measured
+# latency reflects the server, not a fresh TCP handshake per query
+session = httpx.Client(base_url=BASE_URL, timeout=10.0)
+
 def test_query(query, expected_metric=None):
     print(f"\n🔍 Testing Query: '{query}'")
-    url = f"{BASE_URL}/api/v1/search"
     payload = {
         "query": query,
         "top_k": 5
     }
-    data = json.dumps(payload).encode('utf-8')
-    
-    req = urllib.request.Request(url, data=data, headers={'Content-Type': 'application/json'})
     
     try:
-        start_time = time.time()
-        with urllib.request.urlopen(req) as response:
-            body = response.read().decode('utf-8')
-            end_time = time.time()
-            
-            if response.status == 200:
-                print(f"✅ Success ({response.status}) - {end_time - start_time:.4f}s")
-                try:
-                    res_json = json.loads(body)
-                except json.JSONDecodeError:
-                    print(f"❌ Failed to decode JSON response: {body}")
-                    return
+        start_time = time.perf_counter()
+        response = session.post("/api/v1/search", json=payload)
+        end_time = time.perf_counter()
+        body = response.text
+        
+        if response.status_code == 200:
+            print(f"✅ Success ({response.status_code}) - {end_time - start_time:.4f}s")
+            try:
+                res_json = json.loads(body)
+            except json.JSONDecodeError:
+                print(f"❌ Failed to decode JSON response: {body}")
+                return
 
-                if expected_metric:
-                    candidates = res_json.get("candidates", [])
-                    found = any(c["name"] == expected_metric for c in candidates)
-                    if found:
-                        print(f"   [PASS] Found expected metric: {expected_metric}")
-                    else:
-                        print(f"   [FAIL] Expected metric '{expected_metric}' not found in top results")
-                
-                if res_json.get("intent"):
-                    intent = res_json["intent"]
-                    print(f"   Intent: {intent.get('core_query')}")
-                    if intent.get("time_range"):
-                        print(f"   Time Range: {intent.get('time_range')}")
-                    if intent.get("dimensions"):
-                        print(f"   Dimensions: {intent.get('dimensions')}")
-            else:
-                print(f"❌ Failed ({response.status}): {body}")
+            if expected_metric:
+                candidates = res_json.get("candidates", [])
+                found = any(c["name"] == expected_metric for c in candidates)
+                if found:
+                    print(f"   [PASS] Found expected metric: {expected_metric}")
+                else:
+                    print(f"   [FAIL] Expected metric '{expected_metric}' not found in top results")
+            
+            if res_json.get("intent"):
+                intent = res_json["intent"]
+                print(f"   Intent: {intent.get('core_query')}")
+                if intent.get("time_range"):
+                    print(f"   Time Range: {intent.get('time_range')}")
+                if intent.get("dimensions"):
+                    print(f"   Dimensions: {intent.get('dimensions')}")
+        else:
+            print(f"❌ Failed ({response.status_code}): {body}")
             
     except Exception as e:
         print(f"❌ Exception: {e}")
@@ -56,11 +56,10 @@ def main():
     # Simple check loop
     for _ in range(10):
         try:
-            with urllib.request.urlopen(f"{BASE_URL}/health") as response:
-                if response.status == 200:
-                    print("Server is up!")
-                    break
-        except:
+            if session.get("/health").status_code == 200:
+                print("Server is up!")
+                break
+        except httpx.HTTPError:
             time.sleep(1)
     else:
         print("Server failed to start.")
@@ -71,6 +70,7 @@ def main():
     test_query("DAU", "DAU")
     test_query("按地区统计用户活跃度", "DAU")
     test_query("为什么转化率下降了？", "转化率")
+    session.close()
 
 if __name__ == "__main__":
     main()
@@ -1,8 +1,16 @@
 
+import logging
 import requests
 import json
 import sys
 
+logging.basicConfig(level=logging.INFO, format="%(message)s")
+logger = logging.getLogger(__name__)
+
+# Reuse one keep-alive connection across queries so latency numbers
+# are not inflated by a TCP handshake per request
+session = requests.Session()
+
 def test_v3_query():
     url = "http://localhost:8000/api/v3/query"
     
@@ -10,56 +18,56 @@ def test_v3_query():
     query = "User Activity trends"
     payload = {"query": query}
     
-    print(f"Testing Query: '{query}'")
+    logger.info(f"Testing Query: '{query}'")
     try:
-        response = requests.post(url, json=payload)
+        response = session.post(url, json=payload)
         response.raise_for_status()
         data = response.json()
         
         # Verify Intent
         core_query = data['intent']['core_query']
-        print(f"  -> Identified Metric: {core_query}")
+        logger.info(f"  -> Identified Metric: {core_query}")
         
         if "DAU" in core_query or "活跃用户" in core_query:
-            print("  ✅ Semantic Mapping Success: 'User Activity' -> 'DAU'")
+            logger.info("  ✅ Semantic Mapping Success: 'User Activity' -> 'DAU'")
         else:
-            print(f"  ❌ Semantic Mapping Failed. Expected DAU/活跃用户, got '{core_query}'")
+            logger.error(f"  ❌ Semantic Mapping Failed. Expected DAU/活跃用户, got '{core_query}'")
             # Don't exit yet, check other fields
             
         # Verify Response Structure
         expected_fields = ['conversation_id', 'intent', 'data', 'all_layers', 'mql', 'sql', 'interpretation']
         missing = [f for f in expected_fields if f not in data]
         if not missing:
-            print("  ✅ Response Structure Valid (All fields present)")
+            logger.info("  ✅ Response Structure Valid (All fields present)")
         else:
-            print(f"  ❌ Missing Fields: {missing}")
+            logger.error(f"  ❌ Missing Fields: {missing}")
 
         # Verify Data
         if data['data'] and len(data['data']) > 0:
-            print(f"  ✅ Data Returned: {len(data['data'])} rows")
+            logger.info(f"  ✅ Data Returned: {len(data['data'])} rows")
         else:
-            print("  ⚠️ No Data Returned")
+            logger.warning("  ⚠️ No Data Returned")
 
         # Verify Layers (Transparency)
         if data['all_layers']:
-            print(f"  ✅ Layers Info Returned: {len(data['all_layers'])} layers")
+            logger.info(f"  ✅ Layers Info Returned: {len(data['all_layers'])} layers")
             for layer in data['all_layers']:
-                print(f"    - {layer['layer_name']}: {layer['status']}")
+                logger.debug(f"    - {layer['layer_name']}: {layer['status']}")
         else:
-            print("  ❌ No Layer Info")
+            logger.error("  ❌ No Layer Info")
 
     except Exception as e:
-        print(f"  ❌ Request Failed: {e}")
+        logger.error(f"  ❌ Request Failed: {e}")
         return False
 
     return True
 
 if __name__ == "__main__":
-    print("🚀 Verifying V3 API Implementation...")
+    logger.info("🚀 Verifying V3 API Implementation...")
     success = test_v3_query()
     if success:
-        print("\n✅ Verification Passed!")
+        logger.info("\n✅ Verification Passed!")
         sys.exit(0)
     else:
-        print("\n❌ Verification Failed!")
+        logger.error("\n❌ Verification Failed!")
         sys.exit(1)
@@ -1,52 +1,70 @@
 
-import requests
+import asyncio
+import logging
+import httpx
 import json
-import time
 
-BASE_URL = "http://localhost:8000/api/v3/query"
+logging.basicConfig(level=logging.INFO, format="%(message)s")
+logger = logging.getLogger(__name__)
 
-def test_query(query, expected_dims=None):
-    print(f"\n🔍 Testing LLM Query: '{query}'")
+BASE_URL = "http://localhost:8000"
+QUERY_PATH = "/api/v3/query"
+
+async def test_query(client, query, expected_dims=None):
     payload = {"query": query}
     try:
-        response = requests.post(BASE_URL, json=payload)
+        response = await client.post(QUERY_PATH, json=payload)
+        # Log the header only once the response is in, so the concurrent
+        # cases print as contiguous blocks
+        logger.info(f"\n🔍 Testing LLM Query: '{query}'")
         if response.status_code == 200:
             data = response.json()
             metric_name = data['intent']['core_query']
             dimensions = data['intent']['dimensions']
             time_range = data['intent']['time_range']
             
-            print(f"   Metric: {metric_name}")
-            print(f"   Dimensions: {dimensions}")
-            print(f"   Time Range: {time_range}")
-            
-            # Check L3 metadata
-            for layer in data['all_layers']:
-                if "L3" in layer['layer_name']:
-                    metadata = layer['metadata']
-                    print(f"   🧠 LLM Model: {metadata.get('llm_model', 'N/A')}")
-                    print(f"   🔢 Tokens: {metadata.get('tokens', 'N/A')}")
-                    print(f"   ⏱️ Latency: {layer.get('duration', 'N/A'):.2f}ms")
-                    print(f"   🔌 Real LLM: {metadata.get('real_llm', 'N/A')}")
+            logger.info(f"   Metric: {metric_name}")
+            logger.info(f"   Dimensions: {dimensions}")
+            logger.info(f"   Time Range: {time_range}")
+
+            # Check L3 metadata (per-layer details only at DEBUG level)
+            if logger.isEnabledFor(logging.DEBUG):
+                for layer in data['all_layers']:
+                    if "L3" in layer['layer_name']:
+                        metadata = layer['metadata']
+                        logger.debug("\n".join([
+                            f"   🧠 LLM Model: {metadata.get('llm_model', 'N/A')}",
+                            f"   🔢 Tokens: {metadata.get('tokens', 'N/A')}",
+                            f"   ⏱️ Latency: {layer.get('duration', 'N/A'):.2f}ms",
+                            f"   🔌 Real LLM: {metadata.get('real_llm', 'N/A')}",
+                        ]))
             
             if expected_dims and set(expected_dims) == set(dimensions):
-                print("   🎉 Result: PASS (Dimensions Match)")
+                logger.info("   🎉 Result: PASS (Dimensions Match)")
             elif expected_dims:
-                print(f"   ⚠️ Result: MISMATCH (Expected: {expected_dims})")
+                logger.warning(f"   ⚠️ Result: MISMATCH (Expected: {expected_dims})")
             else:
-                print("   ✅ Result: OK")
+                logger.info("   ✅ Result: OK")
                 
         else:
-            print(f"   ❌ Error: {response.status_code} - {response.text}")
+            logger.error(f"   ❌ Error: {response.status_code} - {response.text}")
     except Exception as e:
-        print(f"   ❌ Connection Error: {e}")
+        logger.error(f"\n🔍 Testing LLM Query: '{query}'")
+        logger.error(f"   ❌ Connection Error: {e}")
 
-if __name__ == "__main__":
+async def main():
     # Give server a moment to reload
-    print("Waiting for server reload...")
-    time.sleep(2)
-    
-    # Test cases
-    test_query("本月按渠道统计DAU", expected_dims=["渠道"])
-    test_query("按地区的成交金额同比", expected_dims=["地区"])
-    test_query("最近7天的GMV")
+    logger.info("Waiting for server reload...")
+    await asyncio.sleep(2)
+
+    # Test cases are independent: run them concurrently on one shared
+    # keep-alive client, so wall clock is max(latency) rather than the sum
+    async with httpx.AsyncClient(base_url=BASE_URL, timeout=30) as client:
+        await asyncio.gather(
+            test_query(client, "本月按渠道统计DAU", expected_dims=["渠道"]),
+            test_query(client, "按地区的成交金额同比", expected_dims=["地区"]),
+            test_query(client, "最近7天的GMV"),
+        )
+
+if __name__ == "__main__":
+    asyncio.run(main())
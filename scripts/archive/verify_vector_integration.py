@@ -2,14 +2,38 @@
 import requests
 import json
 import time
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 BASE_URL = "http://localhost:8000/api/v3/query"
+HEALTH_URL = "http://localhost:8000/health"
+
+# Pooled keep-alive session; retries with backoff absorb transient connection
+# errors (queries are read-only, so retrying POST is safe)
+session = requests.Session()
+session.mount("http://", HTTPAdapter(
+    pool_connections=10,
+    pool_maxsize=10,
+    max_retries=Retry(total=3, backoff_factor=0.2, allowed_methods=None),
+))
+
+def wait_for_server(timeout=30.0, interval=0.5):
+    """Poll /health until the server answers 200 or the timeout elapses."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if session.get(HEALTH_URL, timeout=2).status_code == 200:
+                return True
+        except requests.RequestException:
+            pass
+        time.sleep(interval)
+    return False
 
 def test_query(query, expected_metric):
     print(f"\n🔍 Testing Query: '{query}'")
     payload = {"query": query}
     try:
-        response = requests.post(BASE_URL, json=payload)
+        response = session.post(BASE_URL, json=payload, timeout=10)
         if response.status_code == 200:
             data = response.json()
             metric_name = data['intent']['core_query']
@@ -39,10 +63,12 @@ def test_query(query, expected_metric):
         print(f"   ❌ Connection Error: {e}")
 
 if __name__ == "__main__":
-    # Give server a moment to reload
+    # Wait for the server to finish (re)loading instead of a fixed sleep
     print("Waiting for server reload...")
-    time.sleep(2)
-    
+    if not wait_for_server():
+        print("❌ Server not ready after 30s")
+        raise SystemExit(1)
+
     # Test cases unlikely to be in hardcoded map
     test_query("how much did we sell", "GMV")
     test_query("money made", "Revenue") # Or GMV
@@ -21,14 +21,29 @@ Usage:
 """
 
 import asyncio
-import json
+import hashlib
 import time
 from typing import List
 
 import httpx
+import orjson
 import typer
 
 
+def content_hash(metric: dict) -> str:
+    """计算指标内容指纹（规范化 JSON 的 SHA-256）.
+
+    服务端据此判断指标是否未变更，从而跳过 GLM 摘要生成。
+
+    Args:
+        metric: 指标字典（不含 content_hash）
+
+    Returns:
+        十六进制摘要
+    """
+    return hashlib.sha256(orjson.dumps(metric, option=orjson.OPT_SORT_KEYS)).hexdigest()
+
+
 # ========== 示例数据 ==========
 
 EXAMPLE_METRICS = [
@@ -120,7 +135,15 @@ class MetricImportClient:
             base_url: API 基础 URL
         """
         self.base_url = base_url
-        self.client = httpx.AsyncClient(timeout=60.0)
+        # 复用长连接：健康检查、批量提交和任务轮询共享同一连接池；
+        # 连接池参数需设在 transport 上（显式传入 transport 时 Client 级参数不生效）
+        self.client = httpx.AsyncClient(
+            timeout=httpx.Timeout(60.0, connect=5.0),
+            transport=httpx.AsyncHTTPTransport(
+                retries=2,
+                limits=httpx.Limits(max_keepalive_connections=100, max_connections=200),
+            ),
+        )
 
     async def close(self):
         """关闭客户端."""
@@ -159,7 +182,9 @@ class MetricImportClient:
             导入结果
         """
         payload = {
-            "metrics": metrics,
+            "metrics": [
+                {**m, "content_hash": content_hash(m)} for m in metrics
+            ],
             "generate_summary": generate_summary,
             "index_to_graph": index_to_graph,
             "index_to_vector": index_to_vector,
@@ -173,6 +198,37 @@ class MetricImportClient:
         response.raise_for_status()
         return response.json()
 
+    async def batch_import_stream(
+        self,
+        metrics: List[dict],
+        chunk_size: int = 200,
+        window: int = 4,
+        **options
+    ) -> List[str]:
+        """分块提交批量导入，最多 window 个请求同时在途.
+
+        大列表按 chunk_size 切块分别建任务，服务端处理前一块时客户端继续提交后续块；
+        信号量限制在途请求数，避免一次性全部发出.
+
+        Args:
+            metrics: 指标列表
+            chunk_size: 每个导入任务的指标数
+            window: 同时在途的提交请求数
+            **options: 透传给 batch_import 的参数
+
+        Returns:
+            各块的任务 ID 列表（与块顺序一致）
+        """
+        sem = asyncio.Semaphore(window)
+
+        async def submit(chunk: List[dict]) -> str:
+            async with sem:
+                result = await self.batch_import(chunk, **options)
+                return result.get("task_id")
+
+        chunks = [metrics[i:i + chunk_size] for i in range(0, len(metrics), chunk_size)]
+        return await asyncio.gather(*(submit(chunk) for chunk in chunks))
+
     async def get_task_status(self, task_id: str) -> dict:
         """获取任务状态.
 
@@ -191,32 +247,47 @@ class MetricImportClient:
     async def wait_for_task(
         self,
         task_id: str,
-        poll_interval: float = 1.0,
+        poll_interval: float = 0.25,
+        max_poll_interval: float = 5.0,
         timeout: float = 300.0
     ) -> dict:
-        """等待任务完成.
+        """等待任务完成（自适应轮询）.
+
+        进度无变化时轮询间隔翻倍（不超过 max_poll_interval），
+        进度推进后恢复为 poll_interval，长任务下大幅减少轮询请求.
 
         Args:
             task_id: 任务 ID
-            poll_interval: 轮询间隔（秒）
+            poll_interval: 初始轮询间隔（秒）
+            max_poll_interval: 最大轮询间隔（秒）
             timeout: 超时时间（秒）
 
         Returns:
             最终任务状态
         """
-        start = time.time()
+        deadline = time.monotonic() + timeout
+        interval = poll_interval
+        last_progress = None
 
-        while time.time() - start < timeout:
+        while True:
             task_status = await self.get_task_status(task_id)
 
             if task_status["status"] in ["completed", "failed"]:
                 return task_status
 
-            # 显示进度
-            progress = task_status.get("progress", 0) * 100
-            print(f"  进度: {progress:.1f}% - {task_status.get('message', '')}")
+            progress = task_status.get("progress", 0)
+            if progress != last_progress:
+                # 显示进度，并恢复快速轮询
+                print(f"  进度: {progress * 100:.1f}% - {task_status.get('message', '')}")
+                last_progress = progress
+                interval = poll_interval
+            else:
+                interval = min(interval * 2, max_poll_interval)
 
-            await asyncio.sleep(poll_interval)
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            await asyncio.sleep(min(interval, remaining))
 
         raise TimeoutError(f"任务 {task_id} 在 {timeout} 秒后仍未完成")
 
@@ -233,20 +304,29 @@ def main(
     no_summary: bool = typer.Option(False, "--no-summary", help="不生成 GLM 摘要"),
     summary_only: bool = typer.Option(False, "--summary-only", help="仅生成摘要，不入库"),
     batch_size: int = typer.Option(5, "--batch-size", "-b", help="批处理大小"),
+    chunk_size: int = typer.Option(200, "--chunk-size", help="每个导入任务的指标数"),
+    window: int = typer.Option(4, "--window", help="同时在途的提交请求数"),
     url: str = typer.Option("http://localhost:8000", "--url", "-u", help="API 服务地址")
 ):
     """批量导入指标到系统."""
     # 加载数据
     if file:
         print(f"📂 从文件加载指标数据: {file}")
-        with open(file, "r", encoding="utf-8") as f:
-            metrics = json.load(f)
+        with open(file, "rb") as f:
+            metrics = orjson.loads(f.read())
     else:
         print("📋 使用示例指标数据")
         metrics = EXAMPLE_METRICS
 
     print(f"✅ 共加载 {len(metrics)} 个指标")
 
+    # 有 uvloop 时用它驱动事件循环，降低大量轮询协程的调度开销
+    try:
+        import uvloop
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    except ImportError:
+        pass
+
     # 运行异步导入
     asyncio.run(import_metrics(
         metrics=metrics,
@@ -254,7 +334,9 @@ def main(
         generate_summary=not no_summary,
         index_to_graph=not summary_only,
         index_to_vector=not summary_only,
-        batch_size=batch_size
+        batch_size=batch_size,
+        chunk_size=chunk_size,
+        window=window
     ))
 
 
@@ -264,7 +346,9 @@ async def import_metrics(
     generate_summary: bool,
     index_to_graph: bool,
     index_to_vector: bool,
-    batch_size: int
+    batch_size: int,
+    chunk_size: int = 200,
+    window: int = 4
 ):
     """执行导入逻辑."""
     client = MetricImportClient(base_url)
@@ -288,36 +372,57 @@ async def import_metrics(
         print(f"   - 入库图谱: {'是' if index_to_graph else '否'}")
         print(f"   - 入库向量: {'是' if index_to_vector else '否'}")
         print(f"   - 批处理大小: {batch_size}")
+        print(f"   - 分块大小: {chunk_size}（最多 {window} 块同时提交）")
 
         start = time.time()
-        result = await client.batch_import(
-            metrics=metrics,
+        task_ids = await client.batch_import_stream(
+            metrics,
+            chunk_size=chunk_size,
+            window=window,
             generate_summary=generate_summary,
             index_to_graph=index_to_graph,
             index_to_vector=index_to_vector,
             batch_size=batch_size
         )
+        print(f"   ✅ 已提交 {len(task_ids)} 个任务: {', '.join(task_ids)}")
 
-        task_id = result.get("task_id")
-        print(f"   ✅ 任务已提交: {task_id}")
-
-        # 3. 等待完成
+        # 3. 等待完成（先完成的先汇总）
         print("\n3️⃣  等待任务完成...")
-        final_status = await client.wait_for_task(task_id)
+        # 字段与服务端 ImportResult 一致：total / success / failed / failed_ids
+        totals = {"total": 0, "success": 0, "failed": 0}
+        failed_ids = []
+        task_errors = []
+        statuses = []
+        for finished in asyncio.as_completed([client.wait_for_task(t) for t in task_ids]):
+            final_status = await finished
+            statuses.append(final_status["status"])
+            task_result = final_status.get("result") or {}
+            for key in totals:
+                totals[key] += task_result.get(key, 0)
+            failed_ids.extend(task_result.get("failed_ids") or [])
+            if final_status.get("error"):
+                task_errors.append(final_status["error"])
 
         elapsed = time.time() - start
 
         # 4. 显示结果
         print("\n4️⃣  导入结果:")
-        print(f"   - 状态: {final_status['status']}")
-        print(f"   - 总数: {final_status['result']['total'] if final_status['result'] else 'N/A'}")
-        print(f"   - 成功: {final_status['result']['succeeded'] if final_status['result'] else 'N/A'}")
-        print(f"   - 失败: {final_status['result']['failed'] if final_status['result'] else 'N/A'}")
+        print(f"   - 状态: {'completed' if all(st == 'completed' for st in statuses) else 'failed'}")
+        print(f"   - 总数: {totals['total']}")
+        print(f"   - 成功: {totals['success']}")
+        print(f"   - 失败: {totals['failed']}")
         print(f"   - 耗时: {elapsed:.2f} 秒")
 
-        if final_status['result'] and final_status['result'].get('errors'):
-            print("\n⚠️  错误列表:")
-            for error in final_status['result']['errors'][:5]:  # 只显示前5个
+        if failed_ids:
+            print("\n⚠️  失败指标:")
+            for metric_id in failed_ids[:5]:  # 只显示前5个
+                print(f"   - {metric_id}")
+            if len(failed_ids) > 5:
+                print(f"   ... 共 {len(failed_ids)} 个")
+
+        if task_errors:
+            print("\n⚠️  任务错误:")
+            for error in task_errors[:5]:
                 print(f"   - {error}")
 
         print("\n✨ 导入完成!")
@@ -338,8 +443,8 @@ async def import_metrics(
 @app.command()
 def export_example(output: str = typer.Option("metrics_example.json", "--output", "-o", help="输出文件路径")):
     """导出示例指标数据到 JSON 文件."""
-    with open(output, "w", encoding="utf-8") as f:
-        json.dump(EXAMPLE_METRICS, f, ensure_ascii=False, indent=2)
+    with open(output, "wb") as f:
+        f.write(orjson.dumps(EXAMPLE_METRICS, option=orjson.OPT_INDENT_2))
     print(f"✅ 已导出 {len(EXAMPLE_METRICS)} 个示例指标到: {output}")
     print(f"\n📝 编辑该文件后，使用以下命令导入:")
     print(f"   python scripts/batch_import_metrics.py --file {output}")
@@ -26,11 +26,9 @@ def ingest_graph_data():
         
         # 4. 写入数据
         print("🔄 Ingesting metrics...")
-        for metric in metrics_metadata:
-            store.upsert_metric(metric)
-            print(f"   - Ingested: {metric['name']} ({metric['code']})")
+        count = store.upsert_metrics_batch(metrics_metadata)
         
-        print(f"✅ Successfully ingested {len(metrics_metadata)} metrics into Neo4j.")
+        print(f"✅ Successfully ingested {count} metrics into Neo4j.")
         
     except Exception as e:
         print(f"❌ Ingestion failed: {e}")
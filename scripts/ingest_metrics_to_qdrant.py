@@ -1,17 +1,26 @@
 
 import sys
 import os
+from concurrent.futures import ThreadPoolExecutor
 from typing import List
 
+from pydantic import TypeAdapter
+
 # Add project root to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from src.config.settings import settings
+from src.config.settings import QdrantConfig, settings
 from src.config import metric_loader
 from src.recall.vector.qdrant_store import QdrantVectorStore
 from src.recall.vector.vectorizer import MetricVectorizer
 from src.recall.vector.models import MetricMetadata
 
+# Serializes the whole metric list in one pydantic-core call
+METRIC_LIST_ADAPTER = TypeAdapter(list[MetricMetadata])
+
+# Metrics embedded per step of the streaming ingest
+CHUNK_SIZE = 1024
+
 def ingest_metrics():
     print("🚀 Starting Metric Ingestion to Qdrant...")
     
@@ -37,7 +46,8 @@ def ingest_metrics():
             
     # 3. Initialize Vector Components
     try:
-        store = QdrantVectorStore()
+        # Bulk ingest goes over gRPC for higher upload throughput
+        store = QdrantVectorStore(QdrantConfig(prefer_grpc=True))
         # Verify connection
         client = store.connect()
         collection_info = client.get_collections()
@@ -51,17 +61,43 @@ def ingest_metrics():
     print(f"🧠 Initialized Vectorizer ({vectorizer.model_name})")
 
     # 4. Create Collection
-    store.create_collection(vector_size=vectorizer.embedding_dim, recreate=True)
+    # Bulk mode: skip HNSW building while uploading, index once afterwards
+    store.create_collection(vector_size=vectorizer.embedding_dim, recreate=True, bulk_mode=True)
     print("✨ Created collection 'metrics'")
 
-    # 5. Vectorize and Upsert
+    # 5. Vectorize and Upsert (streamed: only one chunk of vectors is held in memory)
     print("🔄 Vectorizing metrics (this may take a moment)...")
-    vectors = vectorizer.vectorize_batch(metric_objects)
-    
-    ids = [m.code for m in metric_objects]
-    payloads = [m.model_dump() for m in metric_objects] # Use model_dump for Pydantic v2
-    
-    count = store.upsert(ids, vectors, payloads)
+
+    def points():
+        # Pipeline: chunk k+1 is encoded and dumped on worker threads while
+        # chunk k is being uploaded (encode releases the GIL)
+        chunks = [
+            metric_objects[start:start + CHUNK_SIZE]
+            for start in range(0, len(metric_objects), CHUNK_SIZE)
+        ]
+
+        def submit(ex, chunk):
+            return (
+                ex.submit(vectorizer.vectorize_batch, chunk, show_progress=False, batch_size=128),
+                ex.submit(METRIC_LIST_ADAPTER.dump_python, chunk),
+            )
+
+        with ThreadPoolExecutor(max_workers=2) as ex:
+            pending = submit(ex, chunks[0]) if chunks else None
+            for k in range(len(chunks)):
+                vectors, payloads = (f.result() for f in pending)
+                if k + 1 < len(chunks):
+                    pending = submit(ex, chunks[k + 1])
+                yield from zip((p['code'] for p in payloads), vectors, payloads)
+
+    try:
+        count = store.upload_stream(points(), batch_size=256)
+    finally:
+        # Always leave bulk mode, even on failure, so the collection is not
+        # stuck at m=0 / indexing_threshold=0 serving full scans
+        print("🏗️ Building HNSW index...")
+        if not store.finish_bulk_load():
+            print("⚠️ Index is still building; searches fall back to full scan until it is ready.")
     print(f"✅ Successfully ingested {count} metrics into Qdrant.")
 
 if __name__ == "__main__":
@@ -13,6 +13,12 @@ from src.recall.graph.graph_store import GraphStore
 from src.recall.graph.importer import GraphImporter, SAMPLE_DOMAINS, SAMPLE_METRICS, SAMPLE_RELATIONS
 from src.recall.graph.neo4j_client import Neo4jClient
 
+COUNT_QUERY = """
+CALL { MATCH (n) RETURN count(n) AS nodes }
+CALL { MATCH ()-[r]->() RETURN count(r) AS rels }
+RETURN nodes, rels
+"""
+
 
 def main() -> None:
     """主函数."""
@@ -69,15 +75,11 @@ def main() -> None:
     print("📊 数据验证")
     print("=" * 60)
 
-    # 统计节点数
-    result = client.execute_query("MATCH (n) RETURN count(n) as count")
-    total_nodes = result[0]["count"]
-    print(f"\n总节点数: {total_nodes}")
-
-    # 统计关系数
-    result = client.execute_query("MATCH ()-[r]->() RETURN count(r) as count")
-    total_rels = result[0]["count"]
-    print(f"总关系数: {total_rels}")
+    # 节点数和关系数在同一会话中一次查询（两个子查询均走计数存储，不做笛卡尔积）
+    with client.connect().session() as session:
+        record = session.run(COUNT_QUERY).single()
+    print(f"\n总节点数: {record['nodes']}")
+    print(f"总关系数: {record['rels']}")
 
     # 示例查询
     print("\n示例查询 - 查找 '用户' 域的指标:")
@@ -6,8 +6,11 @@
 """
 
 import logging
-import random
-from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from typing import Optional
+
+import numpy as np
 
 from src.database.postgres_client import PostgreSQLClient
 from src.config import settings
@@ -19,9 +22,15 @@ logger = logging.getLogger(__name__)
 class TestDataInitializer:
     """测试数据初始化器."""
 
-    def __init__(self):
-        """初始化."""
+    def __init__(self, seed: Optional[int] = None):
+        """初始化.
+
+        Args:
+            seed: 随机种子（用于生成可复现的数据）
+        """
         self.postgres = PostgreSQLClient()
+        self.seed_seq = np.random.SeedSequence(seed)
+        self.rng = np.random.default_rng(self.seed_seq)
 
     def init_all_data(self, days: int = 30):
         """初始化所有测试数据.
@@ -31,26 +40,26 @@ class TestDataInitializer:
         """
         logger.info(f"开始初始化测试数据（最近{days}天）")
 
-        try:
-            # 1. 初始化订单数据
-            self._init_order_data(days)
-            logger.info("✅ 订单数据初始化完成")
-
-            # 2. 初始化用户活动数据
-            self._init_user_activity_data(days)
-            logger.info("✅ 用户活动数据初始化完成")
-
-            # 3. 初始化流量数据
-            self._init_traffic_data(days)
-            logger.info("✅ 流量数据初始化完成")
+        # 五张事实表互不依赖，并发生成与写入；NumPy 批量运算和 COPY 的网络 I/O 都会释放 GIL
+        tasks = {
+            "订单": self._init_order_data,
+            "用户活动": self._init_user_activity_data,
+            "流量": self._init_traffic_data,
+            "营收": self._init_revenue_data,
+            "财务": self._init_finance_data,
+        }
+        # Generator 不是线程安全的，每个任务使用独立的子随机流
+        rngs = [np.random.default_rng(s) for s in self.seed_seq.spawn(len(tasks))]
 
-            # 4. 初始化营收数据
-            self._init_revenue_data(days)
-            logger.info("✅ 营收数据初始化完成")
-
-            # 5. 初始化财务数据
-            self._init_finance_data(days)
-            logger.info("✅ 财务数据初始化完成")
+        try:
+            with ThreadPoolExecutor(max_workers=len(tasks)) as executor:
+                futures = {
+                    executor.submit(init_fn, days, rng): name
+                    for (name, init_fn), rng in zip(tasks.items(), rngs)
+                }
+                for future in as_completed(futures):
+                    future.result()
+                    logger.info(f"✅ {futures[future]}数据初始化完成")
 
             logger.info("\n" + "=" * 60)
             logger.info("所有测试数据初始化完成！")
@@ -60,304 +69,189 @@ class TestDataInitializer:
             logger.error(f"初始化失败: {e}")
             raise
 
-    def _init_order_data(self, days: int):
+    def _date_axis(self, days: int) -> tuple[np.ndarray, np.ndarray]:
+        """生成最近 days 天（含首尾）的日期字符串及星期几.
+
+        Returns:
+            (date_ids, weekdays) 两个等长数组
+        """
+        # datetime64[D] 整数运算生成整段日期，不逐天调用 strftime / weekday
+        start_date = np.datetime64(datetime.now().date(), "D") - days
+        dates = start_date + np.arange(days + 1)
+        date_ids = dates.astype(str)
+        # 1970-01-01 是星期四（weekday() == 3）
+        weekdays = (dates.astype(np.int64) + 3) % 7
+        return date_ids, weekdays
+
+    def _copy_in_batches(self, table: str, columns: dict, batch_size: int = 10000):
+        """将列式数组按行分批 COPY 到事实表.
+
+        Args:
+            table: 目标表名
+            columns: 列名到等长数组的映射（顺序即 COPY 列顺序）
+            batch_size: 每批行数
+        """
+        # 按批切片列数组再 tolist()，行元组由 zip 惰性产生并直接写入 CSV 流，
+        # 不再先拼出整表的元组列表、再逐批切片复制
+        names = list(columns)
+        total = len(columns[names[0]])
+        for i in range(0, total, batch_size):
+            rows = zip(*(columns[n][i:i + batch_size].tolist() for n in names))
+            self.postgres.copy_from_records(table, names, rows)
+
+    def _init_order_data(self, days: int, rng: Optional[np.random.Generator] = None):
         """初始化订单事实表数据.
 
         生成约10,000条订单记录（约330条/天）
         """
         logger.info("正在生成订单数据...")
 
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=days)
-
-        batch_size = 1000
-        batch = []
-        order_id = 1000000
-
-        current_date = start_date
-        while current_date <= end_date:
-            # 每天生成约330条订单
-            for _ in range(330):
-                order_id += 1
-
-                # 随机生成订单数据
-                order_amount = random.uniform(50, 5000)
-                # 周末和节假日订单量增加
-                if current_date.weekday() >= 5:
-                    order_amount *= random.uniform(1.1, 1.3)
-
-                batch.append({
-                    "order_id": order_id,
-                    "date_id": current_date.strftime("%Y-%m-%d"),
-                    "region_id": random.randint(1, 5),  # 5个地区
-                    "category_id": random.randint(1, 6),  # 6个品类
-                    "channel_id": random.randint(1, 4),  # 4个渠道
-                    "user_level_id": random.randint(1, 4),  # 4个用户等级
-                    "order_amount": round(order_amount, 2),
-                    "quantity": random.randint(1, 5),
-                    "is_paid": random.choice([True, True, True, False]),  # 75%支付率
-                    "is_refunded": random.choice([True, False, False, False, False])  # 20%退款率
-                })
-
-                # 批量插入
-                if len(batch) >= batch_size:
-                    self._batch_insert_orders(batch)
-                    batch = []
-
-            current_date += timedelta(days=1)
-
-        # 插入剩余数据
-        if batch:
-            self._batch_insert_orders(batch)
-
-    def _batch_insert_orders(self, batch: list):
-        """批量插入订单数据."""
-        sql = """
-            INSERT INTO fact_orders (
-                order_id, date_id, region_id, category_id, channel_id,
-                user_level_id, order_amount, quantity, is_paid, is_refunded
-            ) VALUES (
-                %(order_id)s, %(date_id)s, %(region_id)s, %(category_id)s,
-                %(channel_id)s, %(user_level_id)s, %(order_amount)s,
-                %(quantity)s, %(is_paid)s, %(is_refunded)s
-            )
-        """
-        self.postgres.execute_batch(sql, batch)
-
-    def _init_user_activity_data(self, days: int):
+        date_ids, weekdays = self._date_axis(days)
+        # 每天生成约330条订单
+        day = np.repeat(np.arange(len(date_ids)), 330)
+        n = len(day)
+        rng = self.rng if rng is None else rng
+
+        order_amount = rng.uniform(50, 5000, n)
+        # 周末和节假日订单量增加：先按天算出周末查找表，再按行索引
+        is_weekend = weekdays >= 5
+        weekend = is_weekend[day]
+        order_amount[weekend] *= rng.uniform(1.1, 1.3, weekend.sum())
+
+        self._copy_in_batches("fact_orders", {
+            "order_id": 1000001 + np.arange(n),
+            "date_id": date_ids[day],
+            "region_id": rng.integers(1, 6, n),  # 5个地区
+            "category_id": rng.integers(1, 7, n),  # 6个品类
+            "channel_id": rng.integers(1, 5, n),  # 4个渠道
+            "user_level_id": rng.integers(1, 5, n),  # 4个用户等级
+            "order_amount": order_amount.round(2),
+            "quantity": rng.integers(1, 6, n),
+            "is_paid": rng.random(n) < 0.75,  # 75%支付率
+            "is_refunded": rng.random(n) < 0.2,  # 20%退款率
+        })
+
+    def _init_user_activity_data(self, days: int, rng: Optional[np.random.Generator] = None):
         """初始化用户活动事实表数据.
 
         生成约50,000条记录（约1,600条/天）
         """
         logger.info("正在生成用户活动数据...")
 
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=days)
-
-        batch_size = 1000
-        batch = []
-        activity_id = 2000000
-
-        current_date = start_date
-        while current_date <= end_date:
-            # 每天生成约1,600条活动记录
-            for _ in range(1600):
-                activity_id += 1
-
-                is_new_user = random.choice([True] * 10 + [False] * 90)  # 10%新用户
-
-                batch.append({
-                    "activity_id": activity_id,
-                    "date_id": current_date.strftime("%Y-%m-%d"),
-                    "region_id": random.randint(1, 5),
-                    "channel_id": random.randint(1, 4),
-                    "user_level_id": random.randint(1, 4),
-                    "user_id": random.randint(10000, 99999),
-                    "is_new_user": is_new_user,
-                    "activity_count": random.randint(1, 10),
-                    "session_duration_seconds": random.randint(30, 3600),
-                    "page_views": random.randint(1, 50)
-                })
-
-                if len(batch) >= batch_size:
-                    self._batch_insert_user_activities(batch)
-                    batch = []
-
-            current_date += timedelta(days=1)
-
-        if batch:
-            self._batch_insert_user_activities(batch)
-
-    def _batch_insert_user_activities(self, batch: list):
-        """批量插入用户活动数据."""
-        sql = """
-            INSERT INTO fact_user_activity (
-                activity_id, date_id, region_id, channel_id, user_level_id,
-                user_id, is_new_user, activity_count, session_duration_seconds, page_views
-            ) VALUES (
-                %(activity_id)s, %(date_id)s, %(region_id)s, %(channel_id)s,
-                %(user_level_id)s, %(user_id)s, %(is_new_user)s,
-                %(activity_count)s, %(session_duration_seconds)s, %(page_views)s
-            )
-        """
-        self.postgres.execute_batch(sql, batch)
-
-    def _init_traffic_data(self, days: int):
+        date_ids, _ = self._date_axis(days)
+        # 每天生成约1,600条活动记录
+        day = np.repeat(np.arange(len(date_ids)), 1600)
+        n = len(day)
+        rng = self.rng if rng is None else rng
+
+        self._copy_in_batches("fact_user_activity", {
+            "activity_id": 2000001 + np.arange(n),
+            "date_id": date_ids[day],
+            "region_id": rng.integers(1, 6, n),
+            "channel_id": rng.integers(1, 5, n),
+            "user_level_id": rng.integers(1, 5, n),
+            "user_id": rng.integers(10000, 100000, n),
+            "is_new_user": rng.random(n) < 0.1,  # 10%新用户
+            "activity_count": rng.integers(1, 11, n),
+            "session_duration_seconds": rng.integers(30, 3601, n),
+            "page_views": rng.integers(1, 51, n),
+        })
+
+    def _init_traffic_data(self, days: int, rng: Optional[np.random.Generator] = None):
         """初始化流量事实表数据.
 
         生成约30,000条记录（约1,000条/天）
         """
         logger.info("正在生成流量数据...")
 
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=days)
-
-        batch_size = 1000
-        batch = []
-        traffic_id = 3000000
-
-        current_date = start_date
-        while current_date <= end_date:
-            # 每天生成约1,000条流量记录
-            for _ in range(1000):
-                traffic_id += 1
-
-                visitors = random.randint(100, 1000)
-                batch.append({
-                    "traffic_id": traffic_id,
-                    "date_id": current_date.strftime("%Y-%m-%d"),
-                    "region_id": random.randint(1, 5),
-                    "category_id": random.randint(1, 6),
-                    "channel_id": random.randint(1, 4),
-                    "visitors": visitors,
-                    "visits": random.randint(visitors, visitors * 2),
-                    "page_views": random.randint(visitors * 2, visitors * 10),
-                    "unique_visitors": random.randint(int(visitors * 0.8), visitors),
-                    "cart_additions": random.randint(0, int(visitors * 0.3)),
-                    "orders": random.randint(0, int(visitors * 0.1)),
-                    "paid_orders": random.randint(0, int(visitors * 0.08))
-                })
-
-                if len(batch) >= batch_size:
-                    self._batch_insert_traffic(batch)
-                    batch = []
-
-            current_date += timedelta(days=1)
-
-        if batch:
-            self._batch_insert_traffic(batch)
-
-    def _batch_insert_traffic(self, batch: list):
-        """批量插入流量数据."""
-        sql = """
-            INSERT INTO fact_traffic (
-                traffic_id, date_id, region_id, category_id, channel_id,
-                visitors, visits, page_views, unique_visitors,
-                cart_additions, orders, paid_orders
-            ) VALUES (
-                %(traffic_id)s, %(date_id)s, %(region_id)s, %(category_id)s,
-                %(channel_id)s, %(visitors)s, %(visits)s, %(page_views)s,
-                %(unique_visitors)s, %(cart_additions)s, %(orders)s, %(paid_orders)s
-            )
-        """
-        self.postgres.execute_batch(sql, batch)
-
-    def _init_revenue_data(self, days: int):
+        date_ids, _ = self._date_axis(days)
+        # 每天生成约1,000条流量记录
+        day = np.repeat(np.arange(len(date_ids)), 1000)
+        n = len(day)
+        rng = self.rng if rng is None else rng
+
+        # 其余列的取值区间随 visitors 逐行变化，integers 支持数组边界
+        visitors = rng.integers(100, 1001, n)
+        self._copy_in_batches("fact_traffic", {
+            "traffic_id": 3000001 + np.arange(n),
+            "date_id": date_ids[day],
+            "region_id": rng.integers(1, 6, n),
+            "category_id": rng.integers(1, 7, n),
+            "channel_id": rng.integers(1, 5, n),
+            "visitors": visitors,
+            "visits": rng.integers(visitors, visitors * 2 + 1),
+            "page_views": rng.integers(visitors * 2, visitors * 10 + 1),
+            "unique_visitors": rng.integers((visitors * 0.8).astype(int), visitors + 1),
+            "cart_additions": rng.integers(0, (visitors * 0.3).astype(int) + 1),
+            "orders": rng.integers(0, (visitors * 0.1).astype(int) + 1),
+            "paid_orders": rng.integers(0, (visitors * 0.08).astype(int) + 1),
+        })
+
+    def _init_revenue_data(self, days: int, rng: Optional[np.random.Generator] = None):
         """初始化营收事实表数据.
 
         生成约1,000条记录（约35条/天，按地区+渠道分组）
         """
         logger.info("正在生成营收数据...")
 
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=days)
-
-        batch_size = 500
-        batch = []
-        revenue_id = 4000000
-
-        current_date = start_date
-        while current_date <= end_date:
-            # 每天按地区+渠道组合生成数据（5地区 * 4渠道 = 20条/天）
-            for region_id in range(1, 6):
-                for channel_id in range(1, 5):
-                    for user_level_id in range(1, 5):
-                        revenue_id += 1
-
-                        revenue = random.uniform(10000, 100000)
-                        cost = revenue * random.uniform(0.3, 0.7)
-
-                        batch.append({
-                            "revenue_id": revenue_id,
-                            "date_id": current_date.strftime("%Y-%m-%d"),
-                            "region_id": region_id,
-                            "channel_id": channel_id,
-                            "user_level_id": user_level_id,
-                            "revenue": round(revenue, 2),
-                            "cost": round(cost, 2)
-                        })
-
-                        if len(batch) >= batch_size:
-                            self._batch_insert_revenue(batch)
-                            batch = []
-
-            current_date += timedelta(days=1)
-
-        if batch:
-            self._batch_insert_revenue(batch)
-
-    def _batch_insert_revenue(self, batch: list):
-        """批量插入营收数据."""
-        sql = """
-            INSERT INTO fact_revenue (
-                revenue_id, date_id, region_id, channel_id, user_level_id,
-                revenue, cost
-            ) VALUES (
-                %(revenue_id)s, %(date_id)s, %(region_id)s, %(channel_id)s,
-                %(user_level_id)s, %(revenue)s, %(cost)s
+        date_ids, _ = self._date_axis(days)
+        # 每天按地区+渠道组合生成数据（5地区 * 4渠道 = 20条/天）
+        day, region_id, channel_id, user_level_id = (
+            axis.ravel() for axis in np.meshgrid(
+                np.arange(len(date_ids)), np.arange(1, 6), np.arange(1, 5), np.arange(1, 5),
+                indexing="ij",
             )
-        """
-        self.postgres.execute_batch(sql, batch)
-
-    def _init_finance_data(self, days: int):
+        )
+        n = len(day)
+        rng = self.rng if rng is None else rng
+
+        revenue = rng.uniform(10000, 100000, n)
+        cost = revenue * rng.uniform(0.3, 0.7, n)
+
+        self._copy_in_batches("fact_revenue", {
+            "revenue_id": 4000001 + np.arange(n),
+            "date_id": date_ids[day],
+            "region_id": region_id,
+            "channel_id": channel_id,
+            "user_level_id": user_level_id,
+            "revenue": revenue.round(2),
+            "cost": cost.round(2),
+        })
+
+    def _init_finance_data(self, days: int, rng: Optional[np.random.Generator] = None):
         """初始化财务事实表数据.
 
         生成约2,000条记录（约70条/天，按地区+业务线组合）
         """
         logger.info("正在生成财务数据...")
 
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=days)
-
-        batch_size = 500
-        batch = []
-        finance_id = 5000000
-
-        business_lines = ["电商", "SaaS", "广告", "咨询", "其他"]
-        products = ["产品A", "产品B", "产品C", "服务D", "服务E"]
-
-        current_date = start_date
-        while current_date <= end_date:
-            # 每天按地区+业务线+产品组合生成数据
-            for region_id in range(1, 6):
-                for business_line in business_lines:
-                    for product in products:
-                        finance_id += 1
-
-                        revenue = random.uniform(5000, 50000)
-                        cost = revenue * random.uniform(0.4, 0.8)
-
-                        batch.append({
-                            "finance_id": finance_id,
-                            "date_id": current_date.strftime("%Y-%m-%d"),
-                            "region_id": region_id,
-                            "business_line": business_line,
-                            "product_name": product,
-                            "revenue": round(revenue, 2),
-                            "cost": round(cost, 2)
-                        })
-
-                        if len(batch) >= batch_size:
-                            self._batch_insert_finance(batch)
-                            batch = []
-
-            current_date += timedelta(days=1)
-
-        if batch:
-            self._batch_insert_finance(batch)
-
-    def _batch_insert_finance(self, batch: list):
-        """批量插入财务数据."""
-        sql = """
-            INSERT INTO fact_finance (
-                finance_id, date_id, region_id, business_line, product_name,
-                revenue, cost
-            ) VALUES (
-                %(finance_id)s, %(date_id)s, %(region_id)s, %(business_line)s,
-                %(product_name)s, %(revenue)s, %(cost)s
+        business_lines = np.array(["电商", "SaaS", "广告", "咨询", "其他"])
+        products = np.array(["产品A", "产品B", "产品C", "服务D", "服务E"])
+
+        date_ids, _ = self._date_axis(days)
+        # 每天按地区+业务线+产品组合生成数据
+        day, region_id, line_idx, product_idx = (
+            axis.ravel() for axis in np.meshgrid(
+                np.arange(len(date_ids)), np.arange(1, 6),
+                np.arange(len(business_lines)), np.arange(len(products)),
+                indexing="ij",
             )
-        """
-        self.postgres.execute_batch(sql, batch)
+        )
+        n = len(day)
+        rng = self.rng if rng is None else rng
+
+        revenue = rng.uniform(5000, 50000, n)
+        cost = revenue * rng.uniform(0.4, 0.8, n)
+
+        self._copy_in_batches("fact_finance", {
+            "finance_id": 5000001 + np.arange(n),
+            "date_id": date_ids[day],
+            "region_id": region_id,
+            "business_line": business_lines[line_idx],
+            "product_name": products[product_idx],
+            "revenue": revenue.round(2),
+            "cost": cost.round(2),
+        })
 
 
 def main():
@@ -1,25 +1,63 @@
 """生产级意图识别服务器（集成智谱AI）."""
 
+import asyncio
+import dataclasses
+import hashlib
+import json
+import logging
 import os
 import sys
+import tempfile
+from contextlib import asynccontextmanager
 sys.path.insert(0, "/Users/wangzheng/Downloads/playDemo/AntigravityDemo/chatBI")
 
-from datetime import datetime
-from typing import Any, Optional, List
-from fastapi import FastAPI, HTTPException
+from datetime import date, datetime
+from enum import Enum
+from functools import lru_cache
+from time import perf_counter_ns
+from typing import Any, NamedTuple, Optional, List
+from fastapi import FastAPI, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel, Field
+import numpy as np
 import uvicorn
 
 # 导入增强版混合识别器
 from src.inference.enhanced_hybrid import EnhancedHybridIntentRecognizer
 from src.inference.intent import QueryIntent
+from src.inference.recognition_cache import CachedRecognizer, get_query_encoder
 from src.recall.semantic_recall import FallbackSemanticRecall
+from src.config import settings
+
+# 缓存预热会对每条常见查询发起真实的 LLM 调用，默认关闭，设置 CACHE_WARMUP=1 开启
+WARMUP_QUERIES = ["GMV", "DAU", "MAU", "ARPU", "转化率", "最近7天GMV"]
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """应用生命周期管理：按需在启动时预热识别缓存（不在模块导入时执行），退出时释放后台线程.
+
+    Args:
+        app: FastAPI 应用实例
+    """
+    if os.getenv("CACHE_WARMUP") == "1":
+        await asyncio.to_thread(recognition_cache.warmup, WARMUP_QUERIES)
+        logger.info(f"   识别缓存已预热 {len(recognition_cache.exact)} 条")
+    yield
+    # 停止 LLM 微批处理器的后台线程（未启用批处理时为空操作）
+    llm_recognizer = getattr(recognizer, "llm_recognizer", None)
+    if hasattr(llm_recognizer, "close"):
+        llm_recognizer.close()
+
 
 app = FastAPI(
     title="智能问数系统 - 生产版",
     version="2.0",
-    description="基于智谱AI + BGE-M3的企业级意图识别系统"
+    description="基于智谱AI + BGE-M3的企业级意图识别系统",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
 )
 
 app.add_middleware(
@@ -30,23 +68,69 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# 调试可视化等接口返回数KB重复性较强的JSON，压缩后体积可降至原来的 1/5~1/10
+app.add_middleware(GZipMiddleware, minimum_size=512, compresslevel=5)
+
+logging.basicConfig(level=logging.INFO, format="%(message)s")
+logger = logging.getLogger(__name__)
+
 # 初始化混合识别器（使用智谱AI）
-print("\n🚀 初始化意图识别系统...")
-print("=" * 60)
+logger.info("🚀 初始化意图识别系统...")
 
 recognizer = EnhancedHybridIntentRecognizer(
     llm_provider="zhipu",  # 使用智谱AI
     enable_semantic=True   # 启用语义向量检索
 )
 
-print(f"✅ 混合识别器初始化完成")
-print(f"   LLM提供商: 智谱AI (GLM-4-Flash)")
-print(f"   语义检索: 启用")
-print(f"   架构: 三层混合 (规则 → 语义 → LLM)")
-print("=" * 60 + "\n")
+# 复用识别器已加载的向量模型（不可用时为 None）
+query_encoder = get_query_encoder(recognizer)
+
+# 两级识别缓存（精确 + 语义），命中时跳过LLM往返
+recognition_cache = CachedRecognizer(
+    recognizer,
+    encoder=query_encoder,
+    threshold=0.97,
+    max_size=1024,
+)
+if logger.isEnabledFor(logging.INFO):
+    logger.info("\n".join([
+        "=" * 60,
+        "✅ 混合识别器初始化完成",
+        "   LLM提供商: 智谱AI (GLM-4-Flash)",
+        "   语义检索: 启用",
+        "   架构: 三层混合 (规则 → 语义 → LLM)",
+        "   识别缓存: 精确 + 语义",
+        "=" * 60,
+    ]))
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class Metric:
+    """指标定义（不可变，slots 存储）."""
+
+    metric_id: str
+    name: str
+    code: str
+    description: str
+    domain: str
+    synonyms: tuple[str, ...]
+    formula: Optional[str] = None
+
+    def to_candidate(self, score: float) -> dict:
+        """构造带分数的候选结果."""
+        return {
+            "metric_id": self.metric_id,
+            "name": self.name,
+            "code": self.code,
+            "description": self.description,
+            "domain": self.domain,
+            "score": score,
+            "synonyms": self.synonyms,
+            "formula": self.formula,
+        }
+
 
 # 模拟指标数据
-MOCK_METRICS = [
+_METRIC_DEFS = [
     {
         "metric_id": "m001",
         "name": "GMV",
@@ -94,10 +178,106 @@ MOCK_METRICS = [
     },
 ]
 
+MOCK_METRICS: tuple[Metric, ...] = tuple(
+    Metric(**{**m, "synonyms": tuple(m["synonyms"])}) for m in _METRIC_DEFS
+)
+
+
+
+class MetricColumns(NamedTuple):
+    """指标的列式（SoA）视图，打分时只访问需要的列.
+
+    第 i 行对应 MOCK_METRICS[i]；同义词不等长，展平存储并记录所属指标下标。
+    """
+
+    names_lower: np.ndarray
+    descs_lower: np.ndarray
+    syns_lower: np.ndarray
+    syn_owner: np.ndarray
+    docs: list[str]
+
+
+def build_metric_columns(metrics: tuple[Metric, ...]) -> MetricColumns:
+    """预计算匹配用的列（模块加载时一次性完成，请求路径只做向量化比较）."""
+    return MetricColumns(
+        names_lower=np.array([m.name.lower() for m in metrics]),
+        descs_lower=np.array([m.description.lower() for m in metrics]),
+        syns_lower=np.array([syn.lower() for m in metrics for syn in m.synonyms]),
+        syn_owner=np.array(
+            [i for i, m in enumerate(metrics) for _ in m.synonyms], dtype=np.intp
+        ),
+        docs=[f"{m.name} {' '.join(m.synonyms)} {m.description}" for m in metrics],
+    )
+
+
+METRIC_COLUMNS = build_metric_columns(MOCK_METRICS)
+
+
+def metric_corpus_path() -> str:
+    """指标向量缓存文件路径，以指标内容和向量模型的哈希为键.
+
+    指标定义或模型变化时哈希随之变化，旧缓存自然失效。
+    """
+    payload = json.dumps(
+        {
+            "metrics": [dataclasses.asdict(m) for m in MOCK_METRICS],
+            "model": settings.vectorizer.model_name,
+        },
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    key = hashlib.blake2b(payload.encode("utf-8")).hexdigest()[:16]
+    cache_dir = os.getenv("METRIC_EMB_CACHE_DIR", tempfile.gettempdir())
+    return os.path.join(cache_dir, f"metric_emb_{key}.npy")
+
+
+def build_metric_corpus() -> Optional[np.ndarray]:
+    """加载或批量编码全部指标文本，查询时只需一次矩阵向量乘.
+
+    编码结果保存为 .npy 并以 mmap 方式加载，后续启动直接复用，
+    多个 worker 进程共享同一份页缓存。
+
+    Returns:
+        shape为 (n, dim) 的归一化向量矩阵，向量模型不可用时返回 None
+    """
+    if query_encoder is None:
+        return None
+
+    path = metric_corpus_path()
+    if os.path.exists(path):
+        try:
+            return np.load(path, mmap_mode="r")
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️  指标向量缓存损坏: {e}，重新编码")
+
+    try:
+        corpus = np.asarray(query_encoder(METRIC_COLUMNS.docs), dtype=np.float32)
+    except Exception as e:
+        logger.warning(f"⚠️  指标向量预计算失败: {e}，仅使用文本匹配")
+        return None
+
+    try:
+        # 先写临时文件再原子替换，避免多 worker 同时启动时读到半截文件
+        tmp_path = f"{path}.{os.getpid()}.tmp.npy"
+        np.save(tmp_path, corpus)
+        os.replace(tmp_path, path)
+        return np.load(path, mmap_mode="r")
+    except OSError as e:
+        logger.warning(f"⚠️  指标向量缓存写入失败: {e}")
+        return corpus
+
+
+# 语义兜底的最低相似度
+SEMANTIC_MIN_SCORE = 0.5
+METRIC_CORPUS = build_metric_corpus()
+
 # 请求/响应模型
 class SearchRequest(BaseModel):
     query: str = Field(..., min_length=1, max_length=500, description="查询文本")
     top_k: int = Field(default=10, ge=1, le=100, description="返回结果数量")
+    score_threshold: Optional[float] = Field(
+        default=None, ge=0.0, le=1.0, description="相似度阈值，低于该值的结果将被过滤"
+    )
 
 
 class MetricCandidate(BaseModel):
@@ -149,45 +329,31 @@ async def health_check():
 
 
 @app.post("/api/v1/search", response_model=SearchResponse)
-async def search_metrics(request: SearchRequest) -> SearchResponse:
+async def search_metrics(request: SearchRequest) -> ORJSONResponse:
     """智能检索指标（三层混合架构）."""
 
-    import time
-    start = time.time()
+    t0 = perf_counter_ns()
 
-    # 1. 意图识别（三层混合）
-    result = recognizer.recognize(request.query, top_k=request.top_k)
+    # 1. 意图识别（三层混合，优先命中缓存）
+    result = await recognition_cache.recognize_async(request.query, top_k=request.top_k)
 
     # 2. 使用核心查询进行匹配
     core_query = result.final_intent.core_query or request.query
     core_query = core_query.strip()
 
-    # 3. 指标匹配
-    candidates = []
-    for metric in MOCK_METRICS:
-        score = calculate_similarity(core_query, metric)
-        if score > 0:
-            candidates.append({**metric, "score": score})
-
-    candidates.sort(key=lambda x: x["score"], reverse=True)
-    candidates = candidates[:request.top_k]
-
-    # 4. 格式化结果
-    formatted_candidates = [
-        MetricCandidate(
-            metric_id=c["metric_id"],
-            name=c["name"],
-            code=c["code"],
-            description=c["description"],
-            domain=c["domain"],
-            score=c["score"],
-            synonyms=c["synonyms"],
-            formula=c.get("formula")
-        )
-        for c in candidates
+    # 3. 指标匹配（向量化打分 + 部分排序取Top-K），文本无命中时走语义兜底
+    scores = score_metrics(core_query)
+    if not scores.any() and METRIC_CORPUS is not None:
+        scores = semantic_score_metrics(core_query)
+    top_indices = select_top_k(scores, request.top_k, request.score_threshold)
+
+    # 只为入选的Top-K构造候选（一次性转换为Python标量）
+    candidates = [
+        MOCK_METRICS[i].to_candidate(score)
+        for i, score in zip(top_indices.tolist(), scores[top_indices].tolist())
     ]
 
-    # 5. 格式化意图
+    # 4. 格式化意图
     intent = {
         "core_query": result.final_intent.core_query,
         "time_range": format_time_range(result.final_intent.time_range),
@@ -198,46 +364,54 @@ async def search_metrics(request: SearchRequest) -> SearchResponse:
         "filters": result.final_intent.filters
     }
 
-    latency = time.time() - start
+    latency_ms = (perf_counter_ns() - t0) / 1e6
 
-    return SearchResponse(
-        query=request.query,
-        intent=intent,
-        candidates=formatted_candidates,
-        total=len(formatted_candidates),
-        source_layer=result.source_layer,
-        latency_ms=round(latency * 1000, 2)
-    )
+    # 候选数据由服务端构造，直接序列化，跳过 SearchResponse 的二次校验
+    # （response_model 仅用于生成 OpenAPI 文档）
+    return ORJSONResponse({
+        "query": request.query,
+        "intent": intent,
+        "candidates": candidates,
+        "total": len(candidates),
+        "source_layer": result.source_layer,
+        "latency_ms": round(latency_ms, 2)
+    })
 
 
 @app.post("/api/v1/debug/intent-visualization")
 async def debug_intent_visualization(request: SearchRequest):
     """意图识别可视化调试接口."""
 
-    import time
-    start = time.time()
-
-    # 执行混合识别
-    result = recognizer.recognize(request.query, top_k=request.top_k)
+    # 执行混合识别（调试接口绕过缓存，展示真实的各层耗时）
+    result = await asyncio.to_thread(recognizer.recognize, request.query, top_k=request.top_k)
 
-    # 构建可视化数据
-    return {
+    # 单次遍历各层，同时构建时间线、耗时分解和置信度热力图
+    timeline, heatmap, breakdown = [], [], {}
+    for layer in result.all_layers:
+        duration_ms = round(layer.duration * 1000, 2)
+        timeline.append({
+            "layer": layer.layer_name,
+            "success": layer.success,
+            "confidence": layer.confidence,
+            "duration_ms": duration_ms,
+            "metadata": layer.metadata
+        })
+        heatmap.append({
+            "layer": layer.layer_name,
+            "confidence": layer.confidence,
+            "status": "✓" if layer.success else "✗"
+        })
+        breakdown[layer.layer_name] = duration_ms
+
+    # 构建可视化数据（直接返回 ORJSONResponse，跳过 jsonable_encoder 的逐层遍历）
+    return ORJSONResponse({
         "query_info": {
             "original_query": request.query,
             "query_length": len(request.query),
             "core_query": result.final_intent.core_query
         },
 
-        "recognition_timeline": [
-            {
-                "layer": layer.layer_name,
-                "success": layer.success,
-                "confidence": layer.confidence,
-                "duration_ms": round(layer.duration * 1000, 2),
-                "metadata": layer.metadata
-            }
-            for layer in result.all_layers
-        ],
+        "recognition_timeline": timeline,
 
         "final_intent": {
             "core_query": result.final_intent.core_query,
@@ -252,49 +426,92 @@ async def debug_intent_visualization(request: SearchRequest):
         "performance": {
             "total_duration_ms": round(result.total_duration * 1000, 2),
             "source_layer": result.source_layer,
-            "layer_breakdown": {
-                layer.layer_name: round(layer.duration * 1000, 2)
-                for layer in result.all_layers
-            }
+            "layer_breakdown": breakdown
         },
 
-        "confidence_heatmap": [
-            {
-                "layer": layer.layer_name,
-                "confidence": layer.confidence,
-                "status": "✓" if layer.success else "✗"
-            }
-            for layer in result.all_layers
-        ],
+        "confidence_heatmap": heatmap,
 
         "llm_reasoning": extract_llm_reasoning(result)
-    }
+    })
 
 
 @app.get("/api/v1/statistics")
-async def get_statistics():
-    """获取系统统计信息."""
-    return recognizer.get_statistics()
+async def get_statistics(response: Response):
+    """获取系统统计信息（允许浏览器缓存60秒，避免前端轮询反复打到服务端）."""
+    response.headers["Cache-Control"] = "public, max-age=60"
+    return {
+        **recognizer.get_statistics(),
+        "cache": recognition_cache.get_statistics()
+    }
+
+
+@app.post("/api/v1/cache/clear")
+async def clear_cache():
+    """清空意图识别缓存."""
+    recognition_cache.clear()
+    return {"status": "cleared"}
 
 
 # 辅助函数
-def calculate_similarity(query: str, metric: dict) -> float:
-    """计算查询与指标的相似度."""
-    import re
-    query_clean = re.sub(r'^[的的之之]+', '', query.lower().strip())
-    query_clean = re.sub(r'[的的之之]+$', '', query_clean)
-
-    if query_clean == metric["name"].lower():
-        return 1.0
-    elif any(query_clean == syn.lower() for syn in metric["synonyms"]):
-        return 0.98
-    elif query_clean in metric["name"].lower():
-        return 0.85
-    elif query_clean in metric["description"].lower():
-        return 0.75
-    elif any(query_clean in syn.lower() for syn in metric["synonyms"]):
-        return 0.80
-    return 0.0
+def score_metrics(query: str) -> np.ndarray:
+    """计算查询与所有指标的相似度（向量化）.
+
+    匹配优先级: 名称精确 > 同义词精确 > 名称包含 > 描述包含 > 同义词包含
+
+    Args:
+        query: 查询文本
+
+    Returns:
+        shape为 (n,) 的分数数组，与 MOCK_METRICS 一一对应
+    """
+    # 去除首尾助词（str.strip 为C实现，无需正则）
+    query_clean = query.lower().strip().strip('的之')
+    cols = METRIC_COLUMNS
+    n = cols.names_lower.size
+
+    # 同义词是不等长的，展平后按所属指标归并
+    syn_equal = np.zeros(n, dtype=bool)
+    np.logical_or.at(syn_equal, cols.syn_owner, cols.syns_lower == query_clean)
+    syn_contains = np.zeros(n, dtype=bool)
+    np.logical_or.at(syn_contains, cols.syn_owner, np.char.find(cols.syns_lower, query_clean) >= 0)
+
+    return np.select(
+        [
+            cols.names_lower == query_clean,
+            syn_equal,
+            np.char.find(cols.names_lower, query_clean) >= 0,
+            np.char.find(cols.descs_lower, query_clean) >= 0,
+            syn_contains,
+        ],
+        [1.0, 0.98, 0.85, 0.75, 0.80],
+        default=0.0,
+    )
+
+
+def semantic_score_metrics(query: str) -> np.ndarray:
+    """基于预计算指标向量的语义打分（低于阈值的置0）."""
+    q_vec = np.asarray(query_encoder(query), dtype=np.float32).ravel()
+    scores = METRIC_CORPUS @ q_vec
+    scores[scores < SEMANTIC_MIN_SCORE] = 0.0
+    return scores
+
+
+def select_top_k(
+    scores: np.ndarray, top_k: int, score_threshold: Optional[float] = None
+) -> np.ndarray:
+    """选出分数大于0（且不低于阈值）的Top-K下标（分数降序，同分按原顺序）."""
+    # 先用掩码过滤未命中/低于阈值的指标，只对保留部分做部分排序
+    mask = scores > 0
+    if score_threshold:
+        mask &= scores >= score_threshold
+    hits = np.flatnonzero(mask)
+    if top_k <= 0 or hits.size == 0:
+        return np.empty(0, dtype=np.intp)
+    if hits.size > top_k:
+        # 部分排序求第K大分数，保留所有不低于它的命中（同分时保持原顺序）
+        kth = np.partition(scores[hits], hits.size - top_k)[hits.size - top_k]
+        hits = hits[scores[hits] >= kth]
+    return hits[np.lexsort((hits, -scores[hits]))][:top_k]
 
 
 def format_time_range(time_range: Optional[tuple]) -> Optional[dict]:
@@ -302,17 +519,20 @@ def format_time_range(time_range: Optional[tuple]) -> Optional[dict]:
     if not time_range:
         return None
     start, end = time_range
-    return {
-        "start": start.strftime("%Y-%m-%d") if hasattr(start, "strftime") else str(start),
-        "end": end.strftime("%Y-%m-%d") if hasattr(end, "strftime") else str(end)
-    }
+    return {"start": _format_date(start), "end": _format_date(end)}
+
 
+def _format_date(value: Any) -> str:
+    """格式化单个日期（datetime 是 date 的子类，一次 isinstance 即可）."""
+    return value.strftime("%Y-%m-%d") if isinstance(value, date) else str(value)
 
+
+@lru_cache(maxsize=128)
 def format_enum(value) -> Optional[str]:
-    """格式化枚举值."""
+    """格式化枚举值（枚举取值有限，结果可缓存）."""
     if value is None:
         return None
-    return value.value if hasattr(value, "value") else str(value)
+    return value.value if isinstance(value, Enum) else str(value)
 
 
 def extract_llm_reasoning(result) -> Optional[dict]:
@@ -329,18 +549,34 @@ def extract_llm_reasoning(result) -> Optional[dict]:
 
 
 if __name__ == "__main__":
-    print("\n🎯 智能问数系统 v2.0 - 生产版")
-    print("=" * 60)
-    print("服务地址: http://localhost:8000")
-    print("API 文档: http://localhost:8000/docs")
-    print("可视化界面: 打开 frontend/intent-visualization.html")
-    print("=" * 60)
-    print("\n核心特性:")
-    print("  ✅ 智谱AI GLM-4 Flash (¥1/1M tokens)")
-    print("  ✅ 三层混合架构 (规则 → 语义 → LLM)")
-    print("  ✅ 7维意图识别 (时间/聚合/维度/比较/过滤)")
-    print("  ✅ 实时可视化调试")
-    print("  ✅ 10+ 模拟指标数据")
-    print("\n按 Ctrl+C 停止服务\n")
-
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("\n".join([
+            "",
+            "🎯 智能问数系统 v2.0 - 生产版",
+            "=" * 60,
+            "服务地址: http://localhost:8000",
+            "API 文档: http://localhost:8000/docs",
+            "可视化界面: 打开 frontend/intent-visualization.html",
+            "=" * 60,
+            "",
+            "核心特性:",
+            "  ✅ 智谱AI GLM-4 Flash (¥1/1M tokens)",
+            "  ✅ 三层混合架构 (规则 → 语义 → LLM)",
+            "  ✅ 7维意图识别 (时间/聚合/维度/比较/过滤)",
+            "  ✅ 实时可视化调试",
+            "  ✅ 10+ 模拟指标数据",
+            "",
+            "按 Ctrl+C 停止服务",
+        ]))
+
+    # 多进程需要以导入字符串形式加载应用；每个worker会各自加载一份模型
+    workers = int(os.getenv("WORKERS", "1"))
+    uvicorn.run(
+        "run-production-server:app" if workers > 1 else app,
+        host="0.0.0.0",
+        port=8000,
+        loop="uvloop",
+        http="httptools",
+        workers=workers,
+        log_level="warning"
+    )
@@ -50,6 +50,8 @@ def main() -> None:
         host="0.0.0.0",
         port=8000,
         reload=True,  # 开发模式自动重载
+        loop="uvloop",  # uvicorn[standard] 自带 uvloop/httptools，显式指定避免回退到纯 Python 实现
+        http="httptools",
         log_level=settings.log_level.lower(),
     )
 
@@ -2,8 +2,12 @@ import unittest
 from src.inference.context.manager import ContextManager
 
 class TestContextManager(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # One manager for the whole suite; each test still gets its own session
+        cls.cm = ContextManager()
+
     def setUp(self):
-        self.cm = ContextManager()
         self.session_id = self.cm.create_session()
 
     def test_basic_inheritance(self):
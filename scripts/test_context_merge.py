@@ -33,13 +33,6 @@ def test_context_merge():
         core_query="GMV",
         time_range=(datetime(2023, 1, 1), datetime(2023, 1, 7)),
         time_granularity=TimeGranularity.DAY,
-        aggregation_type=None,
-        dimensions=[],
-        comparison_type=None,
-        filters={},
-        trend_type=None,
-        sort_requirement=None,
-        threshold_filters=[]
     )
     ctx.add_turn(intent1.query, intent1)
     print("✅ Turn 1 added: Base Query")
@@ -51,14 +44,8 @@ def test_context_merge():
         query="In Beijing",
         core_query="", # Empty core query
         time_range=None, # No time info
-        time_granularity=None,
-        aggregation_type=None,
         dimensions=["City"],
-        comparison_type=None,
         filters={"city": "Beijing"},
-        trend_type=None,
-        sort_requirement=None,
-        threshold_filters=[]
     )
     
     print(f"\nBefore Merge (Turn 2): Metric='{intent2.core_query}', Time={intent2.time_range}")
@@ -2,10 +2,12 @@
 """端到端测试脚本 - 验证整个系统的功能."""
 
 import asyncio
+import functools
 import json
 import sys
 import time
-from typing import Dict, List
+from contextvars import ContextVar
+from typing import Dict, List, Optional
 
 import httpx
 
@@ -50,46 +52,83 @@ class Colors:
     BOLD = "\033[1m"
 
 
+# 每个测试章节的输出先缓存在这里，章节结束时一次写出：
+# 减少 stdout 写调用，并发执行的章节输出也不会互相穿插
+_section_buffer: ContextVar[Optional[List[str]]] = ContextVar("_section_buffer", default=None)
+
+
+def _emit(line: str = ""):
+    """输出一行（处于章节内时写入缓冲区）."""
+    buffer = _section_buffer.get()
+    if buffer is None:
+        sys.stdout.write(line + "\n")
+    else:
+        buffer.append(line)
+
+
+def flush_section():
+    """将当前章节缓冲的输出一次写到 stdout."""
+    buffer = _section_buffer.get()
+    if buffer:
+        sys.stdout.write("\n".join(buffer) + "\n")
+        sys.stdout.flush()
+        buffer.clear()
+
+
+def buffered_section(func):
+    """测试函数装饰器：函数内的输出缓存到章节结束后一次写出."""
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        token = _section_buffer.set([])
+        try:
+            return await func(*args, **kwargs)
+        finally:
+            flush_section()
+            _section_buffer.reset(token)
+    return wrapper
+
+
 def print_success(msg: str):
     """打印成功消息."""
-    print(f"{Colors.GREEN}✅{Colors.ENDC} {msg}")
+    _emit(f"{Colors.GREEN}✅{Colors.ENDC} {msg}")
 
 
 def print_error(msg: str):
     """打印错误消息."""
-    print(f"{Colors.RED}❌{Colors.ENDC} {msg}")
+    _emit(f"{Colors.RED}❌{Colors.ENDC} {msg}")
 
 
 def print_info(msg: str):
     """打印信息消息."""
-    print(f"{Colors.BLUE}ℹ️{Colors.ENDC} {msg}")
+    _emit(f"{Colors.BLUE}ℹ️{Colors.ENDC} {msg}")
 
 
 def print_warning(msg: str):
     """打印警告消息."""
-    print(f"{Colors.YELLOW}⚠️{Colors.ENDC} {msg}")
+    _emit(f"{Colors.YELLOW}⚠️{Colors.ENDC} {msg}")
 
 
 def print_section(title: str):
     """打印章节标题."""
-    print(f"\n{Colors.BOLD}{'='*60}{Colors.ENDC}")
-    print(f"{Colors.BOLD}{title.center(60)}{Colors.ENDC}")
-    print(f"{Colors.BOLD}{'='*60}{Colors.ENDC}\n")
+    _emit(f"\n{Colors.BOLD}{'='*60}{Colors.ENDC}")
+    _emit(f"{Colors.BOLD}{title.center(60)}{Colors.ENDC}")
+    _emit(f"{Colors.BOLD}{'='*60}{Colors.ENDC}\n")
 
 
+@buffered_section
 async def test_health_check(client: httpx.AsyncClient) -> bool:
     """测试健康检查."""
     print_section("1. 健康检查")
 
     try:
         # 主服务健康检查
-        response = await client.get(f"{BASE_URL}/health")
+        response = await client.get("/health")
         response.raise_for_status()
         data = response.json()
         print_success(f"主服务状态: {data['status']}")
 
         # 管理服务健康检查
-        response = await client.get(f"{BASE_URL}/api/v1/management/health")
+        response = await client.get("/api/v1/management/health")
         response.raise_for_status()
         data = response.json()
         print_success(f"管理服务状态: {data['status']}")
@@ -99,7 +138,7 @@ async def test_health_check(client: httpx.AsyncClient) -> bool:
         print_info("功能配置:")
         for feature, enabled in features.items():
             status = "✅" if enabled else "❌"
-            print(f"   {status} {feature}")
+            _emit(f"   {status} {feature}")
 
         return True
 
@@ -108,6 +147,7 @@ async def test_health_check(client: httpx.AsyncClient) -> bool:
         return False
 
 
+@buffered_section
 async def test_single_metric_import(client: httpx.AsyncClient) -> bool:
     """测试单个指标导入."""
     print_section("2. 单个指标导入")
@@ -117,7 +157,7 @@ async def test_single_metric_import(client: httpx.AsyncClient) -> bool:
         print_info(f"导入指标: {metric['name']} ({metric['code']})")
 
         response = await client.post(
-            f"{BASE_URL}/api/v1/management/metrics/single",
+            "/api/v1/management/metrics/single",
             json=metric
         )
         response.raise_for_status()
@@ -129,7 +169,7 @@ async def test_single_metric_import(client: httpx.AsyncClient) -> bool:
             summary = data['summary']
             print_info("GLM 摘要已生成:")
             if 'business_summary' in summary:
-                print(f"   业务摘要: {summary['business_summary'][:50]}...")
+                _emit(f"   业务摘要: {summary['business_summary'][:50]}...")
 
         return True
 
@@ -138,6 +178,7 @@ async def test_single_metric_import(client: httpx.AsyncClient) -> bool:
         return False
 
 
+@buffered_section
 async def test_batch_import(client: httpx.AsyncClient) -> bool:
     """测试批量导入."""
     print_section("3. 批量导入")
@@ -146,7 +187,7 @@ async def test_batch_import(client: httpx.AsyncClient) -> bool:
         print_info(f"批量导入 {len(TEST_METRICS)} 个指标...")
 
         response = await client.post(
-            f"{BASE_URL}/api/v1/management/metrics/batch-import",
+            "/api/v1/management/metrics/batch-import",
             json={
                 "metrics": TEST_METRICS,
                 "generate_summary": True,
@@ -166,9 +207,14 @@ async def test_batch_import(client: httpx.AsyncClient) -> bool:
         print_info("等待任务完成...")
         max_wait = 60  # 最多等待60秒
         start = time.time()
+        delay = 0.05  # 指数退避：50ms 起，每次 ×1.6，封顶 2 秒
 
         while time.time() - start < max_wait:
-            response = await client.get(f"{BASE_URL}/api/v1/management/tasks/{task_id}")
+            # 服务端长轮询：任务结束时立即返回，否则最多挂起 delay 秒
+            response = await client.get(
+                f"/api/v1/management/tasks/{task_id}",
+                params={"wait_seconds": delay},
+            )
             response.raise_for_status()
             task_data = response.json()
 
@@ -191,7 +237,7 @@ async def test_batch_import(client: httpx.AsyncClient) -> bool:
             else:
                 print_info(f"任务进行中... 状态: {status}, 进度: {progress:.1f}%")
 
-            await asyncio.sleep(2)
+            delay = min(delay * 1.6, 2.0)
 
         print_error("任务超时")
         return False
@@ -201,6 +247,7 @@ async def test_batch_import(client: httpx.AsyncClient) -> bool:
         return False
 
 
+@buffered_section
 async def test_query_metric(client: httpx.AsyncClient) -> bool:
     """测试查询指标."""
     print_section("4. 查询指标")
@@ -209,7 +256,7 @@ async def test_query_metric(client: httpx.AsyncClient) -> bool:
         metric_code = TEST_METRICS[0]['code']
         print_info(f"查询指标: {metric_code}")
 
-        response = await client.get(f"{BASE_URL}/api/v1/management/metrics/{metric_code}")
+        response = await client.get(f"/api/v1/management/metrics/{metric_code}")
         response.raise_for_status()
         data = response.json()
 
@@ -225,6 +272,7 @@ async def test_query_metric(client: httpx.AsyncClient) -> bool:
         return False
 
 
+@buffered_section
 async def test_vector_search(client: httpx.AsyncClient) -> bool:
     """测试向量搜索."""
     print_section("5. 向量搜索")
@@ -234,7 +282,7 @@ async def test_vector_search(client: httpx.AsyncClient) -> bool:
         print_info(f"搜索查询: {query_text}")
 
         response = await client.post(
-            f"{BASE_URL}/api/v1/search",
+            "/api/v1/search",
             json={
                 "query": query_text,
                 "top_k": 5
@@ -249,14 +297,14 @@ async def test_vector_search(client: httpx.AsyncClient) -> bool:
         if 'intent' in data and data['intent']:
             intent = data['intent']
             print_info("意图识别:")
-            print(f"   核心查询: {intent.get('core_query')}")
+            _emit(f"   核心查询: {intent.get('core_query')}")
 
         # 显示候选结果
         candidates = data.get('candidates', [])
         if candidates:
             print_info("Top 候选:")
             for i, candidate in enumerate(candidates[:3], 1):
-                print(f"   {i}. {candidate['name']} ({candidate['code']}) - 相似度: {candidate['score']:.3f}")
+                _emit(f"   {i}. {candidate['name']} ({candidate['code']}) - 相似度: {candidate['score']:.3f}")
 
         return True
 
@@ -267,10 +315,16 @@ async def test_vector_search(client: httpx.AsyncClient) -> bool:
 
 async def run_all_tests():
     """运行所有测试."""
-    print(f"\n{Colors.BOLD}{'🚀 开始端到端测试'}{Colors.ENDC}")
-    print(f"{Colors.BOLD}{'服务地址: '}{BASE_URL}{Colors.ENDC}\n")
-
-    async with httpx.AsyncClient(timeout=30.0) as client:
+    _emit(f"\n{Colors.BOLD}{'🚀 开始端到端测试'}{Colors.ENDC}")
+    _emit(f"{Colors.BOLD}{'服务地址: '}{BASE_URL}{Colors.ENDC}\n")
+
+    # 所有请求共用一个连接池（相对路径 + base_url），keep-alive 连接在各测试间复用；
+    # 后端 uvicorn 只支持 HTTP/1.1，因此不开启 http2
+    async with httpx.AsyncClient(
+        base_url=BASE_URL,
+        timeout=30.0,
+        limits=httpx.Limits(max_keepalive_connections=32, max_connections=64),
+    ) as client:
         results = []
 
         # 1. 健康检查
@@ -282,11 +336,11 @@ async def run_all_tests():
         # 3. 批量导入
         results.append(await test_batch_import(client))
 
-        # 4. 查询指标
-        results.append(await test_query_metric(client))
-
-        # 5. 向量搜索
-        results.append(await test_vector_search(client))
+        # 4-5. 查询指标与向量搜索互不依赖（都只依赖导入完成），并发执行
+        results.extend(await asyncio.gather(
+            test_query_metric(client),
+            test_vector_search(client),
+        ))
 
         # 汇总结果
         print_section("测试结果汇总")
@@ -303,6 +357,10 @@ async def run_all_tests():
 
 
 if __name__ == "__main__":
+    # 输出已按章节整块写出，关闭终端下的逐行刷新
+    if hasattr(sys.stdout, "reconfigure"):
+        sys.stdout.reconfigure(line_buffering=False)
+
     try:
         exit_code = asyncio.run(run_all_tests())
         sys.exit(exit_code)
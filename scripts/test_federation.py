@@ -18,15 +18,7 @@ def test_federated_routing():
     intent1 = QueryIntent(
         query="Show GMV last month",
         core_query="GMV",
-        time_range=None,
         time_granularity=TimeGranularity.MONTH,
-        aggregation_type=None,
-        dimensions=[],
-        comparison_type=None,
-        filters={},
-        trend_type=None,
-        sort_requirement=None,
-        threshold_filters=[]
     )
     plan1 = router.get_execution_plan(intent1)
     print(f"Query: '{intent1.query}' -> Source: {plan1['source']}")
@@ -36,15 +28,6 @@ def test_federated_routing():
     intent2 = QueryIntent(
         query="Show current inventory",
         core_query="inventory",
-        time_range=None,
-        time_granularity=None,
-        aggregation_type=None,
-        dimensions=[],
-        comparison_type=None,
-        filters={},
-        trend_type=None,
-        sort_requirement=None,
-        threshold_filters=[]
     )
     plan2 = router.get_execution_plan(intent2)
     print(f"Query: '{intent2.query}' -> Source: {plan2['source']}")
@@ -54,15 +37,6 @@ def test_federated_routing():
     intent3 = QueryIntent(
         query="实时销售额",
         core_query="销售额",
-        time_range=None,
-        time_granularity=None,
-        aggregation_type=None,
-        dimensions=[],
-        comparison_type=None,
-        filters={},
-        trend_type=None,
-        sort_requirement=None,
-        threshold_filters=[]
     )
     plan3 = router.get_execution_plan(intent3)
     print(f"Query: '{intent3.query}' -> Source: {plan3['source']}")
@@ -15,7 +15,7 @@ from src.recall.dual_recall import DualRecall
 from src.recall.graph.neo4j_client import Neo4jClient
 from src.recall.vector.models import MetricMetadata
 from src.recall.vector.qdrant_store import QdrantVectorStore
-from src.recall.vector.vectorizer import MetricVectorizer
+from src.recall.vector.vectorizer import MetricVectorizer, get_vectorizer as get_shared_vectorizer
 from src.rerank.models import Candidate, QueryContext
 from src.rerank.ranker import RuleBasedRanker
 from src.validator.validators import ValidationPipeline
@@ -34,7 +34,7 @@ _conversation_manager: Optional[ConversationManager] = None
 def get_vectorizer() -> MetricVectorizer:
     global _vectorizer
     if _vectorizer is None:
-        _vectorizer = MetricVectorizer(model_name=settings.vectorizer.model_name)
+        _vectorizer = get_shared_vectorizer(settings.vectorizer.model_name)
     return _vectorizer
 
 
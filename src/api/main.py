@@ -10,7 +10,7 @@ from fastapi.staticfiles import StaticFiles
 from src.config import settings
 from src.recall.graph.neo4j_client import Neo4jClient
 from src.recall.vector.qdrant_store import QdrantVectorStore
-from src.recall.vector.vectorizer import MetricVectorizer
+from src.recall.vector.vectorizer import get_vectorizer
 
 
 @asynccontextmanager
@@ -27,7 +27,8 @@ async def lifespan(app: FastAPI):
 
     # 初始化向量化器
     print("⏳ 初始化向量化器...")
-    vectorizer = MetricVectorizer(model_name=settings.vectorizer.model_name)
+    # 与路由模块共用同一实例，进程内只加载一次模型
+    vectorizer = get_vectorizer(settings.vectorizer.model_name)
     app.state.vectorizer = vectorizer
     print(f"✅ 向量化器已加载: {settings.vectorizer.model_name}")
 
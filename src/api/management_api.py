@@ -5,13 +5,12 @@ import time
 from datetime import datetime
 from typing import Any, Dict, List, Optional
 
-from fastapi import APIRouter, BackgroundTasks, HTTPException, Request, status
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Query, Request, status
 from pydantic import BaseModel, Field
 
 from src.config import settings
 from src.services.summary_service import GLMSummaryService
 from src.recall.graph.graph_store import GraphStore
-from src.recall.graph.models import MetricNode
 from src.recall.graph.neo4j_client import Neo4jClient
 from src.recall.vector.models import MetricMetadata
 from src.recall.vector.qdrant_store import QdrantVectorStore
@@ -31,6 +30,10 @@ class MetricMetadataInput(BaseModel):
     domain: str = Field(..., description="业务域")
     formula: Optional[str] = Field(None, description="计算公式")
     importance: float = Field(default=0.5, ge=0.0, le=1.0, description="重要性（0-1）")
+    content_hash: Optional[str] = Field(
+        None,
+        description="内容指纹（规范化 JSON 的 SHA-256）；与上次完整导入一致时跳过GLM摘要生成",
+    )
 
 
 class MetricBatchImportRequest(BaseModel):
@@ -71,6 +74,8 @@ class TaskStatus(BaseModel):
 
 # 任务存储（生产环境应使用 Redis）
 _tasks: Dict[str, TaskStatus] = {}
+# 任务结束（completed/failed）时置位，供状态查询长轮询等待
+_task_done: Dict[str, asyncio.Event] = {}
 
 # 全局服务实例
 _summary_service: Optional[GLMSummaryService] = None
@@ -117,6 +122,22 @@ def get_services_from_request(request: Request) -> tuple[QdrantVectorStore, Opti
     return vector_store, neo4j_client, graph_store
 
 
+def _certified_hash(content_hash: str, generate_summary: bool, index_to_vector: bool) -> str:
+    """组合内容指纹与导入阶段.
+
+    存储的指纹只证明"该内容已按这组阶段完整导入"，阶段开关不同的导入不会误判为未变更.
+
+    Args:
+        content_hash: 客户端计算的内容指纹
+        generate_summary: 是否生成GLM摘要
+        index_to_vector: 是否索引到向量库
+
+    Returns:
+        写入图谱的指纹字符串
+    """
+    return f"{content_hash}|summary={int(generate_summary)}|vector={int(index_to_vector)}"
+
+
 @router.post("/metrics/batch-import", response_model=ImportResult, status_code=status.HTTP_202_ACCEPTED)
 async def batch_import_metrics(
     request: MetricBatchImportRequest,
@@ -127,7 +148,7 @@ async def batch_import_metrics(
 
     工作流程：
     1. 数据验证和清洗
-    2. 生成GLM摘要（可选）
+    2. 生成GLM摘要（可选；content_hash 与上次完整导入一致的复用已有摘要）
     3. 入库到Neo4j图谱库
     4. 向量化并入库到Qdrant向量库
     5. 返回任务ID
@@ -158,6 +179,7 @@ async def batch_import_metrics(
         result=None,
         error=None
     )
+    _task_done[task_id] = asyncio.Event()
 
     # 添加后台任务
     background_tasks.add_task(
@@ -197,59 +219,80 @@ async def _process_batch_import(
     task.status = "processing"
     task.progress = 0.0
 
-    success_count = 0
     failed_ids = []
 
     try:
         # 获取服务实例
         vector_store, neo4j_client, graph_store = get_services_from_request(request)
 
-        # 1. 生成GLM摘要
-        summaries = []
-        if generate_summary:
+        # 0. 按内容指纹识别已完整导入过的指标（仅用于跳过 GLM 摘要生成）
+        certified = {
+            m["code"]: _certified_hash(m["content_hash"], generate_summary, index_to_vector)
+            for m in metrics_data if m.get("content_hash")
+        }
+        unchanged_codes = set()
+        reused_summaries: Dict[str, str] = {}
+        if graph_store and certified:
+            try:
+                stored_hashes = graph_store.get_content_hashes(list(certified))
+                unchanged_codes = {
+                    code for code, value in certified.items()
+                    if stored_hashes.get(code) == value
+                }
+                if generate_summary and unchanged_codes:
+                    reused_summaries = graph_store.get_summary_texts(list(unchanged_codes))
+                    # 没有保存摘要文本的指标仍需重新生成
+                    unchanged_codes &= reused_summaries.keys()
+            except Exception as e:
+                print(f"[{task_id}] 查询内容指纹失败，全部重新处理: {e}")
+                unchanged_codes = set()
+                reused_summaries = {}
+        if generate_summary and unchanged_codes:
+            print(f"[{task_id}] {len(unchanged_codes)} 个指标内容未变更，复用已有摘要")
+
+        # 1. 生成GLM摘要（未变更的指标复用图谱中保存的摘要文本）
+        summaries = [
+            {"llm_friendly_text": reused_summaries[m["code"]]} if m["code"] in unchanged_codes else {}
+            for m in metrics_data
+        ]
+        pending = [i for i, m in enumerate(metrics_data) if m["code"] not in unchanged_codes]
+        if generate_summary and pending:
             summary_service = get_summary_service()
             if summary_service:
-                print(f"[{task_id}] 开始生成 {len(metrics_data)} 个指标的GLM摘要...")
-                summaries = await summary_service.batch_generate_summaries(
-                    metrics=metrics_data,
+                print(f"[{task_id}] 开始生成 {len(pending)} 个指标的GLM摘要...")
+                generated = await summary_service.batch_generate_summaries(
+                    metrics=[metrics_data[i] for i in pending],
                     batch_size=batch_size,
                     show_progress=False
                 )
+                for i, summary in zip(pending, generated):
+                    summaries[i] = summary
             else:
                 print(f"[{task_id}] GLM 服务未配置，使用默认摘要")
-                summaries = [{} for _ in metrics_data]
-        else:
-            summaries = [{} for _ in metrics_data]
 
         task.progress = 0.3
 
-        # 2. 入库到图谱库
+        # 2. 入库到图谱库（写入时不带 content_hash，即先清除旧指纹，
+        #    全部阶段成功后再重新写入）
         if index_to_graph and graph_store:
             print(f"[{task_id}] 开始入库到 Neo4j 图谱库...")
 
-            for i, metric_data in enumerate(metrics_data):
-                try:
-                    # 创建指标节点
-                    metric_node = MetricNode(
-                        metric_id=metric_data["code"],
-                        name=metric_data["name"],
-                        code=metric_data["code"],
-                        description=metric_data["description"],
-                        domain=metric_data["domain"],
-                        importance=metric_data.get("importance", 0.5),
-                        synonyms=metric_data.get("synonyms", []),
-                        formula=metric_data.get("formula")
-                    )
-
-                    graph_store.create_metric_node(metric_node)
-                    success_count += 1
-
-                    # 更新进度
-                    task.progress = 0.3 + 0.3 * (i + 1) / len(metrics_data)
-
-                except Exception as e:
-                    print(f"[{task_id}] 指标 {metric_data['code']} 入库图谱失败: {e}")
-                    failed_ids.append(metric_data["code"])
+            rows = [
+                {
+                    "id": m["code"],
+                    "name": m["name"],
+                    "code": m["code"],
+                    "description": m["description"],
+                    "domain": m["domain"],
+                    "formula": m.get("formula") or "",
+                }
+                for m in metrics_data
+            ]
+            try:
+                graph_store.upsert_metrics_batch(rows)
+            except Exception as e:
+                print(f"[{task_id}] 指标入库图谱失败: {e}")
+                failed_ids.extend(m["code"] for m in metrics_data)
 
         task.progress = 0.6
 
@@ -314,6 +357,28 @@ async def _process_batch_import(
                     if metric_data["code"] not in failed_ids:
                         failed_ids.append(metric_data["code"])
 
+        # 4. 记录内容指纹：只为所有请求阶段都成功的指标写入，供下次导入比对
+        if graph_store and certified:
+            summary_texts = {
+                m["code"]: summary["llm_friendly_text"]
+                for m, summary in zip(metrics_data, summaries)
+                if summary and summary.get("llm_friendly_text")
+            }
+            completed = {
+                code: value for code, value in certified.items()
+                if code not in failed_ids and (not generate_summary or code in summary_texts)
+            }
+            if completed:
+                try:
+                    graph_store.set_content_hashes(
+                        completed,
+                        summary_texts={c: summary_texts[c] for c in completed if c in summary_texts},
+                    )
+                except Exception as e:
+                    print(f"[{task_id}] 写入内容指纹失败: {e}")
+
+        success_count = len(metrics_data) - len(failed_ids)
+
         # 完成
         task.status = "completed"
         task.progress = 1.0
@@ -333,6 +398,10 @@ async def _process_batch_import(
         task.status = "failed"
         task.error = str(e)
         print(f"[{task_id}] 批量导入失败: {e}")
+    finally:
+        done = _task_done.get(task_id)
+        if done is not None:
+            done.set()
 
 
 @router.post("/metrics/single")
@@ -362,17 +431,14 @@ async def create_single_metric(metric: MetricMetadataInput, request: Request):
 
         # 2. 入库到图谱库
         if graph_store:
-            metric_node = MetricNode(
-                metric_id=metric.code,
-                name=metric.name,
-                code=metric.code,
-                description=metric.description,
-                domain=metric.domain,
-                importance=metric.importance,
-                synonyms=metric.synonyms,
-                formula=metric.formula
-            )
-            graph_store.create_metric_node(metric_node)
+            graph_store.upsert_metric({
+                "id": metric.code,
+                "name": metric.name,
+                "code": metric.code,
+                "description": metric.description,
+                "domain": metric.domain,
+                "formula": metric.formula or "",
+            })
 
         # 3. 向量化并入库到向量库
         text_to_vector = summary.get("llm_friendly_text") if summary else None
@@ -548,11 +614,18 @@ async def regenerate_metric_summary(
 
 
 @router.get("/tasks/{task_id}", response_model=TaskStatus)
-async def get_task_status(task_id: str):
+async def get_task_status(
+    task_id: str,
+    wait_seconds: float = Query(0.0, ge=0.0, le=30.0, description="长轮询等待时长（秒）"),
+):
     """获取异步任务状态.
 
+    wait_seconds > 0 时为长轮询：任务未结束则最多等待该时长，
+    任务一结束立即返回，调用方无需按固定间隔反复轮询.
+
     Args:
         task_id: 任务ID
+        wait_seconds: 长轮询等待时长（秒），0 表示立即返回
 
     Returns:
         任务状态
@@ -563,6 +636,13 @@ async def get_task_status(task_id: str):
             detail=f"任务不存在: {task_id}"
         )
 
+    done = _task_done.get(task_id)
+    if wait_seconds > 0 and done is not None and not done.is_set():
+        try:
+            await asyncio.wait_for(done.wait(), timeout=wait_seconds)
+        except asyncio.TimeoutError:
+            pass
+
     return _tasks[task_id]
 
 
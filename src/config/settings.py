@@ -19,6 +19,7 @@ class QdrantConfig(BaseSettings):
         collection_name: Collection 名称
         api_key: API密钥（可选）
         timeout: 请求超时时间（秒）
+        prefer_grpc: 是否优先使用 gRPC 连接（批量导入时吞吐更高）
     """
 
     model_config = SettingsConfigDict(env_prefix="QDRANT_", env_file=".env", extra="ignore")
@@ -29,6 +30,7 @@ class QdrantConfig(BaseSettings):
     collection_name: str = Field(default="metrics", description="Collection 名称")
     api_key: Optional[str] = Field(default=None, description="API密钥")
     timeout: float = Field(default=5.0, description="请求超时时间（秒）")
+    prefer_grpc: bool = Field(default=False, description="是否优先使用 gRPC")
     path: Optional[str] = Field(default=None, description="Qdrant 本地持久化路径")
     location: Optional[str] = Field(default=None, description="Qdrant 存储位置 (:memory: or path)")
 
@@ -48,8 +50,12 @@ class VectorizerConfig(BaseSettings):
 
     Attributes:
         model_name: 预训练模型名称
-        device: 运行设备（cpu/cuda）
+        device: 运行设备（cpu/cuda/auto，auto 时有 GPU 则用 cuda）
         batch_size: 批处理大小
+        backend: 推理后端（torch/onnx）
+        onnx_model_path: INT8 量化 ONNX 模型目录（backend=onnx 时使用）
+        dtype: 权重精度（float32/float16/bfloat16，backend=torch 时使用）
+        cache_path: 向量磁盘缓存文件路径（为空则不缓存）
     """
 
     model_config = SettingsConfigDict(env_prefix="VECTORIZER_", env_file=".env", extra="ignore")
@@ -57,6 +63,10 @@ class VectorizerConfig(BaseSettings):
     model_name: str = Field(default="moka-ai/m3e-base", description="预训练模型名称(中文优化)")
     device: str = Field(default="cpu", description="运行设备")
     batch_size: int = Field(default=32, description="批处理大小")
+    backend: str = Field(default="torch", description="推理后端（torch/onnx）")
+    onnx_model_path: Optional[str] = Field(default=None, description="INT8 ONNX 模型目录")
+    dtype: str = Field(default="float32", description="权重精度（float32/float16/bfloat16）")
+    cache_path: Optional[str] = Field(default=None, description="向量磁盘缓存文件路径")
 
 
 class ZhipuAIConfig(BaseSettings):
@@ -1,11 +1,13 @@
 """PostgreSQL数据库客户端."""
 
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
 from contextlib import contextmanager
+import csv
+import io
 import logging
 
 import psycopg2
-from psycopg2 import pool
+from psycopg2 import pool, sql
 from psycopg2.extras import RealDictCursor, NamedTupleCursor
 
 from src.config import settings
@@ -14,11 +16,57 @@ from src.config import settings
 logger = logging.getLogger(__name__)
 
 
+class _CSVRowStream(io.TextIOBase):
+    """把行迭代器包装成只读文件对象，供 COPY 按需拉取 CSV 文本.
+
+    copy_expert 每次 read(size) 时才从迭代器取行编码，
+    内存占用与单次读取块大小相当，而不是整批数据。
+    """
+
+    def __init__(self, rows: Iterable[Sequence[Any]]):
+        self._rows = iter(rows)
+        self._buf = io.StringIO()
+        self._writer = csv.writer(self._buf)
+        self._pending = ""
+
+    def readable(self) -> bool:
+        return True
+
+    def read(self, size: Optional[int] = -1) -> str:
+        if size is None or size < 0:
+            chunks = [self._pending]
+            self._pending = ""
+            for row in self._rows:
+                self._writer.writerow(row)
+            chunks.append(self._drain())
+            return "".join(chunks)
+
+        while len(self._pending) < size:
+            row = next(self._rows, None)
+            if row is None:
+                break
+            self._writer.writerow(row)
+            self._pending += self._drain()
+
+        data, self._pending = self._pending[:size], self._pending[size:]
+        return data
+
+    def readline(self, size: Optional[int] = -1) -> str:
+        # csv 行内可能含换行，COPY 只走 read()，这里按 read 语义兜底
+        return self.read(size)
+
+    def _drain(self) -> str:
+        data = self._buf.getvalue()
+        self._buf.seek(0)
+        self._buf.truncate()
+        return data
+
+
 class PostgreSQLClient:
     """PostgreSQL客户端管理类."""
 
     _instance: Optional['PostgreSQLClient'] = None
-    _pool: Optional[pool.SimpleConnectionPool] = None
+    _pool: Optional[pool.ThreadedConnectionPool] = None
 
     def __new__(cls) -> 'PostgreSQLClient':
         """单例模式."""
@@ -43,7 +91,8 @@ class PostgreSQLClient:
                 from src.config import PostgreSQLConfig
                 db_config = PostgreSQLConfig()
 
-            self._pool = pool.SimpleConnectionPool(
+            # 线程安全的连接池：多个线程可同时各自取用连接
+            self._pool = pool.ThreadedConnectionPool(
                 minconn=1,
                 maxconn=10,
                 host=db_config.host,
@@ -123,6 +172,43 @@ class PostgreSQLClient:
                 else:
                     return None
 
+    def execute_queries(
+        self,
+        statements: Sequence[Tuple[str, Any]],
+        dict_cursor: bool = True
+    ) -> List[Any]:
+        """在同一连接上依次执行多条查询.
+
+        只从连接池取一次连接、复用同一个游标，省去每条查询的取还连接开销.
+        每条语句包在独立的 SAVEPOINT 中：单条失败只回滚到该保存点，
+        不会让整个事务进入 aborted 状态而拖累其余语句.
+
+        Args:
+            statements: (SQL查询语句, 查询参数) 序列
+            dict_cursor: 是否使用字典游标（返回字段名）
+
+        Returns:
+            与 statements 顺序一致的结果列表：成功的为 fetchall 结果，失败的为对应异常对象
+        """
+        cursor_type = RealDictCursor if dict_cursor else NamedTupleCursor
+        results: List[Any] = []
+
+        with self.get_connection() as conn:
+            with conn.cursor(cursor_factory=cursor_type) as cursor:
+                for query, params in statements:
+                    cursor.execute("SAVEPOINT batch_stmt")
+                    try:
+                        cursor.execute(query, params)
+                        rows = cursor.fetchall()
+                    except psycopg2.Error as e:
+                        cursor.execute("ROLLBACK TO SAVEPOINT batch_stmt")
+                        results.append(e)
+                    else:
+                        cursor.execute("RELEASE SAVEPOINT batch_stmt")
+                        results.append(rows)
+
+        return results
+
     def execute_update(
         self,
         query: str,
@@ -168,6 +254,38 @@ class PostgreSQLClient:
                     total_rows += cursor.rowcount
                 return total_rows
 
+    def copy_from_records(
+        self,
+        table: str,
+        columns: Sequence[str],
+        rows: Iterable[Sequence[Any]],
+        auto_commit: bool = True
+    ) -> int:
+        """使用 COPY FROM STDIN 批量写入.
+
+        整批数据以 CSV 流一次发送，比逐行 INSERT 少得多的网络往返；
+        rows 可以是生成器，边读边编码，不在内存中拼出整批 CSV 文本.
+
+        Args:
+            table: 目标表名
+            columns: 列名（与 rows 中每个元组的顺序一致）
+            rows: 行元组序列，None 写为 NULL
+            auto_commit: 是否自动提交
+
+        Returns:
+            写入的行数
+        """
+        buf = _CSVRowStream(rows)
+
+        with self.get_connection(autocommit=auto_commit) as conn:
+            copy_sql = sql.SQL("COPY {} ({}) FROM STDIN WITH (FORMAT csv)").format(
+                sql.Identifier(table),
+                sql.SQL(", ").join(map(sql.Identifier, columns))
+            )
+            with conn.cursor() as cursor:
+                cursor.copy_expert(copy_sql.as_string(conn), buf)
+                return cursor.rowcount
+
     def execute_script(self, script: str) -> bool:
         """执行SQL脚本（多语句）.
 
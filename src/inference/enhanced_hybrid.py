@@ -63,7 +63,8 @@ class EnhancedHybridIntentRecognizer:
         enable_semantic: bool = True,
         enable_dual_recall: bool = True,  # 新增：是否启用双路召回
         enable_rerank: bool = True,  # 新增：是否启用精排
-        confidence_thresholds: dict[str, float] = None
+        confidence_thresholds: dict[str, float] = None,
+        enable_llm_batching: bool = False
     ):
         """初始化混合识别器.
 
@@ -73,6 +74,8 @@ class EnhancedHybridIntentRecognizer:
             enable_dual_recall: 是否启用双路召回（向量+图谱）
             enable_rerank: 是否启用11维特征精排
             confidence_thresholds: 各层置信度阈值
+            enable_llm_batching: 是否合并并发的L3请求为一次LLM调用（单个请求会多等待合并窗口，
+                仅在高并发时开启）
         """
         # L1: 规则识别器
         self.rule_recognizer = IntentRecognizer()
@@ -127,8 +130,10 @@ class EnhancedHybridIntentRecognizer:
         # L3: LLM识别器
         self.llm_provider = llm_provider
         if llm_provider == "zhipu":
-            # 优先使用智谱AI（国产，价格优惠）
-            self.llm_recognizer = ZhipuIntentRecognizer(model="glm-4-flash")
+            # 优先使用智谱AI（国产，价格优惠）；按需将并发请求合并为一次调用（20ms窗口）
+            self.llm_recognizer = ZhipuIntentRecognizer(
+                model="glm-4-flash", enable_batching=enable_llm_batching
+            )
         elif llm_provider == "openai":
             self.llm_recognizer = LLMIntentRecognizer(model="gpt-4o-mini")
         elif llm_provider == "local":
@@ -164,7 +169,8 @@ class EnhancedHybridIntentRecognizer:
         enable_semantic: bool = True,
         enable_dual_recall: bool = True,
         enable_rerank: bool = True,
-        confidence_thresholds: dict[str, float] = None
+        confidence_thresholds: dict[str, float] = None,
+        enable_llm_batching: bool = False
     ):
         # ... (Previous init code)
         
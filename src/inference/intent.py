@@ -86,12 +86,12 @@ class QueryIntent:
 
     query: str
     core_query: str
-    time_range: Optional[tuple[datetime, datetime]]
-    time_granularity: Optional[TimeGranularity]
-    aggregation_type: Optional[AggregationType]
-    dimensions: list[str]
-    comparison_type: Optional[str]
-    filters: dict[str, any]
+    time_range: Optional[tuple[datetime, datetime]] = None
+    time_granularity: Optional[TimeGranularity] = None
+    aggregation_type: Optional[AggregationType] = None
+    dimensions: list[str] = field(default_factory=list)
+    comparison_type: Optional[str] = None
+    filters: dict[str, any] = field(default_factory=dict)
     # 新增字段（可选，默认None）
     trend_type: Optional[TrendType] = None
     sort_requirement: Optional[SortRequirement] = None
@@ -460,8 +460,7 @@ class IntentRecognizer:
             core_query = re.sub(pattern, '', core_query)
 
         # 移除残留的 "的"、"之" 等助词
-        core_query = re.sub(r'^[的的之之]+', '', core_query)
-        core_query = re.sub(r'[的的之之]+$', '', core_query)
+        core_query = core_query.strip('的之')
 
         # 清理多余空格
         core_query = ' '.join(core_query.split())
@@ -585,8 +584,7 @@ class IntentRecognizer:
             core_query = re.sub(word, '', core_query)
 
         # 移除残留的助词和空格
-        core_query = re.sub(r'^[的的之之]+', '', core_query)
-        core_query = re.sub(r'[的的之之]+$', '', core_query)
+        core_query = core_query.strip('的之')
         core_query = ' '.join(core_query.split())
 
         return core_query
@@ -0,0 +1,143 @@
+"""LLM请求微批处理模块.
+
+将短时间窗口内到达的多个LLM请求合并为一次调用，
+分摊每次请求的网络往返与 prefill 开销。
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+
+class LLMBatcher:
+    """基于时间窗口的微批处理器.
+
+    调用方在任意线程中调用 submit()（阻塞直到结果返回）；后台线程在
+    window 秒内最多收集 max_batch 个请求，交给 batch_fn 一次处理。
+    后台线程在首次 submit() 时才启动，close() 停止线程并关闭执行器。
+
+    Attributes:
+        batch_fn: 批处理函数，输入请求列表，返回等长的结果列表
+        window: 收集窗口（秒）
+        max_batch: 单批最大请求数
+    """
+
+    def __init__(
+        self,
+        batch_fn: Callable[[list[Any]], list[Any]],
+        window: float = 0.02,
+        max_batch: int = 8,
+        max_inflight: int = 4,
+    ) -> None:
+        """初始化微批处理器.
+
+        Args:
+            batch_fn: 批处理函数
+            window: 收集窗口（秒）
+            max_batch: 单批最大请求数
+            max_inflight: 同时在途的最大批次数
+        """
+        self.batch_fn = batch_fn
+        self.window = window
+        self.max_batch = max_batch
+
+        self.max_inflight = max_inflight
+
+        self._queue: queue.Queue[Optional[tuple[Any, Future]]] = queue.Queue()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+        # 保护线程启停和统计计数（_dispatch 在多个执行器线程中并发运行）
+        self._lock = threading.Lock()
+
+        self.stats = {"requests": 0, "batches": 0}
+
+    def submit(self, item: Any, timeout: Optional[float] = None) -> Any:
+        """提交请求并等待结果.
+
+        Args:
+            item: 请求内容
+            timeout: 等待超时（秒）
+
+        Returns:
+            batch_fn 为该请求返回的结果
+
+        Raises:
+            RuntimeError: 批处理器已关闭时抛出
+        """
+        future: Future = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("LLMBatcher is closed")
+            self._ensure_started()
+            self._queue.put((item, future))
+        return future.result(timeout=timeout)
+
+    def close(self) -> None:
+        """停止后台收集线程，并等待在途批次执行完毕."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            thread, executor = self._thread, self._executor
+
+        if thread is not None:
+            self._queue.put(None)
+            thread.join()
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def _ensure_started(self) -> None:
+        """首次提交时启动后台线程和执行器（调用方需持有 _lock）."""
+        if self._thread is not None:
+            return
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_inflight, thread_name_prefix="llm-batch"
+        )
+        self._thread = threading.Thread(target=self._collect_loop, name="llm-batcher", daemon=True)
+        self._thread.start()
+
+    def _collect_loop(self) -> None:
+        """后台收集循环：阻塞等待首个请求，再在窗口内凑批；收到 None 时退出."""
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch = [first]
+            stopping = False
+            deadline = time.monotonic() + self.window
+
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    entry = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if entry is None:
+                    stopping = True
+                    break
+                batch.append(entry)
+
+            self._executor.submit(self._dispatch, batch)
+            if stopping:
+                return
+
+    def _dispatch(self, batch: list[tuple[Any, Future]]) -> None:
+        """执行一批请求，并把结果分发回各自的 Future."""
+        with self._lock:
+            self.stats["requests"] += len(batch)
+            self.stats["batches"] += 1
+
+        try:
+            results = self.batch_fn([item for item, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+
+        for i, (_, future) in enumerate(batch):
+            future.set_result(results[i] if i < len(results) else None)
@@ -0,0 +1,279 @@
+"""意图识别结果缓存模块.
+
+两级缓存:
+- L0 精确缓存: 以 (query, top_k) 为键的 LRU 字典
+- L1 语义缓存: 查询向量与历史查询向量做余弦相似度，超过阈值即复用结果
+
+命中缓存时完全跳过 L1/L2/L3 三层识别（尤其是 LLM 往返）。
+识别结果中的时间范围是按识别时刻计算的，因此两级缓存都带过期时间。
+异步入口在线程池中执行识别，并合并相同查询的并发请求。
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class CachedRecognizer:
+    """带两级缓存的意图识别器包装.
+
+    Attributes:
+        recognizer: 被包装的识别器（需提供 recognize(query, top_k=...) 方法）
+        encoder: 查询编码函数，返回归一化向量；为 None 时仅启用精确缓存
+        threshold: 语义缓存命中阈值（余弦相似度）
+        max_size: 每级缓存的最大条目数
+        ttl: 缓存条目有效期（秒），None 表示永不过期
+    """
+
+    def __init__(
+        self,
+        recognizer: Any,
+        encoder: Optional[Callable[[str], np.ndarray]] = None,
+        threshold: float = 0.97,
+        max_size: int = 1024,
+        ttl: Optional[float] = 300.0,
+    ) -> None:
+        """初始化缓存识别器.
+
+        Args:
+            recognizer: 意图识别器
+            encoder: 查询编码函数（输入文本，输出 L2 归一化向量）
+            threshold: 语义缓存命中阈值
+            max_size: 缓存最大条目数
+            ttl: 缓存条目有效期（秒）；识别结果含按当前时间计算的时间范围，不宜长期复用
+        """
+        self.recognizer = recognizer
+        self.encoder = encoder
+        self.threshold = threshold
+        self.max_size = max_size
+        self.ttl = ttl
+
+        # 精确缓存: key -> (写入时间, 结果)
+        self.exact: OrderedDict[tuple[str, int], tuple[float, Any]] = OrderedDict()
+        # 语义缓存为环形缓冲区：向量矩阵在首次写入时按容量一次分配，
+        # 之后原地覆盖最早的槽位，避免每次写入都复制整个矩阵
+        self.sem_vecs: Optional[np.ndarray] = None
+        self.sem_keys = np.full(max_size, -1, dtype=np.int64)
+        self.sem_times = np.zeros(max_size, dtype=np.float64)
+        self.sem_results: list[Any] = []
+        self._sem_next = 0
+
+        # 识别在线程池中执行，缓存读写需加锁
+        self._lock = threading.Lock()
+        # 进行中的请求（用于合并相同查询的并发请求）
+        self._pending: dict[tuple[str, int], asyncio.Future] = {}
+
+        self.stats = {"exact_hits": 0, "semantic_hits": 0, "misses": 0, "coalesced": 0}
+
+    def recognize(self, query: str, top_k: int = 10) -> Any:
+        """识别查询意图（优先命中缓存）.
+
+        Args:
+            query: 用户查询文本
+            top_k: 返回候选数量
+
+        Returns:
+            识别结果（与被包装识别器的返回类型一致）
+        """
+        key = (query.strip(), top_k)
+
+        # L0: 精确匹配
+        result = self._get_exact(key)
+        if result is not None:
+            return result
+
+        # L1: 语义匹配（单次矩阵向量乘）
+        q_vec = self._encode(key[0])
+        if q_vec is not None:
+            with self._lock:
+                idx = self._semantic_lookup(q_vec, top_k) if self.sem_vecs is not None else None
+                if idx is not None:
+                    self.stats["semantic_hits"] += 1
+                    result = self.sem_results[idx]
+                    # 沿用原条目的写入时间，不因被命中而延长有效期
+                    self._put_exact(key, result, float(self.sem_times[idx]))
+                    return result
+
+        # 未命中：执行完整识别
+        result = self.recognizer.recognize(query, top_k=top_k)
+        now = time.monotonic()
+        with self._lock:
+            self.stats["misses"] += 1
+            self._put_exact(key, result, now)
+            if q_vec is not None:
+                self._put_semantic(q_vec, top_k, result, now)
+        return result
+
+    async def recognize_async(self, query: str, top_k: int = 10) -> Any:
+        """异步识别查询意图.
+
+        识别在线程池中执行，不阻塞事件循环；相同 (query, top_k) 的并发请求
+        共享同一次识别结果。
+
+        Args:
+            query: 用户查询文本
+            top_k: 返回候选数量
+
+        Returns:
+            识别结果
+        """
+        key = (query.strip(), top_k)
+
+        # 精确命中无需切换线程
+        result = self._get_exact(key)
+        if result is not None:
+            return result
+
+        pending = self._pending.get(key)
+        if pending is not None:
+            self.stats["coalesced"] += 1
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending[key] = future
+        try:
+            result = await asyncio.to_thread(self.recognize, query, top_k)
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # 标记为已读取，避免无等待者时的告警
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            # 发起者被取消（CancelledError 不是 Exception）时 future 仍未完成，
+            # 取消它以释放所有等待者，避免其永久挂起
+            if not future.done():
+                future.cancel()
+            self._pending.pop(key, None)
+
+    def warmup(self, queries: list[str], top_k: int = 10) -> None:
+        """预热缓存（启动时预加载常见查询）.
+
+        Args:
+            queries: 常见查询列表
+            top_k: 返回候选数量
+        """
+        for query in queries:
+            try:
+                self.recognize(query, top_k=top_k)
+            except Exception as e:
+                logger.warning(f"⚠️  缓存预热失败 ({query}): {e}")
+
+    def clear(self) -> None:
+        """清空所有缓存."""
+        with self._lock:
+            self.exact.clear()
+            self.sem_vecs = None
+            self.sem_keys.fill(-1)
+            self.sem_results = []
+            self._sem_next = 0
+            for k in self.stats:
+                self.stats[k] = 0
+
+    def get_statistics(self) -> dict[str, Any]:
+        """获取缓存统计信息."""
+        return {
+            **self.stats,
+            "exact_size": len(self.exact),
+            "semantic_size": len(self.sem_results),
+            "semantic_enabled": self.encoder is not None,
+            "threshold": self.threshold,
+        }
+
+    def _get_exact(self, key: tuple[str, int]) -> Any:
+        """查询精确缓存，未命中或已过期返回 None."""
+        with self._lock:
+            entry = self.exact.get(key)
+            if entry is None:
+                return None
+            created, result = entry
+            if self._expired(created):
+                del self.exact[key]
+                return None
+            self.exact.move_to_end(key)
+            self.stats["exact_hits"] += 1
+            return result
+
+    def _expired(self, created: float) -> bool:
+        """判断写入时间为 created 的条目是否已过期."""
+        return self.ttl is not None and time.monotonic() - created > self.ttl
+
+    def _encode(self, query: str) -> Optional[np.ndarray]:
+        """编码查询，编码失败时降级为仅精确缓存."""
+        if self.encoder is None:
+            return None
+        try:
+            return np.asarray(self.encoder(query), dtype=np.float32).ravel()
+        except Exception as e:
+            logger.warning(f"⚠️  语义缓存编码失败: {e}")
+            return None
+
+    def _semantic_lookup(self, q_vec: np.ndarray, top_k: int) -> Optional[int]:
+        """在语义缓存中查找最相似的历史查询."""
+        n = len(self.sem_results)
+        scores = self.sem_vecs[:n] @ q_vec
+        # top_k 不同或已过期的结果不可复用
+        invalid = self.sem_keys[:n] != top_k
+        if self.ttl is not None:
+            invalid |= self.sem_times[:n] < time.monotonic() - self.ttl
+        scores[invalid] = -1.0
+        idx = int(np.argmax(scores))
+        if scores[idx] >= self.threshold:
+            return idx
+        return None
+
+    def _put_exact(self, key: tuple[str, int], result: Any, created: float) -> None:
+        self.exact[key] = (created, result)
+        self.exact.move_to_end(key)
+        if len(self.exact) > self.max_size:
+            self.exact.popitem(last=False)
+
+    def _put_semantic(
+        self, q_vec: np.ndarray, top_k: int, result: Any, created: float
+    ) -> None:
+        if self.sem_vecs is None:
+            self.sem_vecs = np.empty((self.max_size, q_vec.shape[0]), dtype=np.float32)
+
+        # 写入下一个槽位，缓冲区已满时即覆盖最早的条目
+        idx = self._sem_next
+        self.sem_vecs[idx] = q_vec
+        self.sem_keys[idx] = top_k
+        self.sem_times[idx] = created
+        if idx < len(self.sem_results):
+            self.sem_results[idx] = result
+        else:
+            self.sem_results.append(result)
+        self._sem_next = (idx + 1) % self.max_size
+
+
+def get_query_encoder(recognizer: Any) -> Optional[Callable[[str], np.ndarray]]:
+    """从识别器中获取已加载的查询编码函数.
+
+    优先复用双路召回的向量化器，其次复用语义召回的BGE模型，
+    避免为缓存额外加载一份模型。
+
+    Args:
+        recognizer: EnhancedHybridIntentRecognizer 实例
+
+    Returns:
+        编码函数（接受单条文本或文本列表），不可用时返回 None
+    """
+    dual_recall = getattr(recognizer, "dual_recall", None)
+    vectorizer = getattr(dual_recall, "vectorizer", None)
+    if vectorizer is not None:
+        return lambda q: vectorizer.model.encode(q, normalize_embeddings=True)
+
+    semantic_recall = getattr(recognizer, "semantic_recall", None)
+    embedding_model = getattr(semantic_recall, "embedding_model", None)
+    if embedding_model is not None and getattr(semantic_recall, "available", False):
+        return lambda q: embedding_model.encode(q, normalize=True)
+
+    return None
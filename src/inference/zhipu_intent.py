@@ -9,6 +9,8 @@ from typing import Any, Optional
 
 import httpx
 
+from .llm_batcher import LLMBatcher
+
 
 @dataclass
 class ZhipuIntentResult:
@@ -135,11 +137,22 @@ class ZhipuIntentRecognizer:
         },
     ]
 
-    def __init__(self, model: str = MODEL_FAST):
+    SYSTEM_PROMPT = "你是一个专业的BI查询意图识别专家。严格按照JSON格式输出结果，不要输出任何额外内容。"
+
+    def __init__(
+        self,
+        model: str = MODEL_FAST,
+        enable_batching: bool = False,
+        batch_window: float = 0.02,
+        max_batch: int = 8
+    ):
         """初始化智谱意图识别器.
 
         Args:
             model: 使用的模型名称
+            enable_batching: 是否合并并发请求为一次LLM调用
+            batch_window: 合并窗口（秒）
+            max_batch: 单次调用最多合并的查询数
         """
         self.model = model
         self.api_key = self.API_KEY
@@ -148,8 +161,37 @@ class ZhipuIntentRecognizer:
             print("⚠️  警告: ZHIPUAI_API_KEY 未设置")
             print("   设置方法: export ZHIPUAI_API_KEY='your-api-key'")
 
+        self.batcher = None
+        if enable_batching:
+            self.batcher = LLMBatcher(self._recognize_items, window=batch_window, max_batch=max_batch)
+
+    def close(self) -> None:
+        """关闭微批处理器的后台线程（未启用批处理时为空操作）."""
+        if self.batcher is not None:
+            self.batcher.close()
+
     def _build_prompt(self, query: str, candidates: list = None) -> str:
         """构建Few-shot提示词."""
+        return self._build_instructions(candidates) + f"""## 待识别查询
+
+查询: {query}
+
+请分析上述查询并输出JSON格式的意图信息（只输出JSON，不要输出其他内容）：
+"""
+
+    def _build_batch_prompt(self, queries: list[str], candidates: list = None) -> str:
+        """构建批量识别提示词（一次调用识别多个查询）."""
+        queries_text = "\n".join(f"{i}. {q}" for i, q in enumerate(queries))
+        return self._build_instructions(candidates) + f"""## 待识别查询（共{len(queries)}条）
+
+{queries_text}
+
+请逐条分析上述查询，输出一个JSON数组，第i个元素为第i条查询的意图信息，
+并在每个元素中增加 "index" 字段标明查询序号（只输出JSON数组，不要输出其他内容）：
+"""
+
+    def _build_instructions(self, candidates: list = None) -> str:
+        """构建提示词中与具体查询无关的部分（规则、指标列表、示例）."""
         examples_text = ""
         for i, example in enumerate(self.FEW_SHOT_EXAMPLES[:4], 1):
             examples_text += f"""
@@ -230,11 +272,6 @@ class ZhipuIntentRecognizer:
 {candidates_info}
 ## Few-Shot示例
 {examples_text}
-## 待识别查询
-
-查询: {query}
-
-请分析上述查询并输出JSON格式的意图信息（只输出JSON，不要输出其他内容）：
 """
         return prompt
 
@@ -296,6 +333,8 @@ class ZhipuIntentRecognizer:
     def recognize(self, query: str, candidates: list = None) -> Optional[ZhipuIntentResult]:
         """识别查询意图.
 
+        启用批处理时，并发到达的请求会被合并为一次LLM调用。
+
         Args:
             query: 用户查询文本
             candidates: 候选指标列表（从向量检索获取）
@@ -303,6 +342,70 @@ class ZhipuIntentRecognizer:
         Returns:
             智谱意图识别结果
         """
+        if self.batcher is not None:
+            return self.batcher.submit((query, candidates))
+        return self._recognize_single(query, candidates)
+
+    def recognize_batch(
+        self,
+        queries: list[str],
+        candidates_list: list[Optional[list]] = None
+    ) -> list[Optional[ZhipuIntentResult]]:
+        """一次LLM调用识别多个查询.
+
+        Args:
+            queries: 查询文本列表
+            candidates_list: 与查询一一对应的候选指标列表
+
+        Returns:
+            与 queries 等长的识别结果列表（失败的位置为None）
+        """
+        start_time = time.time()
+        candidates_list = candidates_list or [None] * len(queries)
+
+        # 合并各查询的候选指标（按名称去重）
+        merged_candidates = []
+        seen = set()
+        for candidates in candidates_list:
+            for c in candidates or []:
+                name = c.get('name', c.get('metric_id', ''))
+                if name not in seen:
+                    seen.add(name)
+                    merged_candidates.append(c)
+
+        try:
+            content = self.generate_response(
+                self._build_batch_prompt(queries, merged_candidates),
+                system_prompt=self.SYSTEM_PROMPT
+            )
+            if not content:
+                return [None] * len(queries)
+
+            items = json.loads(self._strip_markdown(content))
+            if not isinstance(items, list):
+                raise ValueError("批量响应不是JSON数组")
+
+            results: list[Optional[ZhipuIntentResult]] = [None] * len(queries)
+            latency = time.time() - start_time
+            for pos, intent_data in enumerate(items):
+                index = intent_data.get("index", pos)
+                if isinstance(index, int) and 0 <= index < len(queries):
+                    results[index] = self._to_result(queries[index], intent_data, latency)
+            return results
+
+        except Exception as e:
+            print(f"❌ 智谱批量意图识别异常: {e}")
+            return [None] * len(queries)
+
+    def _recognize_items(self, items: list[tuple[str, Optional[list]]]) -> list[Optional[ZhipuIntentResult]]:
+        """微批处理回调：单条走原有提示词，多条合并为一次调用."""
+        if len(items) == 1:
+            return [self._recognize_single(*items[0])]
+        queries = [query for query, _ in items]
+        return self.recognize_batch(queries, [candidates for _, candidates in items])
+
+    def _recognize_single(self, query: str, candidates: list = None) -> Optional[ZhipuIntentResult]:
+        """单条查询识别."""
         start_time = time.time()
 
         try:
@@ -310,41 +413,15 @@ class ZhipuIntentRecognizer:
             prompt = self._build_prompt(query, candidates)
             
             # 调用LLM
-            content = self.generate_response(
-                prompt, 
-                system_prompt="你是一个专业的BI查询意图识别专家。严格按照JSON格式输出结果，不要输出任何额外内容。"
-            )
+            content = self.generate_response(prompt, system_prompt=self.SYSTEM_PROMPT)
             
             if not content:
                 return None
 
-            # 清理可能的markdown标记
-            content = content.strip()
-            if content.startswith("```json"):
-                content = content[7:]
-            if content.startswith("```"):
-                content = content[3:]
-            if content.endswith("```"):
-                content = content[:-3]
-            content = content.strip()
-
-            intent_data = json.loads(content)
+            intent_data = json.loads(self._strip_markdown(content))
 
             # 构建结果
-            return ZhipuIntentResult(
-                core_query=intent_data.get("core_query", query),
-                time_range=intent_data.get("time_range"),
-                time_granularity=intent_data.get("time_granularity"),
-                aggregation_type=intent_data.get("aggregation_type"),
-                dimensions=intent_data.get("dimensions", []),
-                comparison_type=intent_data.get("comparison_type"),
-                filters=intent_data.get("filters", {}),
-                confidence=intent_data.get("confidence", 0.8),
-                reasoning=intent_data.get("reasoning", ""),
-                model=self.model,
-                latency=time.time() - start_time,
-                tokens_used={"total_tokens": 0} # 简化，如果需要精确统计需重构返回值
-            )
+            return self._to_result(query, intent_data, time.time() - start_time)
 
         except json.JSONDecodeError as e:
             print(f"❌ JSON解析失败: {e}")
@@ -354,6 +431,35 @@ class ZhipuIntentRecognizer:
             print(f"❌ 智谱意图识别异常: {e}")
             return None
 
+    @staticmethod
+    def _strip_markdown(content: str) -> str:
+        """清理可能的markdown代码块标记."""
+        content = content.strip()
+        if content.startswith("```json"):
+            content = content[7:]
+        if content.startswith("```"):
+            content = content[3:]
+        if content.endswith("```"):
+            content = content[:-3]
+        return content.strip()
+
+    def _to_result(self, query: str, intent_data: dict, latency: float) -> ZhipuIntentResult:
+        """将LLM输出的意图字典转换为识别结果."""
+        return ZhipuIntentResult(
+            core_query=intent_data.get("core_query", query),
+            time_range=intent_data.get("time_range"),
+            time_granularity=intent_data.get("time_granularity"),
+            aggregation_type=intent_data.get("aggregation_type"),
+            dimensions=intent_data.get("dimensions", []),
+            comparison_type=intent_data.get("comparison_type"),
+            filters=intent_data.get("filters", {}),
+            confidence=intent_data.get("confidence", 0.8),
+            reasoning=intent_data.get("reasoning", ""),
+            model=self.model,
+            latency=latency,
+            tokens_used={"total_tokens": 0} # 简化，如果需要精确统计需重构返回值
+        )
+
     def _generate_token(self) -> str:
         """生成智谱API的JWT token."""
         import hmac
@@ -3,7 +3,7 @@
 import logging
 import random
 from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from .mql import MQLQuery, MetricOperator, TimeRange
 from .metrics import registry
@@ -48,17 +48,98 @@ class MQLExecutionEngine:
         import time
         start_time = time.time()
 
-        # 1. 获取指标定义
+        # 1-2. 获取指标定义并生成SQL查询（替换原来的_generate_mock_data）
+        metric_def, sql, params = self._plan(mql_query)
+
+        # 3. 执行SQL查询（从PostgreSQL获取真实数据）
+        data = self._fetch_real_data(sql, params, metric_def)
+
+        result = self._post_process(mql_query, metric_def, data)
+        execution_time = int((time.time() - start_time) * 1000)
+
+        return self._build_response(mql_query, metric_def, sql, result, execution_time)
+
+    def execute_many(self, mql_queries: List[MQLQuery]) -> List[Dict[str, Any]]:
+        """批量执行MQL查询.
+
+        所有查询的SQL先统一生成，再在同一个连接上一次性执行，
+        只取还一次连接；结果后处理与 execute 完全一致.
+        与 execute 一样按查询降级：只有失败的查询使用模拟数据.
+
+        Args:
+            mql_queries: MQL查询对象列表
+
+        Returns:
+            与 mql_queries 顺序一致的查询结果字典列表（execution_time_ms 为整批耗时）
+        """
+        import time
+        start_time = time.time()
+
+        plans = [self._plan(q) for q in mql_queries]
+
+        try:
+            rows_list = self.postgres.execute_queries(
+                [(sql, params) for _, sql, params in plans]
+            )
+        except Exception as e:
+            # 取连接失败等整批错误：每条查询都按 execute 的方式降级
+            rows_list = [e] * len(plans)
+
+        data_list = []
+        for rows, (metric_def, _, _) in zip(rows_list, plans):
+            if isinstance(rows, Exception):
+                # 降级到模拟数据
+                logger.warning(f"PostgreSQL查询失败，降级到模拟数据: {rows}")
+                data_list.append(self._generate_mock_data_fallback(metric_def))
+            else:
+                data_list.append(self._format_rows(rows, metric_def))
+
+        results = [
+            self._post_process(q, metric_def, data)
+            for q, (metric_def, _, _), data in zip(mql_queries, plans, data_list)
+        ]
+        execution_time = int((time.time() - start_time) * 1000)
+
+        return [
+            self._build_response(q, metric_def, sql, result, execution_time)
+            for q, (metric_def, sql, _), result in zip(mql_queries, plans, results)
+        ]
+
+    def _plan(self, mql_query: MQLQuery) -> Tuple[Dict[str, Any], str, Dict[str, Any]]:
+        """获取指标定义并生成SQL.
+
+        Args:
+            mql_query: MQL查询对象
+
+        Returns:
+            (指标定义, SQL查询语句, 查询参数)
+
+        Raises:
+            ValueError: 指标不存在时抛出
+        """
         metric_def = self.registry.get_metric(mql_query.metric)
         if not metric_def:
             raise ValueError(f"指标不存在: {mql_query.metric}")
 
-        # 2. 生成SQL查询（替换原来的_generate_mock_data）
         sql, params = self.sql_generator.generate(mql_query)
+        return metric_def, sql, params
 
-        # 3. 执行SQL查询（从PostgreSQL获取真实数据）
-        data = self._fetch_real_data(sql, params, metric_def)
+    def _post_process(
+        self,
+        mql_query: MQLQuery,
+        metric_def: Dict[str, Any],
+        data: List[Dict[str, Any]]
+    ) -> Any:
+        """对查询数据应用操作符、分组、过滤、排序和比较.
 
+        Args:
+            mql_query: MQL查询对象
+            metric_def: 指标定义
+            data: 格式化后的查询数据
+
+        Returns:
+            处理后的结果
+        """
         # 4. 应用操作符（如果SQL中已经处理，这里可以跳过）
         result = self._apply_operator(mql_query, metric_def, data)
 
@@ -81,8 +162,17 @@ class MQLExecutionEngine:
         if mql_query.comparison:
             result = self._apply_comparison(result, mql_query.comparison, metric_def)
 
-        execution_time = int((time.time() - start_time) * 1000)
+        return result
 
+    def _build_response(
+        self,
+        mql_query: MQLQuery,
+        metric_def: Dict[str, Any],
+        sql: str,
+        result: Any,
+        execution_time: int
+    ) -> Dict[str, Any]:
+        """组装查询结果字典."""
         return {
             "query": str(mql_query),
             "metric": metric_def,
@@ -115,24 +205,39 @@ class MQLExecutionEngine:
             # 执行查询
             rows = self.postgres.execute_query(sql, params)
 
-            # 格式化结果
-            data = []
-            for row in rows:
-                data.append({
-                    "date": row.get("date", ""),
-                    "value": float(row.get("value", 0)),
-                    "metric": metric_def["name"],
-                    "unit": metric_def["unit"],
-                    **{k: v for k, v in row.items() if k not in ["date", "value"]}
-                })
-
-            return data
+            return self._format_rows(rows, metric_def)
 
         except Exception as e:
             # 降级到模拟数据
             logger.warning(f"PostgreSQL查询失败，降级到模拟数据: {e}")
             return self._generate_mock_data_fallback(metric_def)
 
+    def _format_rows(
+        self,
+        rows: List[Dict[str, Any]],
+        metric_def: Dict[str, Any]
+    ) -> List[Dict[str, Any]]:
+        """格式化数据库返回的行.
+
+        Args:
+            rows: 查询结果行
+            metric_def: 指标定义
+
+        Returns:
+            附带指标名称和单位的数据列表
+        """
+        data = []
+        for row in rows:
+            data.append({
+                "date": row.get("date", ""),
+                "value": float(row.get("value", 0)),
+                "metric": metric_def["name"],
+                "unit": metric_def["unit"],
+                **{k: v for k, v in row.items() if k not in ["date", "value"]}
+            })
+
+        return data
+
     def _has_aggregate_in_sql(self, mql_query: MQLQuery) -> bool:
         """检查SQL中是否已包含聚合.
 
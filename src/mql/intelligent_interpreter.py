@@ -2,9 +2,10 @@
 
 import json
 import logging
-import statistics
 from typing import Any, Dict, List, Optional
 
+import numpy as np
+
 from .models import InterpretationResult, DataAnalysisResult
 
 logger = logging.getLogger(__name__)
@@ -109,12 +110,13 @@ class IntelligentInterpreter:
                 "std": 0
             }
 
-        values = [row["value"] for row in data]
+        raw_values = [row["value"] for row in data]
+        values = np.asarray(raw_values, dtype=np.float64)
 
         # 计算变化率
         first_val = values[0]
         last_val = values[-1]
-        change_rate = (last_val - first_val) / first_val * 100 if first_val != 0 else 0
+        change_rate = float((last_val - first_val) / first_val * 100) if first_val != 0 else 0
 
         # 判断趋势
         if change_rate > 10:
@@ -126,25 +128,23 @@ class IntelligentInterpreter:
         else:
             trend = "fluctuating"
 
-        # 计算统计量
-        mean_val = statistics.mean(values)
-        std_val = statistics.stdev(values) if len(values) > 1 else 0
+        # 计算统计量（样本标准差，与 statistics.stdev 一致）
+        mean_val = float(values.mean())
+        std_val = float(values.std(ddof=1))
         volatility = (std_val / mean_val * 100) if mean_val != 0 else 0
 
         # 识别异常值（超过2个标准差）
         anomalies = []
         if len(values) > 3:
-            for i, v in enumerate(values):
-                if abs(v - mean_val) > 2 * std_val:
-                    anomalies.append(i)
+            anomalies = np.flatnonzero(np.abs(values - mean_val) > 2 * std_val).tolist()
 
         return {
             "trend": trend,
             "change_rate": round(change_rate, 2),
             "volatility": round(volatility, 2),
             "anomalies": anomalies,
-            "min": round(min(values), 2),
-            "max": round(max(values), 2),
+            "min": round(min(raw_values), 2),
+            "max": round(max(raw_values), 2),
             "avg": round(mean_val, 2),
             "std": round(std_val, 2)
         }
@@ -2,7 +2,7 @@
 
 import logging
 from datetime import datetime
-from typing import Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
 from .mql import MQLQuery, MetricOperator, Filter, TimeRange
 from .metrics import registry
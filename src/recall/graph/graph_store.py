@@ -6,8 +6,13 @@ from src.config.settings import settings
 class GraphStore:
     """知识图谱存储服务 (业务层封装)."""
 
-    def __init__(self):
-        self.client = Neo4jClient(
+    def __init__(self, client: Optional[Neo4jClient] = None):
+        """初始化.
+
+        Args:
+            client: 已有的 Neo4j 客户端（如应用启动时创建的共享客户端），默认按配置新建
+        """
+        self.client = client or Neo4jClient(
             uri=settings.neo4j.uri,
             user=settings.neo4j.user,
             password=settings.neo4j.password
@@ -40,6 +45,7 @@ class GraphStore:
             m.code = $code,
             m.description = $description,
             m.formula = $formula,
+            m.content_hash = $content_hash,
             m.updated_at = datetime()
         """
         self.client.execute_write(query_metric, {
@@ -47,7 +53,8 @@ class GraphStore:
             "name": metric['name'],
             "code": metric['code'],
             "description": metric.get('description', ''),
-            "formula": metric.get('formula', '')
+            "formula": metric.get('formula', ''),
+            "content_hash": metric.get('content_hash')
         })
 
         # 2. Link to Domain
@@ -63,6 +70,117 @@ class GraphStore:
                 "id": metric['id']
             })
 
+    def upsert_metrics_batch(self, metrics: List[Dict[str, Any]], batch_size: int = 1000) -> int:
+        """批量更新或插入指标节点及领域关系.
+
+        使用 UNWIND 在一次事务中写入一批指标，避免逐条往返.
+
+        Args:
+            metrics: 指标列表
+            batch_size: 每个事务写入的指标数
+
+        Returns:
+            写入的指标数量
+        """
+        query = """
+        UNWIND $rows AS r
+        MERGE (m:Metric {id: r.id})
+        SET m.name = r.name,
+            m.code = r.code,
+            m.description = r.description,
+            m.formula = r.formula,
+            m.content_hash = r.content_hash,
+            m.updated_at = datetime()
+        WITH m, r
+        WHERE r.domain IS NOT NULL AND r.domain <> ''
+        MERGE (d:Domain {name: r.domain})
+        MERGE (m)-[:BELONGS_TO]->(d)
+        """
+        rows = [
+            {
+                "id": metric['id'],
+                "name": metric['name'],
+                "code": metric['code'],
+                "description": metric.get('description', ''),
+                "formula": metric.get('formula', ''),
+                "domain": metric.get('domain'),
+                "content_hash": metric.get('content_hash'),
+            }
+            for metric in metrics
+        ]
+
+        for i in range(0, len(rows), batch_size):
+            self.client.execute_write(query, {"rows": rows[i:i + batch_size]})
+
+        return len(rows)
+
+    def get_content_hashes(self, metric_ids: List[str]) -> Dict[str, str]:
+        """批量查询已入库指标的内容指纹.
+
+        Args:
+            metric_ids: 指标 ID 列表
+
+        Returns:
+            指标 ID 到 content_hash 的映射（未入库或无指纹的指标不出现）
+        """
+        query = """
+        UNWIND $ids AS id
+        MATCH (m:Metric {id: id})
+        WHERE m.content_hash IS NOT NULL
+        RETURN m.id AS id, m.content_hash AS content_hash
+        """
+        records = self.client.execute_query(query, {"ids": metric_ids})
+        return {r["id"]: r["content_hash"] for r in records}
+
+    def set_content_hashes(
+        self,
+        hashes: Dict[str, str],
+        summary_texts: Optional[Dict[str, str]] = None
+    ) -> None:
+        """批量写入指标的内容指纹.
+
+        Args:
+            hashes: 指标 ID 到 content_hash 的映射
+            summary_texts: 指标 ID 到 GLM 摘要文本的映射（可选，供跳过摘要生成时复用）
+        """
+        if summary_texts:
+            query = """
+            UNWIND $rows AS r
+            MATCH (m:Metric {id: r.id})
+            SET m.content_hash = r.content_hash,
+                m.summary_text = coalesce(r.summary_text, m.summary_text)
+            """
+            rows = [
+                {"id": k, "content_hash": v, "summary_text": summary_texts.get(k)}
+                for k, v in hashes.items()
+            ]
+        else:
+            query = """
+            UNWIND $rows AS r
+            MATCH (m:Metric {id: r.id})
+            SET m.content_hash = r.content_hash
+            """
+            rows = [{"id": k, "content_hash": v} for k, v in hashes.items()]
+        self.client.execute_write(query, {"rows": rows})
+
+    def get_summary_texts(self, metric_ids: List[str]) -> Dict[str, str]:
+        """批量查询已保存的 GLM 摘要文本.
+
+        Args:
+            metric_ids: 指标 ID 列表
+
+        Returns:
+            指标 ID 到摘要文本的映射（无摘要的指标不出现）
+        """
+        query = """
+        UNWIND $ids AS id
+        MATCH (m:Metric {id: id})
+        WHERE m.summary_text IS NOT NULL
+        RETURN m.id AS id, m.summary_text AS summary_text
+        """
+        records = self.client.execute_query(query, {"ids": metric_ids})
+        return {r["id"]: r["summary_text"] for r in records}
+
     def search_by_domain(self, domain: str) -> List[Dict[str, Any]]:
         """根据领域查找指标."""
         query = """
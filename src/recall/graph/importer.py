@@ -12,8 +12,80 @@ from src.recall.graph.models import (
 from src.recall.graph.neo4j_client import Neo4jClient
 
 
+# 每个写事务最多处理的行数
+CHUNK_SIZE = 10000
+
+_METRICS_QUERY = """
+UNWIND $rows AS r
+MERGE (m:Metric {id: r.metric_id})
+SET m += r
+RETURN count(*) AS count
+"""
+
+_DIMENSIONS_QUERY = """
+UNWIND $rows AS r
+MERGE (d:Dimension {dimension_id: r.dimension_id})
+SET d += r
+RETURN count(*) AS count
+"""
+
+_DOMAINS_QUERY = """
+UNWIND $rows AS r
+MERGE (d:Domain {name: r.name})
+SET d += r
+RETURN count(*) AS count
+"""
+
+# 各关系类型对应的 UNWIND 语句（端点不存在时该行不计数）
+_RELATION_QUERIES = {
+    "belongs_to_domain": """
+        UNWIND $rows AS r
+        MATCH (m:Metric {id: r.metric_id})
+        MATCH (d:Domain {domain_id: r.domain_id})
+        MERGE (m)-[rel:BELONGS_TO]->(d)
+        SET rel.weight = r.weight
+        RETURN count(*) AS count
+    """,
+    "has_dimension": """
+        UNWIND $rows AS r
+        MATCH (m:Metric {id: r.metric_id})
+        MATCH (d:Dimension {dimension_id: r.dimension_id})
+        MERGE (m)-[rel:HAS_DIMENSION]->(d)
+        SET rel.required = r.required
+        RETURN count(*) AS count
+    """,
+    "derived_from": """
+        UNWIND $rows AS r
+        MATCH (s:Metric {id: r.source_metric_id})
+        MATCH (t:Metric {id: r.target_metric_id})
+        MERGE (s)-[rel:DERIVED_FROM]->(t)
+        SET rel.confidence = r.confidence, rel.formula = r.formula
+        RETURN count(*) AS count
+    """,
+    "correlates_with": """
+        UNWIND $rows AS r
+        MATCH (a:Metric {id: r.metric_id_1})
+        MATCH (b:Metric {id: r.metric_id_2})
+        MERGE (a)-[rel:CORRELATED_WITH]->(b)
+        SET rel.weight = r.weight, rel.correlation_type = r.correlation_type
+        RETURN count(*) AS count
+    """,
+}
+
+# 各关系类型的可选字段默认值
+_RELATION_DEFAULTS = {
+    "belongs_to_domain": {"weight": 1.0},
+    "has_dimension": {"required": True},
+    "derived_from": {"confidence": 0.8, "formula": None},
+    "correlates_with": {"weight": 0.5, "correlation_type": "positive"},
+}
+
+
 class GraphImporter:
-    """图谱数据批量导入工具."""
+    """图谱数据批量导入工具.
+
+    每类数据按 CHUNK_SIZE 分块，每块通过一条 UNWIND 语句在单个事务中写入.
+    """
 
     def __init__(self, graph_store: GraphStore) -> None:
         """初始化导入器.
@@ -23,6 +95,22 @@ class GraphImporter:
         """
         self.store = graph_store
 
+    def _write_rows(self, query: str, rows: list[dict[str, Any]]) -> int:
+        """分块执行 UNWIND 写入.
+
+        Args:
+            query: 以 $rows 为参数、返回 count 的 Cypher 语句
+            rows: 行数据
+
+        Returns:
+            写入的行数
+        """
+        count = 0
+        for i in range(0, len(rows), CHUNK_SIZE):
+            result = self.store.client.execute_query(query, {"rows": rows[i:i + CHUNK_SIZE]})
+            count += result[0]["count"] if result else 0
+        return count
+
     def import_metrics_batch(
         self,
         metrics: list[dict[str, Any]],
@@ -37,10 +125,8 @@ class GraphImporter:
         Returns:
             成功导入的数量
         """
-        count = 0
-        total = len(metrics)
-
-        for i, metric_data in enumerate(metrics):
+        rows = []
+        for metric_data in metrics:
             try:
                 metric = MetricNode(
                     metric_id=metric_data["metric_id"],
@@ -52,16 +138,13 @@ class GraphImporter:
                     synonyms=metric_data.get("synonyms", []),
                     formula=metric_data.get("formula"),
                 )
-
-                self.store.create_metric_node(metric)
-                count += 1
-
-                if show_progress and (i + 1) % 10 == 0:
-                    print(f"  进度: {i + 1}/{total}")
-
+                rows.append(metric.to_cypher_props())
             except Exception as e:
                 print(f"  警告: 导入指标 {metric_data.get('metric_id')} 失败: {e}")
 
+        count = self._write_rows(_METRICS_QUERY, rows)
+        if show_progress:
+            print(f"  进度: {count}/{len(metrics)}")
         return count
 
     def import_dimensions_batch(
@@ -76,7 +159,7 @@ class GraphImporter:
         Returns:
             成功导入的数量
         """
-        count = 0
+        rows = []
         for dim_data in dimensions:
             try:
                 dimension = DimensionNode(
@@ -85,13 +168,11 @@ class GraphImporter:
                     description=dim_data["description"],
                     values=dim_data.get("values", []),
                 )
-
-                self.store.create_dimension_node(dimension)
-                count += 1
+                rows.append(dimension.to_cypher_props())
             except Exception as e:
                 print(f"  警告: 导入维度 {dim_data.get('dimension_id')} 失败: {e}")
 
-        return count
+        return self._write_rows(_DIMENSIONS_QUERY, rows)
 
     def import_domains_batch(
         self,
@@ -105,7 +186,7 @@ class GraphImporter:
         Returns:
             成功导入的数量
         """
-        count = 0
+        rows = []
         for domain_data in domains:
             try:
                 domain = BusinessDomainNode(
@@ -113,13 +194,11 @@ class GraphImporter:
                     name=domain_data["name"],
                     description=domain_data["description"],
                 )
-
-                self.store.create_domain_node(domain)
-                count += 1
+                rows.append(domain.to_cypher_props())
             except Exception as e:
                 print(f"  警告: 导入业务域 {domain_data.get('domain_id')} 失败: {e}")
 
-        return count
+        return self._write_rows(_DOMAINS_QUERY, rows)
 
     def import_relations_batch(
         self,
@@ -127,51 +206,30 @@ class GraphImporter:
     ) -> int:
         """批量导入关系.
 
+        按关系类型分组，每种类型一条 UNWIND 语句.
+
         Args:
             relations: 关系数据列表
 
         Returns:
             成功导入的数量
         """
-        count = 0
+        rows_by_type: dict[str, list[dict[str, Any]]] = {}
         for rel_data in relations:
-            try:
-                rel_type = rel_data["type"]
-
-                if rel_type == "belongs_to_domain":
-                    self.store.add_belongs_to_domain(
-                        metric_id=rel_data["metric_id"],
-                        domain_id=rel_data["domain_id"],
-                        weight=rel_data.get("weight", 1.0),
-                    )
-
-                elif rel_type == "has_dimension":
-                    self.store.add_has_dimension(
-                        metric_id=rel_data["metric_id"],
-                        dimension_id=rel_data["dimension_id"],
-                        required=rel_data.get("required", True),
-                    )
-
-                elif rel_type == "derived_from":
-                    self.store.add_derived_from(
-                        source_metric_id=rel_data["source_metric_id"],
-                        target_metric_id=rel_data["target_metric_id"],
-                        confidence=rel_data.get("confidence", 0.8),
-                        formula=rel_data.get("formula"),
-                    )
-
-                elif rel_type == "correlates_with":
-                    self.store.add_correlates_with(
-                        metric_id_1=rel_data["metric_id_1"],
-                        metric_id_2=rel_data["metric_id_2"],
-                        weight=rel_data.get("weight", 0.5),
-                        correlation_type=rel_data.get("correlation_type", "positive"),
-                    )
-
-                count += 1
+            rel_type = rel_data.get("type")
+            if rel_type not in _RELATION_QUERIES:
+                print(f"  警告: 导入关系失败: 未知关系类型 {rel_type}")
+                continue
+            rows_by_type.setdefault(rel_type, []).append(
+                {**_RELATION_DEFAULTS[rel_type], **rel_data}
+            )
 
+        count = 0
+        for rel_type, rows in rows_by_type.items():
+            try:
+                count += self._write_rows(_RELATION_QUERIES[rel_type], rows)
             except Exception as e:
-                print(f"  警告: 导入关系失败: {e}")
+                print(f"  警告: 导入 {rel_type} 关系失败: {e}")
 
         return count
 
@@ -188,13 +188,10 @@ class FallbackSemanticRecall:
         score_threshold: float = 0.5
     ) -> SemanticRecallResult:
         """执行兜底召回."""
-        import re
-
         start = time.time()
 
-        # 清理查询
-        query_clean = re.sub(r'^[的的之之]+', '', query.lower().strip())
-        query_clean = re.sub(r'[的的之之]+$', '', query_clean)
+        # 清理查询（去除首尾的 "的"、"之" 等助词）
+        query_clean = query.lower().strip().strip('的之')
 
         # 简单匹配算法
         candidates = []
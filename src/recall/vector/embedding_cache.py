@@ -0,0 +1,114 @@
+"""向量磁盘缓存.
+
+按 (模型及推理配置, 截断长度, 文本) 的哈希缓存归一化后的向量，
+初始化脚本重复运行时未变化的指标文本无需再次前向编码.
+"""
+
+import hashlib
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+
+class EmbeddingCache:
+    """基于 SQLite 的向量缓存.
+
+    向量以 float16 字节存储（磁盘占用减半），读出时转回 float32；
+    归一化向量在 fp16 下的余弦相似度误差可忽略.
+
+    Attributes:
+        path: SQLite 数据库文件路径
+    """
+
+    def __init__(self, path: str) -> None:
+        """初始化缓存（自动创建目录和表）.
+
+        Args:
+            path: SQLite 数据库文件路径
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(
+        model_name: str,
+        text: str,
+        max_length: Optional[int] = None,
+        backend: str = "torch",
+        dtype: Optional[str] = "float32",
+        pooling: Optional[str] = None,
+        model_path: Optional[str] = None,
+    ) -> str:
+        """计算缓存键.
+
+        同名模型换推理后端、权重精度、池化方式或 ONNX 导出文件后向量都会变化，
+        这些配置都参与缓存键.
+
+        Args:
+            model_name: 模型名称
+            text: 编码文本
+            max_length: 截断长度（不同截断得到的向量不同）
+            backend: 推理后端（torch/onnx）
+            dtype: 权重精度
+            pooling: 池化方式（由后端外部指定时，如 ONNX 的 cls/mean）
+            model_path: 本地模型文件路径（如 ONNX 导出目录）
+
+        Returns:
+            十六进制哈希字符串
+        """
+        raw = f"{model_name}|{backend}|{dtype}|{pooling}|{model_path}|{max_length}|{text}"
+        return hashlib.blake2b(raw.encode("utf-8"), digest_size=20).hexdigest()
+
+    def get_many(self, keys: list[str]) -> dict[str, np.ndarray]:
+        """批量读取缓存.
+
+        Args:
+            keys: 缓存键列表
+
+        Returns:
+            命中的键到 float32 向量的映射
+        """
+        if not keys:
+            return {}
+        found: dict[str, np.ndarray] = {}
+        with self._lock:
+            # SQLite 默认最多 999 个绑定参数，分块查询
+            for i in range(0, len(keys), 900):
+                chunk = keys[i:i + 900]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", chunk
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = np.frombuffer(blob, dtype=np.float16).astype(np.float32)
+        return found
+
+    def put_many(self, keys: list[str], vectors: np.ndarray) -> None:
+        """批量写入缓存.
+
+        Args:
+            keys: 缓存键列表
+            vectors: 与 keys 等长的向量矩阵
+        """
+        rows = [
+            (key, vector.astype(np.float16).tobytes())
+            for key, vector in zip(keys, np.asarray(vectors))
+        ]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)", rows
+            )
+            self._conn.commit()
+
+    def close(self) -> None:
+        """关闭数据库连接."""
+        self._conn.close()
@@ -0,0 +1,158 @@
+"""ONNX Runtime 句向量编码器.
+
+用 INT8 量化的 ONNX 模型替代 PyTorch SentenceTransformer，CPU 推理延迟约减半.
+对外保持与 SentenceTransformer 相同的 encode 接口，MetricVectorizer 可直接替换.
+
+模型导出（一次性）:
+    optimum-cli export onnx --model BAAI/bge-m3 --optimize O2 bge-m3-onnx
+    optimum-cli onnxruntime quantize --onnx_model bge-m3-onnx --avx512_vnni -o bge-m3-onnx-int8
+"""
+
+from typing import Any, Optional, Union
+
+import numpy as np
+
+
+def pool_embeddings(
+    token_embeddings: np.ndarray,
+    attention_mask: np.ndarray,
+    pooling: str = "cls",
+    normalize: bool = True,
+) -> np.ndarray:
+    """将 token 级输出池化为句向量.
+
+    Args:
+        token_embeddings: shape为 (batch, seq_len, dim) 的模型输出
+        attention_mask: shape为 (batch, seq_len) 的注意力掩码
+        pooling: 池化方式，cls（BGE系列）或 mean（m3e 等）
+        normalize: 是否做 L2 归一化
+
+    Returns:
+        shape为 (batch, dim) 的句向量
+    """
+    if pooling == "cls":
+        out = token_embeddings[:, 0]
+    elif pooling == "mean":
+        mask = attention_mask[..., np.newaxis].astype(token_embeddings.dtype)
+        out = (token_embeddings * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+    else:
+        raise ValueError(f"Unsupported pooling: {pooling}")
+
+    out = out.astype(np.float32, copy=False)
+    if normalize:
+        out /= np.clip(np.linalg.norm(out, axis=1, keepdims=True), 1e-12, None)
+    return out
+
+
+class ONNXSentenceEncoder:
+    """基于 ONNX Runtime 的句向量编码器（SentenceTransformer 兼容接口）.
+
+    Attributes:
+        model_path: 导出的 ONNX 模型目录
+        pooling: 池化方式
+        max_length: 最大 token 长度
+    """
+
+    def __init__(
+        self,
+        model_path: str,
+        pooling: str = "cls",
+        max_length: int = 512,
+        num_threads: int = 4,
+    ) -> None:
+        """初始化并加载 ONNX 模型.
+
+        Args:
+            model_path: 导出的 ONNX 模型目录
+            pooling: 池化方式（cls/mean）
+            max_length: 最大 token 长度
+            num_threads: ONNX Runtime 算子内线程数
+
+        Raises:
+            ImportError: 如果未安装 optimum[onnxruntime]
+        """
+        try:
+            from onnxruntime import GraphOptimizationLevel, SessionOptions
+            from optimum.onnxruntime import ORTModelForFeatureExtraction
+            from transformers import AutoTokenizer
+        except ImportError as e:
+            msg = "ONNX backend requires: pip install optimum[onnxruntime] transformers"
+            raise ImportError(msg) from e
+
+        self.model_path = model_path
+        self.pooling = pooling
+        self.max_length = max_length
+
+        session_options = SessionOptions()
+        session_options.intra_op_num_threads = num_threads
+        session_options.graph_optimization_level = GraphOptimizationLevel.ORT_ENABLE_ALL
+
+        self.tokenizer = AutoTokenizer.from_pretrained(model_path)
+        self.model = ORTModelForFeatureExtraction.from_pretrained(
+            model_path,
+            provider="CPUExecutionProvider",
+            session_options=session_options,
+        )
+        self._dimension: Optional[int] = None
+
+    def encode(
+        self,
+        sentences: Union[str, list[str]],
+        normalize_embeddings: bool = False,
+        batch_size: int = 32,
+        show_progress_bar: bool = False,
+        convert_to_numpy: bool = True,
+        max_length: Optional[int] = None,
+        **kwargs: Any,
+    ) -> np.ndarray:
+        """编码文本为向量.
+
+        Args:
+            sentences: 单个文本或文本列表
+            normalize_embeddings: 是否 L2 归一化
+            batch_size: 批处理大小
+            show_progress_bar: 兼容参数（不显示进度条）
+            convert_to_numpy: 兼容参数（始终返回 numpy）
+            max_length: 本次调用的最大 token 长度（不超过实例上限），默认使用实例配置
+
+        Returns:
+            单个文本返回 (dim,)，列表返回 (n, dim)
+        """
+        single_input = isinstance(sentences, str)
+        texts = [sentences] if single_input else list(sentences)
+        max_length = min(max_length, self.max_length) if max_length else self.max_length
+
+        # 按长度降序编码，同批文本长度相近，padding 最少；结果再还原为输入顺序
+        order = np.argsort([-len(t) for t in texts], kind="stable")
+        texts = [texts[i] for i in order]
+
+        batches = []
+        for i in range(0, len(texts), batch_size):
+            inputs = self.tokenizer(
+                texts[i:i + batch_size],
+                padding=True,
+                truncation=True,
+                max_length=max_length,
+                return_tensors="np",
+            )
+            outputs = self.model(**inputs)
+            batches.append(pool_embeddings(
+                np.asarray(outputs.last_hidden_state),
+                inputs["attention_mask"],
+                pooling=self.pooling,
+                normalize=normalize_embeddings,
+            ))
+
+        if not batches:
+            return np.empty((0, self.get_sentence_embedding_dimension()), dtype=np.float32)
+
+        sorted_embeddings = np.concatenate(batches, axis=0)
+        embeddings = np.empty_like(sorted_embeddings)
+        embeddings[order] = sorted_embeddings
+        return embeddings[0] if single_input else embeddings
+
+    def get_sentence_embedding_dimension(self) -> int:
+        """获取向量维度."""
+        if self._dimension is None:
+            self._dimension = int(self.encode("维度探测").shape[-1])
+        return self._dimension
@@ -3,18 +3,23 @@
 提供 Qdrant 的连接管理、Collection 创建、批量 upsert 和 ANN 检索功能.
 """
 
+import os
+import time
 import uuid
-from typing import Any, Optional
+from typing import Any, Iterable, Optional
 
 import numpy as np
 from qdrant_client import QdrantClient
 from qdrant_client.http.exceptions import UnexpectedResponse
 from qdrant_client.http.models import (
+    CollectionStatus,
     Distance,
     PointStruct,
+    SearchRequest,
     UpdateStatus,
     VectorParams,
     HnswConfigDiff,
+    OptimizersConfigDiff,
 )
 
 from src.config import QdrantConfig
@@ -52,6 +57,8 @@ class QdrantVectorStore:
     # 默认 HNSW 索引参数
     DEFAULT_M = 16
     DEFAULT_EF_CONSTRUCTION = 200
+    # 默认索引阈值（KB），低于该大小的 segment 不建 HNSW
+    DEFAULT_INDEXING_THRESHOLD = 20000
 
     def __init__(self, config: Optional[QdrantConfig] = None) -> None:
         """初始化 Qdrant 客户端.
@@ -82,7 +89,13 @@ class QdrantVectorStore:
                     url=self.config.http_url,
                     api_key=self.config.api_key,
                     timeout=self.config.timeout,
-                    prefer_grpc=False,  # 使用 HTTP 而不是 gRPC
+                    grpc_port=self.config.grpc_port,
+                    prefer_grpc=self.config.prefer_grpc,  # 批量导入时可启用 gRPC
+                    # gRPC 通道常驻复用：定期 keepalive，空闲 5 分钟内不主动断开
+                    grpc_options={
+                        "grpc.keepalive_time_ms": 30000,
+                        "grpc.client_idle_timeout_ms": 300000,
+                    } if self.config.prefer_grpc else None,
                 )
         return self.client
 
@@ -90,12 +103,15 @@ class QdrantVectorStore:
         self,
         vector_size: int = 768,
         recreate: bool = False,
+        bulk_mode: bool = False,
     ) -> bool:
         """创建 Collection.
 
         Args:
             vector_size: 向量维度，默认为 768（m3e-base）
             recreate: 如果已存在是否重建
+            bulk_mode: 批量导入模式，创建时关闭 HNSW 与索引优化，
+                导入完成后需调用 finish_bulk_load() 恢复
 
         Returns:
             是否创建成功
@@ -127,9 +143,10 @@ class QdrantVectorStore:
                     distance=Distance.COSINE,
                 ),
                 hnsw_config=HnswConfigDiff(
-                    m=self.DEFAULT_M,
+                    m=0 if bulk_mode else self.DEFAULT_M,
                     ef_construct=self.DEFAULT_EF_CONSTRUCTION,
                 ),
+                optimizers_config=OptimizersConfigDiff(indexing_threshold=0) if bulk_mode else None,
             )
             return True
         except Exception as e:
@@ -209,11 +226,102 @@ class QdrantVectorStore:
 
         return total_upserted
 
+    def upload_stream(
+        self,
+        points: Iterable[tuple[str, list[float] | np.ndarray, dict[str, Any]]],
+        batch_size: int = 256,
+        parallel: Optional[int] = None,
+    ) -> int:
+        """流式导入向量（边生成边上传）.
+
+        points 可以是生成器，调用方按块向量化后逐条产出，
+        内存中只保留当前块，不需要一次性持有全部向量.
+
+        Args:
+            points: (id, 向量, payload) 三元组的可迭代对象
+            batch_size: 每批上传的点数
+            parallel: 并行 worker 数，默认为 CPU 核数
+
+        Returns:
+            上传的点数量
+
+        Raises:
+            RuntimeError: 上传失败时抛出
+        """
+        client = self.connect()
+        count = 0
+
+        def to_points():
+            nonlocal count
+            for idx, vector, payload in points:
+                count += 1
+                yield PointStruct(
+                    id=str(_string_to_uuid(str(idx))),
+                    vector=vector.tolist() if isinstance(vector, np.ndarray) else vector,
+                    payload=payload,
+                )
+
+        try:
+            client.upload_points(
+                collection_name=self.config.collection_name,
+                points=to_points(),
+                batch_size=batch_size,
+                parallel=parallel or os.cpu_count() or 1,
+                wait=True,
+            )
+        except Exception as e:
+            msg = f"Failed to upload points after {count}: {e}"
+            raise RuntimeError(msg) from e
+
+        return count
+
+    def finish_bulk_load(self, wait: bool = True, timeout: float = 300.0) -> bool:
+        """结束批量导入模式，恢复 HNSW 与索引优化参数.
+
+        导入期间不建索引，避免与写入争抢 CPU/内存；恢复后一次性构建 HNSW.
+
+        Args:
+            wait: 是否等待索引构建完成（Collection 状态变为 GREEN）
+            timeout: 等待超时时间（秒）
+
+        Returns:
+            索引是否已就绪（wait=False 时返回 False）
+
+        Raises:
+            RuntimeError: 更新配置失败时抛出
+        """
+        client = self.connect()
+        collection_name = self.config.collection_name
+
+        try:
+            client.update_collection(
+                collection_name=collection_name,
+                optimizers_config=OptimizersConfigDiff(
+                    indexing_threshold=self.DEFAULT_INDEXING_THRESHOLD,
+                ),
+                hnsw_config=HnswConfigDiff(m=self.DEFAULT_M),
+            )
+        except Exception as e:
+            msg = f"Failed to restore index config: {e}"
+            raise RuntimeError(msg) from e
+
+        if not wait:
+            return False
+
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if client.get_collection(collection_name).status == CollectionStatus.GREEN:
+                return True
+            time.sleep(0.5)
+        return False
+
     def search(
         self,
         query_vector: list[float] | np.ndarray,
         top_k: int = 10,
         score_threshold: Optional[float] = None,
+        with_payload: bool | list[str] = True,
+        with_vectors: bool = False,
     ) -> list[dict[str, Any]]:
         """ANN 检索，返回 Top-K 相似向量.
 
@@ -221,6 +329,8 @@ class QdrantVectorStore:
             query_vector: 查询向量（768维）
             top_k: 返回前 K 个结果
             score_threshold: 相似度阈值，低于该值的结果将被过滤
+            with_payload: 返回的 payload，True 为全部字段，列表为只返回指定字段
+            with_vectors: 是否返回向量
 
         Returns:
             检索结果列表，每个元素包含：
@@ -247,6 +357,8 @@ class QdrantVectorStore:
                 query_vector=query_vector,
                 limit=top_k,
                 score_threshold=score_threshold,
+                with_payload=with_payload,
+                with_vectors=with_vectors,
             )
         except UnexpectedResponse as e:
             msg = f"Search failed: {e}"
@@ -264,6 +376,56 @@ class QdrantVectorStore:
 
         return results
 
+    def search_batch(
+        self,
+        query_vectors: list[list[float] | np.ndarray] | np.ndarray,
+        top_k: int = 10,
+        score_threshold: Optional[float] = None,
+        with_payload: bool | list[str] = True,
+        with_vectors: bool = False,
+    ) -> list[list[dict[str, Any]]]:
+        """批量 ANN 检索，一次请求完成多个查询.
+
+        Args:
+            query_vectors: 查询向量列表或 shape 为 (n, dim) 的矩阵
+            top_k: 每个查询返回前 K 个结果
+            score_threshold: 相似度阈值
+            with_payload: 返回的 payload，True 为全部字段，列表为只返回指定字段
+            with_vectors: 是否返回向量
+
+        Returns:
+            与 query_vectors 一一对应的检索结果列表，元素格式同 search()
+        """
+        if len(query_vectors) == 0:
+            return []
+
+        client = self.connect()
+
+        requests = [
+            SearchRequest(
+                vector=v.tolist() if isinstance(v, np.ndarray) else v,
+                limit=top_k,
+                score_threshold=score_threshold,
+                with_payload=with_payload,
+                with_vector=with_vectors,
+            )
+            for v in query_vectors
+        ]
+
+        try:
+            batch_result = client.search_batch(
+                collection_name=self.config.collection_name,
+                requests=requests,
+            )
+        except UnexpectedResponse as e:
+            msg = f"Batch search failed: {e}"
+            raise RuntimeError(msg) from e
+
+        return [
+            [{"id": hit.id, "score": hit.score, "payload": hit.payload} for hit in hits]
+            for hits in batch_result
+        ]
+
     def count(self) -> int:
         """获取 Collection 中的向量数量.
 
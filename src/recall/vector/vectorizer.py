@@ -3,14 +3,19 @@
 使用 m3e-base 模型将指标元数据转换为向量表示.
 """
 
-from typing import Optional
+from functools import lru_cache
+from typing import Callable, Optional
 
 import numpy as np
+import torch
 from sentence_transformers import SentenceTransformer
+from sentence_transformers.models import Normalize, Pooling, Transformer
 from tqdm import tqdm
 
 from src.config import settings
+from src.recall.vector.embedding_cache import EmbeddingCache
 from src.recall.vector.models import MetricMetadata
+from src.recall.vector.onnx_encoder import ONNXSentenceEncoder
 
 class MetricVectorizer:
     """指标向量化器.
@@ -20,22 +25,55 @@ class MetricVectorizer:
 
     Attributes:
         model_name: 使用的 embedding 模型名称
-        _model: SentenceTransformer 模型实例（延迟加载）
+        backend: 推理后端（torch 为 SentenceTransformer，onnx 为 INT8 ONNX Runtime）
+        dtype: torch 后端的权重精度（float32/float16/bfloat16）
+        device: 运行设备（cpu/cuda/auto）
+        batch_size: 批量编码的批大小
+        onnx_model_path: ONNX 模型目录（backend=onnx 时使用）
+        cache: 向量磁盘缓存（未配置时为 None）
+        _model: 模型实例（延迟加载）
     """
 
-    def __init__(self, model_name: str = None) -> None:
+    def __init__(
+        self,
+        model_name: str = None,
+        backend: str = None,
+        dtype: str = None,
+        device: str = None,
+        batch_size: int = None,
+        cache_path: str = None,
+        onnx_model_path: str = None,
+    ) -> None:
         """初始化向量化器.
 
         Args:
             model_name: 预训练模型名称，默认为配置中的模型
+            backend: 推理后端（torch/onnx），默认为配置中的后端
+            dtype: 权重精度（float32/float16/bfloat16），默认为配置中的精度
+            device: 运行设备（cpu/cuda/auto），默认为配置中的设备
+            batch_size: 批量编码的批大小，默认为配置中的批大小
+            cache_path: 向量磁盘缓存文件路径，默认为配置中的路径（为空则不缓存）
+            onnx_model_path: ONNX 模型目录；默认仅当 model_name 与配置中的模型一致时
+                使用配置中的路径（该目录是为配置中的模型导出的）
         """
         self.model_name = model_name or settings.vectorizer.model_name
+        self.backend = backend or settings.vectorizer.backend
+        self.dtype = dtype or settings.vectorizer.dtype
+        self.device = self._resolve_device(device or settings.vectorizer.device)
+        self.batch_size = batch_size or settings.vectorizer.batch_size
+        if onnx_model_path is None and self.model_name == settings.vectorizer.model_name:
+            onnx_model_path = settings.vectorizer.onnx_model_path
+        self.onnx_model_path: Optional[str] = onnx_model_path
+        cache_path = cache_path or settings.vectorizer.cache_path
+        self.cache: Optional[EmbeddingCache] = EmbeddingCache(cache_path) if cache_path else None
         self._model: Optional[SentenceTransformer] = None
 
     @property
     def model(self) -> SentenceTransformer:
         """获取模型实例（延迟加载）.
 
+        backend=onnx 时返回接口兼容的 ONNXSentenceEncoder.
+
         Returns:
             SentenceTransformer 模型实例
 
@@ -44,12 +82,83 @@ class MetricVectorizer:
         """
         if self._model is None:
             try:
-                self._model = SentenceTransformer(self.model_name)
+                if self.backend == "onnx":
+                    self._model = self._load_onnx_model()
+                else:
+                    self._model = self._cast_model(
+                        SentenceTransformer(self.model_name, device=self.device)
+                    )
             except Exception as e:
                 msg = f"Failed to load model {self.model_name}: {e}"
                 raise RuntimeError(msg) from e
         return self._model
 
+    @staticmethod
+    def _resolve_device(device: str) -> str:
+        """解析运行设备，auto 时有 GPU 则用 cuda.
+
+        Args:
+            device: 配置的设备名
+
+        Returns:
+            实际使用的设备名
+        """
+        if device == "auto":
+            return "cuda" if torch.cuda.is_available() else "cpu"
+        return device
+
+    def _cast_model(self, model: SentenceTransformer) -> SentenceTransformer:
+        """按配置转换权重精度.
+
+        CPU 推理受内存带宽限制，bf16 权重可使带宽减半；GPU 上 fp16 可用满 Tensor Core.
+        encode() 输出会自动转回 float32，下游无需改动.
+
+        Args:
+            model: 已加载的模型
+
+        Returns:
+            转换精度后的模型
+        """
+        if self.dtype == "bfloat16":
+            return model.to(torch.bfloat16)
+        if self.dtype == "float16":
+            return model.half()
+        if self.dtype != "float32":
+            raise ValueError(f"Unsupported dtype: {self.dtype}")
+        return model
+
+    def _load_onnx_model(self) -> ONNXSentenceEncoder:
+        """加载 INT8 量化的 ONNX 模型.
+
+        Returns:
+            ONNXSentenceEncoder 实例
+        """
+        if not self.onnx_model_path:
+            raise ValueError(
+                f"No ONNX export for {self.model_name}: VECTORIZER_ONNX_MODEL_PATH only applies "
+                "to the configured model; pass onnx_model_path explicitly for other models"
+            )
+        return ONNXSentenceEncoder(self.onnx_model_path, pooling=self._onnx_pooling())
+
+    def _onnx_pooling(self) -> str:
+        """ONNX 后端的池化方式：BGE 系列使用 CLS 池化，m3e 等使用均值池化."""
+        return "cls" if "bge" in self.model_name.lower() else "mean"
+
+    def _cache_key_fields(self) -> dict[str, Optional[str]]:
+        """会改变向量结果的推理配置，参与磁盘缓存键.
+
+        Returns:
+            传给 EmbeddingCache.make_key 的关键字参数
+        """
+        if self.backend == "onnx":
+            return {
+                "backend": "onnx",
+                "dtype": None,
+                "pooling": self._onnx_pooling(),
+                "model_path": self.onnx_model_path,
+            }
+        return {"backend": self.backend, "dtype": self.dtype}
+
     def _build_text_template(self, metadata: MetricMetadata) -> str:
         """构建向量化文本模板.
 
@@ -114,12 +223,16 @@ class MetricVectorizer:
         self,
         metrics: list[MetricMetadata],
         show_progress: bool = True,
+        batch_size: int = None,
     ) -> np.ndarray:
         """批量指标向量化.
 
+        全部文本一次交给 encode()，由其按 batch_size 切批并在设备上完成归一化.
+
         Args:
             metrics: 指标元数据列表
             show_progress: 是否显示进度条
+            batch_size: 批大小，默认使用实例配置
 
         Returns:
             shape为 (n, 768) 的向量矩阵，n为指标数量
@@ -134,26 +247,171 @@ class MetricVectorizer:
         if not metrics:
             return np.array([]).reshape(0, 768)
 
-        texts = [self._build_text_template(metric) for metric in metrics]
+        texts = self.build_texts(metrics)
 
-        if show_progress:
-            # 使用 sentence_transformers 的批量编码，手动添加进度条
-            embeddings = self.model.encode(
-                texts,
+        return self._encode_cached(
+            texts,
+            lambda pending: self.model.encode(
+                pending,
                 normalize_embeddings=True,
+                convert_to_numpy=True,
                 show_progress_bar=show_progress,
-                batch_size=32,
-            )
-        else:
-            embeddings = self.model.encode(
+                batch_size=batch_size or self.batch_size,
+            ),
+        )
+
+    def build_texts(self, metrics: list[MetricMetadata]) -> list[str]:
+        """构建指标的向量化文本.
+
+        Args:
+            metrics: 指标元数据列表
+
+        Returns:
+            与 metrics 等长的文本列表
+        """
+        return [self._build_text_template(metric) for metric in metrics]
+
+    def encode_texts(
+        self,
+        texts: list[str],
+        max_length: int = 128,
+        show_progress: bool = False,
+    ) -> np.ndarray:
+        """编码已构建好的文本，并限制最大 token 长度.
+
+        个别超长描述会把整批 padding 拉到 512 token，截断到 max_length 可避免整批变慢.
+
+        Args:
+            texts: 由 build_texts() 构建的文本列表
+            max_length: 最大 token 长度（不会超过模型自身上限）
+            show_progress: 是否显示进度条
+
+        Returns:
+            shape为 (n, dim) 的归一化向量矩阵
+        """
+        return self._encode_cached(
+            texts,
+            lambda pending: self._encode_truncated(pending, max_length, show_progress),
+            max_length=max_length,
+        )
+
+    def _encode_truncated(
+        self, texts: list[str], max_length: int, show_progress: bool
+    ) -> np.ndarray:
+        """按 max_length 截断编码.
+
+        截断长度随每次调用传给分词器，不改写模型的 max_seq_length：
+        模型是 get_vectorizer() 的进程级单例，改写属性会影响并发的其他编码调用.
+        torch 后端自行分词后前向，只支持 Transformer 后接 Pooling/Normalize 的模型.
+
+        Raises:
+            RuntimeError: 模型包含其他模块时抛出
+        """
+        model = self.model
+        if isinstance(model, ONNXSentenceEncoder):
+            return model.encode(
                 texts,
                 normalize_embeddings=True,
-                show_progress_bar=False,
-                batch_size=32,
+                batch_size=self.batch_size,
+                max_length=max_length,
+            )
+
+        modules = list(model)
+        if not (
+            isinstance(modules[0], Transformer)
+            and all(isinstance(m, (Pooling, Normalize)) for m in modules[1:])
+        ):
+            names = " -> ".join(type(m).__name__ for m in modules)
+            raise RuntimeError(
+                f"Per-call truncation only supports Transformer -> Pooling/Normalize models, got {names}"
             )
 
+        max_length = min(model.max_seq_length, max_length)
+        # 与 Transformer.tokenize 一致：去除首尾空白，按模型配置转小写
+        lower = getattr(modules[0], "do_lower_case", False)
+        texts = [t.strip().lower() if lower else t.strip() for t in texts]
+        # 按长度降序分批，同批文本长度相近，padding 最少；结果再还原为输入顺序
+        order = np.argsort([-len(t) for t in texts], kind="stable")
+        sorted_texts = [texts[i] for i in order]
+
+        batches = []
+        starts = range(0, len(sorted_texts), self.batch_size)
+        for start in tqdm(starts, desc="Encoding", disable=not show_progress):
+            features = model.tokenizer(
+                sorted_texts[start:start + self.batch_size],
+                padding=True,
+                truncation=True,
+                max_length=max_length,
+                return_tensors="pt",
+            )
+            features = {k: v.to(model.device) for k, v in features.items()}
+            with torch.inference_mode():
+                output = model(features)["sentence_embedding"]
+            output = torch.nn.functional.normalize(output.float(), p=2, dim=1)
+            batches.append(output.cpu().numpy())
+
+        if not batches:
+            return np.empty((0, model.get_sentence_embedding_dimension()), dtype=np.float32)
+
+        sorted_embeddings = np.concatenate(batches, axis=0)
+        embeddings = np.empty_like(sorted_embeddings)
+        embeddings[order] = sorted_embeddings
         return embeddings
 
+    def _encode_cached(
+        self,
+        texts: list[str],
+        encode: Callable[[list[str]], np.ndarray],
+        max_length: Optional[int] = None,
+    ) -> np.ndarray:
+        """先查磁盘缓存，只对未命中且去重后的文本调用 encode.
+
+        Args:
+            texts: 待编码文本列表
+            encode: 实际编码函数
+            max_length: 截断长度（参与缓存键）
+
+        Returns:
+            与 texts 顺序一致的向量矩阵
+        """
+        if self.cache is None or not texts:
+            return encode(texts)
+
+        key_fields = self._cache_key_fields()
+        keys = [
+            EmbeddingCache.make_key(self.model_name, text, max_length, **key_fields)
+            for text in texts
+        ]
+        vectors = self.cache.get_many(keys)
+
+        # 同一批内的重复文本只编码一次
+        pending = {key: text for key, text in zip(keys, texts) if key not in vectors}
+        if pending:
+            encoded = encode(list(pending.values()))
+            self.cache.put_many(list(pending), encoded)
+            vectors.update(zip(pending, encoded))
+
+        return np.stack([vectors[key] for key in keys]).astype(np.float32, copy=False)
+
+    def encode_texts_raw(self, texts: list[str]) -> np.ndarray:
+        """直接编码已构建好的文本（整批一次前向）.
+
+        跳过元数据到文本的格式化，适合对同一批文本反复编码的场景（如基准测试）.
+
+        Args:
+            texts: 由 build_texts() 构建的文本列表
+
+        Returns:
+            shape为 (n, dim) 的归一化向量矩阵
+        """
+        return self.model.encode(
+            texts,
+            batch_size=len(texts) or 1,
+            show_progress_bar=False,
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+        )
+
     @property
     def embedding_dim(self) -> int:
         """获取向量维度.
@@ -162,3 +420,39 @@ class MetricVectorizer:
             向量维度（m3e-base 为 768）
         """
         return self.model.get_sentence_embedding_dimension()
+
+
+def get_vectorizer(
+    model_name: Optional[str] = None,
+    backend: Optional[str] = None,
+    onnx_model_path: Optional[str] = None,
+) -> MetricVectorizer:
+    """获取进程内共享的向量化器（按模型名、后端和 ONNX 模型目录缓存）.
+
+    同一进程内的多个模块共用一份已加载的模型 / ONNX 会话，避免重复读取模型文件.
+    缺省参数先解析为配置值再查缓存，get_vectorizer() 与显式传入配置值得到同一实例.
+
+    Args:
+        model_name: 预训练模型名称，默认为配置中的模型
+        backend: 推理后端（torch/onnx），默认为配置中的后端
+        onnx_model_path: ONNX 模型目录，默认见 MetricVectorizer
+
+    Returns:
+        MetricVectorizer 实例
+    """
+    model_name = model_name or settings.vectorizer.model_name
+    if onnx_model_path is None and model_name == settings.vectorizer.model_name:
+        onnx_model_path = settings.vectorizer.onnx_model_path
+    return _shared_vectorizer(model_name, backend or settings.vectorizer.backend, onnx_model_path)
+
+
+@lru_cache(maxsize=None)
+def _shared_vectorizer(
+    model_name: str, backend: str, onnx_model_path: Optional[str]
+) -> MetricVectorizer:
+    """按解析后的参数缓存向量化器实例."""
+    return MetricVectorizer(
+        model_name=model_name,
+        backend=backend,
+        onnx_model_path=onnx_model_path,
+    )
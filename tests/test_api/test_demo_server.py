@@ -0,0 +1,75 @@
+"""测试演示服务器的 V3 响应缓存."""
+
+import importlib
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+
+@pytest.fixture(scope="module")
+def demo():
+    """导入演示服务器模块（使用规则识别，不调用真实 LLM）."""
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv("ZHIPUAI_API_KEY", "test-key")
+        mp.setenv("USE_REAL_LLM", "false")
+        module = importlib.import_module("scripts.run_demo_server")
+    return module
+
+
+class FrozenDatetime(datetime):
+    """固定当前时间，使“本月”和“最近7天”的起始日期必然不同."""
+
+    @classmethod
+    def now(cls, tz=None):
+        return cls(2024, 2, 20, 12, 0, 0)
+
+
+class FakeLLMRecognizer:
+    """按查询文本返回时间范围的 L3 识别器."""
+
+    def recognize(self, query, candidates=None):
+        value = "this_month" if "本月" in query else "7d"
+        return SimpleNamespace(
+            dimensions=[], time_range={"value": value}, confidence=0.9, tokens_used={}
+        )
+
+
+class FakeInterpreter:
+    """不调用 LLM 的智能解读器."""
+
+    def interpret(self, query, mql_result, metric_def):
+        return SimpleNamespace(summary=f"{query} 解读", trend="stable", key_findings=[])
+
+
+@pytest.fixture
+def query_cache(demo, monkeypatch: pytest.MonkeyPatch):
+    """清空响应缓存，并替换 L3 识别与智能解读中的 LLM 调用."""
+    monkeypatch.setattr(demo, "datetime", FrozenDatetime)
+    monkeypatch.setattr(demo.demo_recognizer, "llm_recognizer", FakeLLMRecognizer())
+    monkeypatch.setattr(demo, "intelligent_interpreter", FakeInterpreter())
+    demo.query_v3_cache.clear()
+    yield demo.query_v3_cache
+    demo.query_v3_cache.clear()
+
+
+class TestQueryV3Cache:
+    """V3 整份响应缓存测试."""
+
+    def test_near_duplicate_queries_are_not_shared(self, query_cache) -> None:
+        """测试只差时间范围的相似查询各自计算，不复用对方的响应."""
+        week = query_cache.recognize("最近7天的GMV")
+        month = query_cache.recognize("本月的GMV")
+
+        assert week["intent"]["time_range"] == ["2024-02-13", "2024-02-20"]
+        assert month["intent"]["time_range"] == ["2024-02-01", "2024-02-20"]
+        assert len(week["data"]) != len(month["data"])
+        assert week["interpretation"]["summary"] == "最近7天的GMV 解读"
+        assert month["interpretation"]["summary"] == "本月的GMV 解读"
+
+    def test_identical_query_hits_cache(self, query_cache) -> None:
+        """测试完全相同的查询命中缓存."""
+        first = query_cache.recognize("最近7天的GMV")
+
+        assert query_cache.recognize("最近7天的GMV") is first
+        assert query_cache.stats["exact_hits"] == 1
@@ -0,0 +1,118 @@
+"""测试管理 API 的批量导入."""
+
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+
+from src.api import management_api
+from src.api.management_api import TaskStatus, _process_batch_import
+
+
+class FakeGraphStore:
+    """内存中的图谱存储，跨导入保存内容指纹和摘要文本."""
+
+    hashes: Dict[str, str] = {}
+    summary_texts: Dict[str, str] = {}
+
+    def __init__(self, client: Any = None) -> None:
+        self.client = client
+
+    def upsert_metrics_batch(self, metrics: List[Dict[str, Any]], batch_size: int = 1000) -> int:
+        # 写入时不带指纹，即清除旧指纹
+        for metric in metrics:
+            self.hashes.pop(metric["id"], None)
+        return len(metrics)
+
+    def get_content_hashes(self, metric_ids: List[str]) -> Dict[str, str]:
+        return {i: self.hashes[i] for i in metric_ids if i in self.hashes}
+
+    def get_summary_texts(self, metric_ids: List[str]) -> Dict[str, str]:
+        return {i: self.summary_texts[i] for i in metric_ids if i in self.summary_texts}
+
+    def set_content_hashes(
+        self, hashes: Dict[str, str], summary_texts: Optional[Dict[str, str]] = None
+    ) -> None:
+        self.hashes.update(hashes)
+        self.summary_texts.update(summary_texts or {})
+
+
+class FakeSummaryService:
+    """记录调用的 GLM 摘要服务."""
+
+    def __init__(self) -> None:
+        self.generated: List[str] = []
+
+    async def batch_generate_summaries(self, metrics, batch_size=10, show_progress=True):
+        self.generated.extend(m["code"] for m in metrics)
+        return [{"llm_friendly_text": f"{m['name']} 摘要"} for m in metrics]
+
+
+@pytest.fixture
+def services(monkeypatch: pytest.MonkeyPatch) -> SimpleNamespace:
+    """替换图谱存储和摘要服务，构造带向量库与向量化器的请求."""
+    monkeypatch.setattr(FakeGraphStore, "hashes", {})
+    monkeypatch.setattr(FakeGraphStore, "summary_texts", {})
+    monkeypatch.setattr(management_api, "GraphStore", FakeGraphStore)
+
+    summary_service = FakeSummaryService()
+    monkeypatch.setattr(management_api, "get_summary_service", lambda: summary_service)
+
+    vectorizer = MagicMock()
+    vectorizer.vectorize.return_value = np.zeros(4, dtype=np.float32)
+    vector_store = MagicMock()
+    request = SimpleNamespace(app=SimpleNamespace(state=SimpleNamespace(
+        vector_store=vector_store, neo4j_client=MagicMock(), vectorizer=vectorizer,
+    )))
+    return SimpleNamespace(
+        request=request, summary_service=summary_service, vector_store=vector_store
+    )
+
+
+class TestBatchImportContentHash:
+    """内容指纹跳过 GLM 摘要测试."""
+
+    async def _import(self, task_id: str, metrics: List[Dict[str, Any]], request) -> TaskStatus:
+        management_api._tasks[task_id] = TaskStatus(
+            task_id=task_id, status="pending", progress=0.0, total=len(metrics), completed=0
+        )
+        try:
+            await _process_batch_import(
+                task_id, metrics, True, True, True, 10, request
+            )
+            return management_api._tasks[task_id]
+        finally:
+            management_api._tasks.pop(task_id, None)
+
+    async def test_reimport_skips_glm_but_indexes_vectors(self, services) -> None:
+        """测试同一批次导入两次：第二次跳过 GLM，但仍写入向量库."""
+        metrics = [
+            {
+                "name": "GMV",
+                "code": "gmv",
+                "description": "成交总额",
+                "domain": "电商",
+                "content_hash": "h-gmv",
+            },
+            {
+                "name": "日活",
+                "code": "dau",
+                "description": "日活跃用户数",
+                "domain": "用户",
+                "content_hash": "h-dau",
+            },
+        ]
+
+        first = await self._import("import_first", metrics, services.request)
+        assert first.status == "completed"
+        assert services.summary_service.generated == ["gmv", "dau"]
+        assert services.vector_store.upsert.call_count == 2
+
+        second = await self._import("import_second", metrics, services.request)
+        assert second.status == "completed"
+        assert second.result.success == 2
+        # 第二次没有再调用 GLM，但两个指标都重新向量化入库
+        assert services.summary_service.generated == ["gmv", "dau"]
+        assert services.vector_store.upsert.call_count == 4
@@ -0,0 +1,104 @@
+"""LLM微批处理器测试."""
+
+import threading
+from concurrent.futures import Future
+
+import pytest
+
+from src.inference.llm_batcher import LLMBatcher
+
+
+def submit_concurrently(batcher: LLMBatcher, items: list) -> list:
+    """在多个线程中并发提交请求，按提交顺序返回结果."""
+    results = [None] * len(items)
+
+    def worker(i, item):
+        results[i] = batcher.submit(item, timeout=5)
+
+    threads = [threading.Thread(target=worker, args=(i, item)) for i, item in enumerate(items)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results
+
+
+class TestLLMBatcher:
+    """LLMBatcher 测试."""
+
+    def test_single_request(self):
+        """测试单个请求直接返回结果."""
+        batcher = LLMBatcher(lambda items: [item * 2 for item in items], window=0.01)
+
+        assert batcher.submit(21, timeout=5) == 42
+        assert batcher.stats["batches"] == 1
+
+    def test_concurrent_requests_are_batched(self):
+        """测试窗口内的并发请求合并为一批."""
+        batch_sizes = []
+
+        def batch_fn(items):
+            batch_sizes.append(len(items))
+            return [f"result-{item}" for item in items]
+
+        batcher = LLMBatcher(batch_fn, window=0.2, max_batch=8)
+        results = submit_concurrently(batcher, list(range(5)))
+
+        assert results == [f"result-{i}" for i in range(5)]
+        assert sum(batch_sizes) == 5
+        assert len(batch_sizes) < 5
+
+    def test_max_batch_is_respected(self):
+        """测试单批不超过 max_batch."""
+        batch_sizes = []
+
+        def batch_fn(items):
+            batch_sizes.append(len(items))
+            return items
+
+        batcher = LLMBatcher(batch_fn, window=0.2, max_batch=3)
+        submit_concurrently(batcher, list(range(7)))
+
+        assert max(batch_sizes) <= 3
+        assert sum(batch_sizes) == 7
+
+    def test_short_result_list_fills_none(self):
+        """测试批处理返回结果不足时缺失位置为 None."""
+        batcher = LLMBatcher(lambda items: items[:1])
+        futures = [Future(), Future()]
+        batcher._dispatch([("a", futures[0]), ("b", futures[1])])
+
+        assert [f.result() for f in futures] == ["a", None]
+
+    def test_exception_propagates(self):
+        """测试批处理异常传递给所有请求方."""
+
+        def batch_fn(items):
+            raise RuntimeError("LLM unavailable")
+
+        batcher = LLMBatcher(batch_fn, window=0.01)
+
+        with pytest.raises(RuntimeError):
+            batcher.submit("GMV", timeout=5)
+
+    def test_thread_starts_lazily_and_close_stops_it(self):
+        """测试后台线程首次提交时才启动，close 后线程退出且拒绝新请求."""
+        batcher = LLMBatcher(lambda items: items, window=0.01)
+        assert batcher._thread is None
+
+        assert batcher.submit("GMV", timeout=5) == "GMV"
+        thread = batcher._thread
+        assert thread.is_alive()
+
+        batcher.close()
+        assert not thread.is_alive()
+        with pytest.raises(RuntimeError):
+            batcher.submit("DAU", timeout=5)
+
+    def test_stats_consistent_under_concurrency(self):
+        """测试多个批次并发执行时统计计数不丢失."""
+        batcher = LLMBatcher(lambda items: items, window=0.001, max_batch=1, max_inflight=4)
+        submit_concurrently(batcher, list(range(50)))
+        batcher.close()
+
+        assert batcher.stats == {"requests": 50, "batches": 50}
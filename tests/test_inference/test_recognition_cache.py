@@ -0,0 +1,199 @@
+"""意图识别缓存测试."""
+
+import asyncio
+import time
+
+import numpy as np
+import pytest
+
+from src.inference import recognition_cache
+from src.inference.recognition_cache import CachedRecognizer
+
+
+class FakeRecognizer:
+    """记录调用次数的识别器."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def recognize(self, query, top_k=10):
+        self.calls += 1
+        return {"query": query, "top_k": top_k}
+
+
+def fake_encoder(query: str) -> np.ndarray:
+    """按首字符生成归一化向量（首字符相同即视为语义相同）."""
+    vec = np.zeros(8, dtype=np.float32)
+    vec[ord(query[0]) % 8] = 1.0
+    return vec
+
+
+class TestCachedRecognizer:
+    """两级缓存测试."""
+
+    def test_exact_hit(self):
+        """测试精确缓存命中."""
+        inner = FakeRecognizer()
+        cache = CachedRecognizer(inner)
+
+        first = cache.recognize("GMV", top_k=5)
+        second = cache.recognize("GMV ", top_k=5)
+
+        assert first is second
+        assert inner.calls == 1
+        assert cache.stats["exact_hits"] == 1
+
+    def test_top_k_is_part_of_key(self):
+        """测试 top_k 不同不复用结果."""
+        inner = FakeRecognizer()
+        cache = CachedRecognizer(inner, encoder=fake_encoder)
+
+        cache.recognize("GMV", top_k=5)
+        cache.recognize("GMV", top_k=10)
+
+        assert inner.calls == 2
+
+    def test_semantic_hit(self):
+        """测试语义缓存命中."""
+        inner = FakeRecognizer()
+        cache = CachedRecognizer(inner, encoder=fake_encoder)
+
+        first = cache.recognize("GMV")
+        second = cache.recognize("GMV是多少")
+
+        assert first is second
+        assert inner.calls == 1
+        assert cache.stats["semantic_hits"] == 1
+
+    def test_semantic_miss_below_threshold(self):
+        """测试相似度低于阈值时不命中."""
+        inner = FakeRecognizer()
+        cache = CachedRecognizer(inner, encoder=fake_encoder)
+
+        cache.recognize("A")
+        cache.recognize("B")
+
+        assert inner.calls == 2
+
+    def test_eviction(self):
+        """测试超出容量时淘汰最早条目."""
+        inner = FakeRecognizer()
+        cache = CachedRecognizer(inner, encoder=fake_encoder, max_size=2)
+
+        for query in ["A", "B", "C"]:
+            cache.recognize(query)
+
+        assert len(cache.exact) == 2
+        assert len(cache.sem_results) == 2
+        assert cache.sem_vecs.shape[0] == 2
+        assert ("A", 10) not in cache.exact
+
+        # 环形缓冲区中 "A" 的槽位已被 "C" 覆盖，语义上也不再命中
+        cache.recognize("A是多少")
+        assert inner.calls == 4
+
+    def test_expired_entries_are_not_reused(self, monkeypatch: pytest.MonkeyPatch):
+        """测试超过有效期的条目在两级缓存中都不再命中."""
+        now = [1000.0]
+        monkeypatch.setattr(recognition_cache.time, "monotonic", lambda: now[0])
+        inner = FakeRecognizer()
+        cache = CachedRecognizer(inner, encoder=fake_encoder, ttl=60)
+
+        cache.recognize("GMV")
+        now[0] += 30
+        cache.recognize("GMV")
+        cache.recognize("GMV是多少")
+        assert inner.calls == 1
+
+        now[0] += 31
+        cache.recognize("GMV是多少")
+        cache.recognize("GMV")
+        assert inner.calls == 2
+
+    def test_encoder_failure_falls_back_to_exact(self):
+        """测试编码失败时降级为精确缓存."""
+
+        def broken_encoder(query):
+            raise RuntimeError("model unavailable")
+
+        inner = FakeRecognizer()
+        cache = CachedRecognizer(inner, encoder=broken_encoder)
+
+        cache.recognize("GMV")
+        cache.recognize("GMV")
+
+        assert inner.calls == 1
+
+    def test_clear(self):
+        """测试清空缓存."""
+        inner = FakeRecognizer()
+        cache = CachedRecognizer(inner, encoder=fake_encoder)
+
+        cache.recognize("GMV")
+        cache.clear()
+        cache.recognize("GMV")
+
+        assert inner.calls == 2
+        assert cache.get_statistics()["semantic_size"] == 1
+
+
+class SlowRecognizer(FakeRecognizer):
+    """模拟耗时识别（阻塞调用）."""
+
+    def recognize(self, query, top_k=10):
+        time.sleep(0.05)
+        return super().recognize(query, top_k=top_k)
+
+
+class TestCachedRecognizerAsync:
+    """异步入口测试."""
+
+    async def test_concurrent_identical_queries_are_coalesced(self):
+        """测试相同查询的并发请求只识别一次."""
+        inner = SlowRecognizer()
+        cache = CachedRecognizer(inner)
+
+        results = await asyncio.gather(*(cache.recognize_async("GMV") for _ in range(5)))
+
+        assert inner.calls == 1
+        assert all(r is results[0] for r in results)
+        assert cache.stats["coalesced"] == 4
+
+    async def test_different_queries_run_independently(self):
+        """测试不同查询不会被合并."""
+        inner = SlowRecognizer()
+        cache = CachedRecognizer(inner)
+
+        await asyncio.gather(cache.recognize_async("GMV"), cache.recognize_async("DAU"))
+
+        assert inner.calls == 2
+
+    async def test_error_propagates_to_all_waiters(self):
+        """测试识别异常传递给所有等待者."""
+        class BrokenRecognizer:
+            def recognize(self, query, top_k=10):
+                time.sleep(0.05)
+                raise RuntimeError("LLM timeout")
+
+        cache = CachedRecognizer(BrokenRecognizer())
+
+        results = await asyncio.gather(
+            cache.recognize_async("GMV"), cache.recognize_async("GMV"), return_exceptions=True
+        )
+
+        assert all(isinstance(r, RuntimeError) for r in results)
+        assert not cache._pending
+
+    async def test_cancelled_leader_releases_waiters(self):
+        """测试发起者被取消时等待者不会永久挂起."""
+        cache = CachedRecognizer(SlowRecognizer())
+
+        leader = asyncio.create_task(cache.recognize_async("GMV"))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(cache.recognize_async("GMV"))
+        await asyncio.sleep(0)
+        leader.cancel()
+
+        with pytest.raises(asyncio.CancelledError):
+            await asyncio.wait_for(follower, timeout=1.0)
+        assert not cache._pending
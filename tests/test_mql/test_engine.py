@@ -0,0 +1,66 @@
+"""测试 MQLExecutionEngine 批量执行（使用 Mock 客户端，无需 PostgreSQL）."""
+
+from datetime import datetime
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.mql.engine import MQLExecutionEngine
+from src.mql.mql import MetricOperator, MQLQuery, TimeRange
+
+
+@pytest.fixture
+def time_range() -> TimeRange:
+    """固定的一周时间范围."""
+    return TimeRange(start=datetime(2024, 1, 1), end=datetime(2024, 1, 7), granularity="day")
+
+
+class TestExecuteMany:
+    """execute_many 测试套件."""
+
+    def test_single_round_trip(self, time_range: TimeRange) -> None:
+        """测试多条查询只取一次连接，结果与 execute 一致."""
+        rows = [{"date": "2024-01-01", "value": 10}, {"date": "2024-01-02", "value": 20}]
+        postgres = MagicMock()
+        postgres.execute_queries.side_effect = lambda statements: [rows for _ in statements]
+        postgres.execute_query.return_value = rows
+        engine = MQLExecutionEngine(postgres_client=postgres)
+
+        queries = [
+            MQLQuery(metric="GMV", time_range=time_range),
+            MQLQuery(metric="GMV", operator=MetricOperator.SUM, time_range=time_range),
+        ]
+        results = engine.execute_many(queries)
+
+        assert postgres.execute_queries.call_count == 1
+        postgres.execute_query.assert_not_called()
+        assert len(postgres.execute_queries.call_args.args[0]) == 2
+        for query, result in zip(queries, results):
+            expected = engine.execute(query)
+            assert result["sql"] == expected["sql"]
+            assert result["result"] == expected["result"]
+        assert results[1]["result"][0]["value"] == 30
+
+    def test_fallback_on_failure(self, time_range: TimeRange) -> None:
+        """测试批量查询失败时每条查询都降级到模拟数据."""
+        postgres = MagicMock()
+        postgres.execute_queries.side_effect = ConnectionError("down")
+        engine = MQLExecutionEngine(postgres_client=postgres)
+
+        results = engine.execute_many([MQLQuery(metric="GMV", time_range=time_range)] * 2)
+
+        assert len(results) == 2
+        assert all(r["row_count"] > 0 for r in results)
+
+    def test_only_failed_query_degrades(self, time_range: TimeRange) -> None:
+        """测试单条语句失败时只有该查询降级，其余查询保留真实数据."""
+        rows = [{"date": "2024-01-01", "value": 10}]
+        postgres = MagicMock()
+        postgres.execute_queries.return_value = [rows, RuntimeError("bad sql")]
+        engine = MQLExecutionEngine(postgres_client=postgres)
+
+        results = engine.execute_many([MQLQuery(metric="GMV", time_range=time_range)] * 2)
+
+        assert results[0]["result"][0]["value"] == 10.0
+        assert results[0]["row_count"] == 1
+        assert results[1]["row_count"] > 1
@@ -0,0 +1,44 @@
+"""测试 EmbeddingCache 向量磁盘缓存."""
+
+import numpy as np
+
+from src.recall.vector.embedding_cache import EmbeddingCache
+
+
+class TestEmbeddingCache:
+    """EmbeddingCache 测试套件."""
+
+    def test_roundtrip_float16(self, tmp_path) -> None:
+        """测试写入后可读回，且以 float32 返回."""
+        cache = EmbeddingCache(str(tmp_path / "cache" / "embeddings.sqlite3"))
+        vectors = np.random.default_rng(0).standard_normal((2, 8)).astype(np.float32)
+
+        cache.put_many(["a", "b"], vectors)
+        found = cache.get_many(["a", "b", "missing"])
+
+        assert set(found) == {"a", "b"}
+        assert found["a"].dtype == np.float32
+        np.testing.assert_allclose(found["b"], vectors[1], atol=1e-2)
+
+    def test_key_depends_on_model_and_length(self) -> None:
+        """测试缓存键区分模型名和截断长度."""
+        key = EmbeddingCache.make_key("m3e", "GMV")
+
+        assert key == EmbeddingCache.make_key("m3e", "GMV")
+        assert key != EmbeddingCache.make_key("bge", "GMV")
+        assert key != EmbeddingCache.make_key("m3e", "GMV", max_length=128)
+
+    def test_key_depends_on_inference_config(self) -> None:
+        """测试缓存键区分推理后端、精度、池化方式和 ONNX 模型路径."""
+        key = EmbeddingCache.make_key("bge", "GMV")
+
+        assert key != EmbeddingCache.make_key("bge", "GMV", dtype="bfloat16")
+        assert key != EmbeddingCache.make_key("bge", "GMV", backend="onnx", dtype=None)
+        assert EmbeddingCache.make_key(
+            "bge", "GMV", backend="onnx", pooling="cls", model_path="/models/a"
+        ) != EmbeddingCache.make_key(
+            "bge", "GMV", backend="onnx", pooling="mean", model_path="/models/a"
+        )
+        assert EmbeddingCache.make_key(
+            "bge", "GMV", backend="onnx", model_path="/models/a"
+        ) != EmbeddingCache.make_key("bge", "GMV", backend="onnx", model_path="/models/b")
@@ -0,0 +1,86 @@
+"""测试 GraphImporter 批量写入（使用 Mock 客户端，无需 Neo4j）."""
+
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.recall.graph import importer as importer_module
+from src.recall.graph.importer import (
+    SAMPLE_DOMAINS,
+    SAMPLE_METRICS,
+    SAMPLE_RELATIONS,
+    GraphImporter,
+)
+
+
+@pytest.fixture
+def mock_importer() -> GraphImporter:
+    """创建使用 Mock 客户端的导入器（每次写入返回本块行数）."""
+    store = MagicMock()
+    store.client.execute_query.side_effect = lambda query, params: [
+        {"count": len(params["rows"])}
+    ]
+    return GraphImporter(store)
+
+
+class TestGraphImporter:
+    """GraphImporter 测试套件."""
+
+    def test_metrics_single_unwind(self, mock_importer: GraphImporter) -> None:
+        """测试指标导入只发出一条 UNWIND 语句."""
+        count = mock_importer.import_metrics_batch(SAMPLE_METRICS, show_progress=False)
+
+        client = mock_importer.store.client
+        assert count == len(SAMPLE_METRICS)
+        assert client.execute_query.call_count == 1
+        query, params = client.execute_query.call_args.args
+        assert "UNWIND $rows" in query
+        assert params["rows"][0]["metric_id"] == SAMPLE_METRICS[0]["metric_id"]
+
+    def test_metrics_chunked(
+        self, mock_importer: GraphImporter, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """测试超过块大小时按块提交."""
+        monkeypatch.setattr(importer_module, "CHUNK_SIZE", 2)
+
+        count = mock_importer.import_metrics_batch(SAMPLE_METRICS, show_progress=False)
+
+        expected_chunks = (len(SAMPLE_METRICS) + 1) // 2
+        assert count == len(SAMPLE_METRICS)
+        assert mock_importer.store.client.execute_query.call_count == expected_chunks
+
+    def test_invalid_metric_skipped(self, mock_importer: GraphImporter) -> None:
+        """测试缺少字段的指标被跳过."""
+        metrics = SAMPLE_METRICS[:1] + [{"metric_id": "bad"}]
+
+        count = mock_importer.import_metrics_batch(metrics, show_progress=False)
+
+        assert count == 1
+
+    def test_domains_single_unwind(self, mock_importer: GraphImporter) -> None:
+        """测试业务域导入只发出一条 UNWIND 语句."""
+        count = mock_importer.import_domains_batch(SAMPLE_DOMAINS)
+
+        assert count == len(SAMPLE_DOMAINS)
+        assert mock_importer.store.client.execute_query.call_count == 1
+
+    def test_relations_grouped_by_type(self, mock_importer: GraphImporter) -> None:
+        """测试关系按类型分组，每种类型一条语句，并补齐默认值."""
+        count = mock_importer.import_relations_batch(SAMPLE_RELATIONS)
+
+        client = mock_importer.store.client
+        rel_types = {r["type"] for r in SAMPLE_RELATIONS}
+        assert count == len(SAMPLE_RELATIONS)
+        assert client.execute_query.call_count == len(rel_types)
+
+        for call in client.execute_query.call_args_list:
+            for row in call.args[1]["rows"]:
+                if row["type"] == "derived_from":
+                    assert "confidence" in row and "formula" in row
+
+    def test_unknown_relation_type_skipped(self, mock_importer: GraphImporter) -> None:
+        """测试未知关系类型被跳过."""
+        count = mock_importer.import_relations_batch([{"type": "unknown"}])
+
+        assert count == 0
+        mock_importer.store.client.execute_query.assert_not_called()
@@ -0,0 +1,68 @@
+"""测试 GraphStore 内容指纹读写（使用 Mock 客户端，无需 Neo4j）."""
+
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.recall.graph.graph_store import GraphStore
+
+
+@pytest.fixture
+def mock_store() -> GraphStore:
+    """创建使用 Mock 客户端的图谱存储."""
+    return GraphStore(MagicMock())
+
+
+class TestGraphStoreContentHash:
+    """内容指纹测试套件."""
+
+    def test_get_content_hashes(self, mock_store: GraphStore) -> None:
+        """测试批量查询指纹并转换为映射."""
+        mock_store.client.execute_query.return_value = [
+            {"id": "gmv", "content_hash": "abc"},
+        ]
+
+        hashes = mock_store.get_content_hashes(["gmv", "dau"])
+
+        assert hashes == {"gmv": "abc"}
+        _, params = mock_store.client.execute_query.call_args.args
+        assert params == {"ids": ["gmv", "dau"]}
+
+    def test_set_content_hashes(self, mock_store: GraphStore) -> None:
+        """测试批量写入指纹只发出一条 UNWIND 语句."""
+        mock_store.set_content_hashes({"gmv": "abc", "dau": "def"})
+
+        query, params = mock_store.client.execute_write.call_args.args
+        assert "UNWIND $rows" in query
+        assert params["rows"] == [
+            {"id": "gmv", "content_hash": "abc"},
+            {"id": "dau", "content_hash": "def"},
+        ]
+
+    def test_batch_upsert_carries_hash(self, mock_store: GraphStore) -> None:
+        """测试批量写入指标时一并写入指纹."""
+        mock_store.upsert_metrics_batch([
+            {"id": "gmv", "name": "GMV", "code": "gmv", "content_hash": "abc"},
+        ])
+
+        _, params = mock_store.client.execute_write.call_args.args
+        assert params["rows"][0]["content_hash"] == "abc"
+
+    def test_set_hashes_with_summary_texts(self, mock_store: GraphStore) -> None:
+        """测试写入指纹时一并保存摘要文本."""
+        mock_store.set_content_hashes({"gmv": "abc", "dau": "def"}, summary_texts={"gmv": "成交总额"})
+
+        query, params = mock_store.client.execute_write.call_args.args
+        assert "summary_text" in query
+        assert params["rows"] == [
+            {"id": "gmv", "content_hash": "abc", "summary_text": "成交总额"},
+            {"id": "dau", "content_hash": "def", "summary_text": None},
+        ]
+
+    def test_get_summary_texts(self, mock_store: GraphStore) -> None:
+        """测试批量查询摘要文本."""
+        mock_store.client.execute_query.return_value = [
+            {"id": "gmv", "summary_text": "成交总额"},
+        ]
+
+        assert mock_store.get_summary_texts(["gmv", "dau"]) == {"gmv": "成交总额"}
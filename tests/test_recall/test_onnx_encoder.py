@@ -0,0 +1,90 @@
+"""测试 ONNX 编码器的池化与编码逻辑."""
+
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from src.recall.vector.onnx_encoder import ONNXSentenceEncoder, pool_embeddings
+
+
+class TestPoolEmbeddings:
+    """pool_embeddings 测试套件."""
+
+    @pytest.fixture
+    def token_embeddings(self) -> np.ndarray:
+        """两条样本，长度为3，维度为2."""
+        return np.array(
+            [
+                [[3.0, 4.0], [1.0, 1.0], [9.0, 9.0]],
+                [[0.0, 2.0], [2.0, 0.0], [5.0, 5.0]],
+            ],
+            dtype=np.float32,
+        )
+
+    @pytest.fixture
+    def attention_mask(self) -> np.ndarray:
+        """第三个 token 均为 padding."""
+        return np.array([[1, 1, 0], [1, 1, 0]])
+
+    def test_cls_pooling(self, token_embeddings: np.ndarray, attention_mask: np.ndarray) -> None:
+        """测试 CLS 池化取第一个 token."""
+        out = pool_embeddings(token_embeddings, attention_mask, pooling="cls", normalize=False)
+        np.testing.assert_allclose(out, [[3.0, 4.0], [0.0, 2.0]])
+
+    def test_mean_pooling_ignores_padding(
+        self, token_embeddings: np.ndarray, attention_mask: np.ndarray
+    ) -> None:
+        """测试均值池化忽略 padding token."""
+        out = pool_embeddings(token_embeddings, attention_mask, pooling="mean", normalize=False)
+        np.testing.assert_allclose(out, [[2.0, 2.5], [1.0, 1.0]])
+
+    def test_normalized(self, token_embeddings: np.ndarray, attention_mask: np.ndarray) -> None:
+        """测试输出已 L2 归一化."""
+        out = pool_embeddings(token_embeddings, attention_mask, pooling="cls")
+        np.testing.assert_allclose(np.linalg.norm(out, axis=1), [1.0, 1.0], atol=1e-6)
+
+    def test_invalid_pooling(self, token_embeddings: np.ndarray, attention_mask: np.ndarray) -> None:
+        """测试不支持的池化方式."""
+        with pytest.raises(ValueError):
+            pool_embeddings(token_embeddings, attention_mask, pooling="max")
+
+
+class TestONNXEncode:
+    """ONNXSentenceEncoder.encode 测试套件（Mock 分词器与模型，无需导出模型）."""
+
+    @pytest.fixture
+    def encoder(self) -> ONNXSentenceEncoder:
+        """创建以文本长度作为 CLS 向量的假编码器，并记录每批输入."""
+        encoder = ONNXSentenceEncoder.__new__(ONNXSentenceEncoder)
+        encoder.pooling = "cls"
+        encoder.max_length = 16
+        encoder.seen_batches = []
+
+        def tokenizer(texts, **kwargs):
+            encoder.seen_batches.append(list(texts))
+            return {"attention_mask": np.ones((len(texts), 1), dtype=np.int64), "texts": texts}
+
+        def model(attention_mask, texts):
+            hidden = np.array([[[len(t), 1.0]] for t in texts], dtype=np.float32)
+            return SimpleNamespace(last_hidden_state=hidden)
+
+        encoder.tokenizer = tokenizer
+        encoder.model = model
+        return encoder
+
+    def test_length_sorted_batches_keep_input_order(self, encoder: ONNXSentenceEncoder) -> None:
+        """测试按长度分批后，输出仍与输入顺序对应."""
+        texts = ["a", "aaaa", "aa", "aaa"]
+
+        out = encoder.encode(texts, batch_size=2)
+
+        assert encoder.seen_batches == [["aaaa", "aaa"], ["aa", "a"]]
+        np.testing.assert_allclose(out[:, 0], [1, 4, 2, 3])
+
+    def test_single_text(self, encoder: ONNXSentenceEncoder) -> None:
+        """测试单条文本返回一维向量."""
+        out = encoder.encode("abc")
+
+        assert out.shape == (2,)
+        assert out[0] == 3
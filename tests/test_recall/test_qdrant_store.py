@@ -90,6 +90,64 @@ class TestQdrantVectorStore:
         with pytest.raises(ValueError, match="Length mismatch"):
             vector_store.upsert(ids, sample_vectors, sample_payloads)
 
+    def test_upload_stream(
+        self,
+        vector_store: QdrantVectorStore,
+        sample_vectors: list[np.ndarray],
+        sample_payloads: list[dict],
+    ) -> None:
+        """测试从生成器流式导入."""
+        ids = [f"metric_{i}" for i in range(10)]
+        points = (p for p in zip(ids, sample_vectors, sample_payloads))
+
+        count = vector_store.upload_stream(points, batch_size=4, parallel=1)
+
+        assert count == 10
+        assert vector_store.count() == 10
+
+        # 与 upsert 使用相同的 ID 映射：相同 ID 再次 upsert 应覆盖而不是新增
+        vector_store.upsert(ids, sample_vectors, sample_payloads)
+        assert vector_store.count() == 10
+
+    def test_search_batch(
+        self,
+        vector_store: QdrantVectorStore,
+        sample_vectors: list[np.ndarray],
+        sample_payloads: list[dict],
+    ) -> None:
+        """测试批量检索结果与逐条检索一致."""
+        ids = [f"metric_{i}" for i in range(10)]
+        vector_store.upsert(ids, sample_vectors, sample_payloads)
+
+        batch_results = vector_store.search_batch(sample_vectors[:3], top_k=5)
+
+        assert len(batch_results) == 3
+        for query_vector, results in zip(sample_vectors[:3], batch_results):
+            single = vector_store.search(query_vector, top_k=5)
+            assert [r["id"] for r in results] == [r["id"] for r in single]
+
+    def test_search_payload_projection(
+        self,
+        vector_store: QdrantVectorStore,
+        sample_vectors: list[np.ndarray],
+        sample_payloads: list[dict],
+    ) -> None:
+        """测试只返回指定 payload 字段."""
+        ids = [f"metric_{i}" for i in range(10)]
+        vector_store.upsert(ids, sample_vectors, sample_payloads)
+
+        results = vector_store.search(sample_vectors[0], top_k=3, with_payload=["name"])
+        batch_results = vector_store.search_batch(
+            sample_vectors[:2], top_k=3, with_payload=["name"]
+        )
+
+        assert all(set(r["payload"]) == {"name"} for r in results)
+        assert all(set(r["payload"]) == {"name"} for hits in batch_results for r in hits)
+
+    def test_search_batch_empty(self, vector_store: QdrantVectorStore) -> None:
+        """测试空查询列表的批量检索."""
+        assert vector_store.search_batch([], top_k=5) == []
+
     def test_search(
         self,
         vector_store: QdrantVectorStore,
@@ -204,3 +262,47 @@ class TestQdrantVectorStore:
             assert isinstance(result["score"], float)
             assert 0 <= result["score"] <= 1
             assert isinstance(result["payload"], dict)
+
+
+class TestQdrantBulkMode:
+    """批量导入模式测试."""
+
+    @pytest.fixture
+    def mock_store(self) -> QdrantVectorStore:
+        """创建使用 Mock 客户端的向量存储."""
+        from unittest.mock import MagicMock
+
+        from qdrant_client.http.models import CollectionStatus
+
+        store = QdrantVectorStore(config=QdrantConfig(collection_name="bulk_metrics"))
+        store.client = MagicMock()
+        store.client.collection_exists.return_value = False
+        store.client.get_collection.return_value.status = CollectionStatus.GREEN
+        return store
+
+    def test_create_collection_bulk_mode(self, mock_store: QdrantVectorStore) -> None:
+        """测试批量模式创建时关闭 HNSW 与索引."""
+        mock_store.create_collection(vector_size=8, bulk_mode=True)
+
+        kwargs = mock_store.client.create_collection.call_args.kwargs
+        assert kwargs["hnsw_config"].m == 0
+        assert kwargs["optimizers_config"].indexing_threshold == 0
+
+    def test_create_collection_default_mode(self, mock_store: QdrantVectorStore) -> None:
+        """测试默认模式保留 HNSW 参数."""
+        mock_store.create_collection(vector_size=8)
+
+        kwargs = mock_store.client.create_collection.call_args.kwargs
+        assert kwargs["hnsw_config"].m == QdrantVectorStore.DEFAULT_M
+        assert kwargs["optimizers_config"] is None
+
+    def test_finish_bulk_load_restores_index(self, mock_store: QdrantVectorStore) -> None:
+        """测试结束批量导入后恢复索引参数."""
+        assert mock_store.finish_bulk_load() is True
+
+        kwargs = mock_store.client.update_collection.call_args.kwargs
+        assert kwargs["hnsw_config"].m == QdrantVectorStore.DEFAULT_M
+        assert (
+            kwargs["optimizers_config"].indexing_threshold
+            == QdrantVectorStore.DEFAULT_INDEXING_THRESHOLD
+        )
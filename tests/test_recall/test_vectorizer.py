@@ -3,8 +3,36 @@
 import numpy as np
 import pytest
 
+from src.recall.vector import vectorizer as vectorizer_module
+from src.recall.vector.onnx_encoder import ONNXSentenceEncoder
 from src.recall.vector.models import MetricMetadata
-from src.recall.vector.vectorizer import MetricVectorizer
+from src.recall.vector.vectorizer import MetricVectorizer, get_vectorizer
+
+
+@pytest.fixture
+def tiny_model(tmp_path):
+    """本地构建的微型 BERT 句向量模型（Transformer -> Pooling），不依赖下载."""
+    import torch
+    from sentence_transformers import SentenceTransformer
+    from sentence_transformers.models import Pooling, Transformer
+    from transformers import BertConfig, BertModel, BertTokenizerFast
+
+    torch.manual_seed(0)
+    vocab = ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]", "gmv", *"成交总额电商指标日活订单数量"]
+    (tmp_path / "vocab.txt").write_text("\n".join(vocab), encoding="utf-8")
+    BertTokenizerFast(str(tmp_path / "vocab.txt")).save_pretrained(tmp_path)
+    BertModel(BertConfig(
+        vocab_size=len(vocab),
+        hidden_size=16,
+        num_hidden_layers=1,
+        num_attention_heads=2,
+        intermediate_size=32,
+        max_position_embeddings=64,
+    )).save_pretrained(tmp_path)
+
+    transformer = Transformer(str(tmp_path), max_seq_length=32)
+    pooling = Pooling(transformer.get_word_embedding_dimension(), "mean")
+    return SentenceTransformer(modules=[transformer, pooling], device="cpu")
 
 
 class TestMetricVectorizer:
@@ -178,3 +206,200 @@ class TestMetricVectorizer:
         similarity = np.dot(vec1, vec2)
         # 相似指标应该有较高的相似度（>0.8）
         assert similarity > 0.8
+
+
+class TestMetricVectorizerDtype:
+    """权重精度配置测试."""
+
+    @pytest.mark.parametrize(
+        "dtype,expected",
+        [("bfloat16", "bfloat16"), ("float16", "float16"), ("float32", "float32")],
+    )
+    def test_dtype_casts_model(
+        self, monkeypatch: pytest.MonkeyPatch, dtype: str, expected: str
+    ) -> None:
+        """测试精度配置会把模型权重转换到对应 dtype（float32 保持不变）."""
+        import torch
+
+        from src.recall.vector import vectorizer as vectorizer_module
+
+        model = torch.nn.Linear(4, 4)
+        monkeypatch.setattr(vectorizer_module, "SentenceTransformer", lambda name, **kwargs: model)
+
+        loaded = MetricVectorizer(model_name="fake", backend="torch", dtype=dtype).model
+        assert loaded.weight.dtype == getattr(torch, expected)
+
+    def test_auto_device_without_cuda(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """测试 auto 设备在无 GPU 时回退到 CPU."""
+        import torch
+
+        monkeypatch.setattr(torch.cuda, "is_available", lambda: False)
+
+        assert MetricVectorizer(model_name="fake", device="auto").device == "cpu"
+
+    def test_unsupported_dtype_raises(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """测试不支持的精度抛出错误."""
+        import torch
+
+        from src.recall.vector import vectorizer as vectorizer_module
+
+        monkeypatch.setattr(
+            vectorizer_module, "SentenceTransformer", lambda name, **kwargs: torch.nn.Linear(4, 4)
+        )
+
+        with pytest.raises(RuntimeError):
+            MetricVectorizer(model_name="fake", backend="torch", dtype="int4").model
+
+
+class TestMetricVectorizerRawEncode:
+    """预构建文本直接编码测试."""
+
+    def test_encode_texts_raw_single_batch(self) -> None:
+        """测试整批文本一次交给 encode，且与 build_texts 配合使用."""
+        from unittest.mock import MagicMock
+
+        vectorizer = MetricVectorizer(model_name="fake")
+        vectorizer._model = MagicMock()
+        metrics = [
+            MetricMetadata(name="GMV", code="gmv", description="成交总额", domain="电商"),
+            MetricMetadata(name="DAU", code="dau", description="日活跃用户数", domain="用户"),
+        ]
+
+        texts = vectorizer.build_texts(metrics)
+        vectorizer.encode_texts_raw(texts)
+
+        assert len(texts) == 2 and "GMV" in texts[0]
+        kwargs = vectorizer._model.encode.call_args.kwargs
+        assert kwargs["batch_size"] == 2
+        assert kwargs["show_progress_bar"] is False
+        assert kwargs["normalize_embeddings"] is True
+
+    def test_encode_texts_matches_sentence_transformer(self, tiny_model) -> None:
+        """测试按调用截断的编码结果与 SentenceTransformer.encode 一致，且不改写共享模型."""
+        texts = ["成交总额 GMV 电商 指标", "日活", "订单数量 订单 订单 订单 订单 订单 订单"]
+        vectorizer = MetricVectorizer(model_name="fake")
+        vectorizer._model = tiny_model
+        vectorizer.batch_size = 2
+
+        embeddings = vectorizer.encode_texts(texts, max_length=8)
+        assert tiny_model.max_seq_length == 32
+
+        tiny_model.max_seq_length = 8
+        expected = tiny_model.encode(texts, normalize_embeddings=True, convert_to_numpy=True)
+        np.testing.assert_allclose(embeddings, expected, atol=1e-5)
+
+    def test_encode_texts_rejects_extra_modules(self, tiny_model) -> None:
+        """测试 Pooling 之后还有其他模块的模型不走自定义前向."""
+        from sentence_transformers import SentenceTransformer
+        from sentence_transformers.models import Dense
+
+        dim = tiny_model.get_sentence_embedding_dimension()
+        vectorizer = MetricVectorizer(model_name="fake")
+        vectorizer._model = SentenceTransformer(
+            modules=[*tiny_model, Dense(dim, 4)], device="cpu"
+        )
+
+        with pytest.raises(RuntimeError, match="Per-call truncation"):
+            vectorizer.encode_texts(["GMV"], max_length=8)
+
+    def test_encode_texts_onnx_passes_max_length(self) -> None:
+        """测试 ONNX 后端通过 encode 参数传入截断长度."""
+        from unittest.mock import MagicMock
+
+        vectorizer = MetricVectorizer(model_name="fake")
+        vectorizer._model = MagicMock(spec=ONNXSentenceEncoder, max_length=512)
+        vectorizer.encode_texts(["GMV"], max_length=128)
+
+        assert vectorizer._model.encode.call_args.kwargs["max_length"] == 128
+        assert vectorizer._model.max_length == 512
+
+
+class TestMetricVectorizerCache:
+    """向量磁盘缓存测试."""
+
+    def test_only_misses_encoded(self, tmp_path) -> None:
+        """测试重复运行时命中缓存，批内重复文本只编码一次."""
+        from unittest.mock import MagicMock
+
+        vectorizer = MetricVectorizer(
+            model_name="fake", cache_path=str(tmp_path / "embeddings.sqlite3")
+        )
+        vectorizer._model = MagicMock(spec=ONNXSentenceEncoder)
+        vectorizer._model.encode.side_effect = lambda texts, **kwargs: np.ones(
+            (len(texts), 4), dtype=np.float32
+        )
+
+        first = vectorizer.encode_texts(["GMV", "DAU", "GMV"])
+        second = vectorizer.encode_texts(["GMV", "DAU", "GMV"])
+
+        assert first.shape == second.shape == (3, 4)
+        assert vectorizer._model.encode.call_count == 1
+        assert vectorizer._model.encode.call_args.args[0] == ["GMV", "DAU"]
+
+
+    def test_dtype_change_misses_cache(self, tmp_path) -> None:
+        """测试同一模型换精度后不复用旧精度的缓存向量."""
+        from unittest.mock import MagicMock
+
+        cache_path = str(tmp_path / "embeddings.sqlite3")
+        encoders = []
+        for dtype in ("float32", "bfloat16"):
+            vectorizer = MetricVectorizer(model_name="fake", dtype=dtype, cache_path=cache_path)
+            vectorizer._model = MagicMock(spec=ONNXSentenceEncoder)
+            vectorizer._model.encode.side_effect = lambda texts, **kwargs: np.ones(
+                (len(texts), 4), dtype=np.float32
+            )
+            vectorizer.encode_texts(["GMV"])
+            encoders.append(vectorizer._model.encode)
+
+        assert all(encode.call_count == 1 for encode in encoders)
+
+
+class TestGetVectorizer:
+    """共享向量化器测试."""
+
+    def test_cached_per_model_and_backend(self) -> None:
+        """测试相同参数返回同一实例，不同参数返回不同实例."""
+        vectorizer_module._shared_vectorizer.cache_clear()
+        try:
+            first = get_vectorizer("fake-model", "torch")
+
+            assert get_vectorizer("fake-model", "torch") is first
+            assert get_vectorizer("other-model", "torch") is not first
+            assert first.model_name == "fake-model"
+        finally:
+            vectorizer_module._shared_vectorizer.cache_clear()
+
+    def test_default_arguments_share_configured_instance(self) -> None:
+        """测试缺省参数与显式传入配置值返回同一实例."""
+        from src.config import settings
+
+        vectorizer_module._shared_vectorizer.cache_clear()
+        try:
+            default = get_vectorizer()
+
+            assert get_vectorizer(settings.vectorizer.model_name) is default
+            assert get_vectorizer(
+                settings.vectorizer.model_name,
+                settings.vectorizer.backend,
+                settings.vectorizer.onnx_model_path,
+            ) is default
+        finally:
+            vectorizer_module._shared_vectorizer.cache_clear()
+
+    def test_onnx_path_only_applies_to_configured_model(self, monkeypatch) -> None:
+        """测试配置中的 ONNX 目录只用于配置中的模型，其他模型需显式传入."""
+        from src.config import settings
+
+        monkeypatch.setattr(settings.vectorizer, "onnx_model_path", "/models/m3e-onnx")
+        configured = MetricVectorizer(model_name=settings.vectorizer.model_name, backend="onnx")
+        other = MetricVectorizer(model_name="BAAI/bge-m3", backend="onnx")
+        explicit = MetricVectorizer(
+            model_name="BAAI/bge-m3", backend="onnx", onnx_model_path="/models/bge-onnx"
+        )
+
+        assert configured.onnx_model_path == "/models/m3e-onnx"
+        assert other.onnx_model_path is None
+        assert explicit.onnx_model_path == "/models/bge-onnx"
+        with pytest.raises(RuntimeError, match="No ONNX export"):
+            other.model